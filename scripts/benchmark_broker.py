@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, DuckDBWriter, WRITE_SQL
+from shared.db.broker import BrokerClient
+from scripts.benchmark_duckdb_insert import make_rows
+
+
+def percentile(values, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+
+def run_direct(args) -> dict:
+    """Before: each process opens the file itself, holds it for one batch, then releases it."""
+    writer = DuckDBWriter(args.db_path, snapshot_interval_s=0)
+    rows = make_rows(args.batch_rows)
+    latencies, lock_wait, failed = [], [], 0
+    for i in range(args.batches):
+        start = time.perf_counter()
+        writer._connection()  # Retries (0.5 s steps) while another process holds the lock
+        lock_wait.append(time.perf_counter() - start)
+        writer.insert_batch(rows)
+        writer.release()
+        latencies.append(time.perf_counter() - start)
+        # A history write as `save_message` does it: one attempt, no retry
+        try:
+            conn = duckdb.connect(args.history_path)
+            conn.execute(WRITE_SQL["history.save_message"], [f"bench-{os.getpid()}", "user", f"batch {i}"])
+            conn.close()
+        except duckdb.Error:
+            failed += 1
+    return {"latencies": latencies, "lock_wait": lock_wait, "history_failed": failed}
+
+
+def run_broker(args) -> dict:
+    """After: the same work as thin clients of the storage broker."""
+    db = DuckDBConnector(db_path=args.db_path, history_path=args.history_path, broker_socket=args.socket)
+    writer = db.open_writer()
+    rows = make_rows(args.batch_rows)
+    latencies, failed = [], 0
+    for i in range(args.batches):
+        start = time.perf_counter()
+        writer.insert_batch(rows)
+        latencies.append(time.perf_counter() - start)
+        try:
+            db.broker.call("history.save_message", params=[f"bench-{os.getpid()}", "user", f"batch {i}"])
+        except Exception:
+            failed += 1
+    return {"latencies": latencies, "lock_wait": [], "history_failed": failed}
+
+
+def run_producers(args, mode: str, extra: list) -> tuple:
+    start = time.perf_counter()
+    procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--role", mode,
+                               "--db_path", args.db_path, "--history_path", args.history_path,
+                               "--batches", str(args.batches), "--batch_rows", str(args.batch_rows)] + extra,
+                              stdout=subprocess.PIPE, text=True)
+             for _ in range(args.producers)]
+    results = [json.loads(proc.communicate()[0].strip().splitlines()[-1]) for proc in procs]
+    return results, time.perf_counter() - start
+
+
+def report(label: str, args, results: list, elapsed: float, groups: str):
+    latencies = [value for result in results for value in result["latencies"]]
+    lock_wait = [value for result in results for value in result["lock_wait"]]
+    failed = sum(result["history_failed"] for result in results)
+    rows = args.producers * args.batches * args.batch_rows
+    wait = (f"{statistics.mean(lock_wait) * 1000:.0f} ms / {max(lock_wait) * 1000:.0f} ms"
+            if lock_wait else "-")
+    print(f"| {label} | {rows / elapsed:,.0f} | {percentile(latencies, 0.5) * 1000:.0f} ms | "
+          f"{percentile(latencies, 0.99) * 1000:.0f} ms | {wait} | "
+          f"{failed} / {args.producers * args.batches} | {groups} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent writers: direct file access vs. the storage broker.")
+    parser.add_argument("--producers", type=int, default=4, help="Writer processes.")
+    parser.add_argument("--batches", type=int, default=20, help="Batches per producer.")
+    parser.add_argument("--batch_rows", type=int, default=500, help="Rows per batch.")
+    parser.add_argument("--role", default="bench", choices=["bench", "direct", "client", "broker"],
+                        help=argparse.SUPPRESS)
+    parser.add_argument("--db_path", help=argparse.SUPPRESS)
+    parser.add_argument("--history_path", help=argparse.SUPPRESS)
+    parser.add_argument("--socket", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role in ("direct", "client"):
+        result = run_direct(args) if args.role == "direct" else run_broker(args)
+        print(json.dumps(result), flush=True)
+        return
+    if args.role == "broker":
+        from services.storage_broker.src.main import StorageBroker
+        broker = StorageBroker(args.socket, args.db_path, args.history_path,
+                               os.path.join(os.path.dirname(args.db_path), "metrics.duckdb"))
+        try:
+            broker.serve_forever()
+        finally:
+            broker.close()
+        return
+
+    os.environ["LOG_SNAPSHOT_INTERVAL_S"] = "0"  # Same work in both modes: no read snapshots
+    work_dir = tempfile.mkdtemp(prefix="logpilot_broker_")
+    broker = None
+    try:
+        print(f"{args.producers} processes x {args.batches} batches x {args.batch_rows} rows "
+              f"(+ one history write per batch)\n")
+        print("| Writers | Rows/s | Batch p50 | Batch p99 | Lock wait avg / max | Failed history writes | Commits |")
+        print("| :--- | :--- | :--- | :--- | :--- | :--- | :--- |")
+
+        args.db_path = os.path.join(work_dir, "direct", "logs.duckdb")
+        args.history_path = os.path.join(work_dir, "direct", "history.duckdb")
+        DuckDBConnector(db_path=args.db_path, history_path=args.history_path, broker_socket="")
+        results, elapsed = run_producers(args, "direct", [])
+        report("Direct (open / insert / release)", args, results, elapsed, f"{args.producers * args.batches}")
+
+        args.db_path = os.path.join(work_dir, "broker", "logs.duckdb")
+        args.history_path = os.path.join(work_dir, "broker", "history.duckdb")
+        args.socket = os.path.join(work_dir, "broker.sock")
+        broker = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--role", "broker",
+                                   "--db_path", args.db_path, "--history_path", args.history_path,
+                                   "--socket", args.socket], stdout=subprocess.DEVNULL)
+        client = BrokerClient(args.socket)
+        client.call("broker.stats")  # Waits until the broker listens
+        results, elapsed = run_producers(args, "client", ["--socket", args.socket])
+        stats = client.call("broker.stats")
+        logs, history = stats["logs"], stats["history"]
+        report("Storage broker", args, results, elapsed,
+               f"{logs['commits']} logs (avg {logs['group_avg']}, max {logs['group_max']}), "
+               f"{history['commits']} history")
+    finally:
+        if broker is not None:
+            broker.terminate()
+            broker.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, DuckDBWriter
+from shared.db.log_compaction import LogCompactor
+
+START = datetime(2025, 1, 1)
+
+
+def load_files(db_path: str, services: int, rows: int, hours: float):
+    """One time-ordered file per service, loaded one after another (as the bulk loader does)."""
+    conn = duckdb.connect(db_path)
+    per_file = rows // services
+    step = hours * 3600 / per_file
+    for service in range(services):
+        conn.execute("""
+            INSERT INTO logs (timestamp, severity, service_name, body, context)
+            SELECT ?::TIMESTAMP + to_microseconds((i * ? * 1e6)::BIGINT),
+                   CASE WHEN i % 10 = 0 THEN 'ERROR' ELSE 'INFO' END, ?,
+                   'Request ' || i || ' took ' || (i % 900) || ' ms', '{"source_file": "app.log"}'
+            FROM range(?) t(i)
+        """, [START, step, f"service-{service}", per_file])
+    conn.execute("CHECKPOINT")
+    conn.close()
+
+
+def used_mb(db_path: str) -> float:
+    """Blocks in use; blocks freed by the rewrite stay in the file for later writes."""
+    conn = duckdb.connect(db_path, read_only=True)
+    block_size, used = conn.execute("SELECT block_size, used_blocks FROM pragma_database_size()").fetchone()
+    conn.close()
+    return block_size * used / 2**20
+
+
+def bench_windows(db_path: str, anchors, repeat: int) -> float:
+    """Average ms of `retrieve_context`'s +/-30 s window query over the anchors (best of `repeat`)."""
+    conn = duckdb.connect(db_path, read_only=True)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for anchor in anchors:
+            # Literals, so the filter is pushed into the scan as with bound timestamps
+            low, high = anchor - timedelta(seconds=30), anchor + timedelta(seconds=30)
+            conn.execute(f"SELECT timestamp, service_name, severity, body FROM logs "
+                         f"WHERE timestamp BETWEEN TIMESTAMP '{low}' AND TIMESTAMP '{high}' "
+                         f"ORDER BY timestamp ASC").fetchall()
+        elapsed = (time.perf_counter() - start) / len(anchors)
+        best = elapsed if best is None else min(best, elapsed)
+    conn.close()
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-group overlap and window-query latency before / after re-clustering.")
+    parser.add_argument("--rows", type=int, default=4_000_000, help="Total rows.")
+    parser.add_argument("--services", type=int, default=10, help="Per-service files.")
+    parser.add_argument("--hours", type=float, default=72, help="Hours each file covers.")
+    parser.add_argument("--windows", type=int, default=50, help="Window queries per run.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs (best is reported).")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_compaction_")
+    try:
+        db_path = os.path.join(work_dir, "logs.duckdb")
+        DuckDBConnector(db_path=db_path, history_path=os.path.join(work_dir, "history.duckdb"))
+        load_files(db_path, args.services, args.rows, args.hours)
+        anchors = [START + timedelta(seconds=random.random() * args.hours * 3600) for _ in range(args.windows)]
+        size_before = used_mb(db_path)
+        window_before = bench_windows(db_path, anchors, args.repeat)
+
+        writer = DuckDBWriter(db_path, snapshot_interval_s=0)
+        writer.compactor = LogCompactor(closed_after_s=0)
+        result = writer.compact_closed(START + timedelta(hours=args.hours))
+        writer.close()
+        window_after = bench_windows(db_path, anchors, args.repeat)
+        size_after = used_mb(db_path)
+
+        before, after = result["before"], result["after"]
+        print(f"{args.rows:,} rows in {args.services} per-service files over {args.hours:g} h; "
+              f"re-clustered {result['rows']:,} rows in {result['seconds']:.1f} s\n")
+        print("| | Row groups | Overlapping | Avg / max overlap | ±30 s window (ms) | Used (MB) |")
+        print("| :--- | :--- | :--- | :--- | :--- | :--- |")
+        for label, stats, window, size in (("Before", before, window_before, size_before),
+                                           ("After", after, window_after, size_after)):
+            print(f"| {label} | {stats['row_groups']} | {stats['overlapping']} | "
+                  f"{stats['overlap_avg']} / {stats['overlap_max']} | {window:.2f} | {size:.0f} |")
+        print(f"\nWindow query speedup: {window_before / window_after:.1f}x; "
+              f"file {os.path.getsize(db_path) / 2**20:.0f} MB (freed blocks are reused, not truncated)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.db.duckdb_client import DuckDBConnector, get_connector, CATALOG_PATH
+from scripts.benchmark_duckdb_insert import make_rows
+
+DB_PATH = "data/target/logs.duckdb"
+
+
+def new_connector(read_only: bool) -> DuckDBConnector:
+    """Before: every call site built its own connector."""
+    return DuckDBConnector(db_path=DB_PATH, read_only=read_only)
+
+
+def shared_connector(read_only: bool) -> DuckDBConnector:
+    return get_connector(db_path=DB_PATH, read_only=read_only)
+
+
+def query_request(connector):
+    """The database touches of one `/query` (SQL intent + anchor lookup)."""
+    connector(False).get_history("default")                                           # run_query
+    connector(True).query("EXPLAIN SELECT count(*) FROM logs WHERE severity = 'ERROR'")  # validate_sql
+    connector(True).query("SELECT count(*) FROM logs WHERE severity = 'ERROR'")          # execute_sql
+    connector(True).query("SELECT timestamp, body FROM logs WHERE template_id IN ('1') "
+                          "ORDER BY timestamp DESC LIMIT 5")                           # retrieve_context
+    db = connector(False)                                                             # save history
+    db.save_message("bench", "user", "how many errors?")
+    db.save_message("bench", "ai", "42")
+
+
+def bench(fn, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request overhead: new connector per call vs. get_connector.")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows in the logs table.")
+    parser.add_argument("--services", type=int, default=200, help="Rows in the system catalog CSV.")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (best is reported).")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="logpilot_connector_")
+    try:
+        # Connectors use paths relative to the working directory (history DB, catalog)
+        os.chdir(work_dir)
+        os.makedirs(os.path.dirname(CATALOG_PATH), exist_ok=True)
+        with open(CATALOG_PATH, "w") as f:
+            f.write("service_name,department,criticality\n")
+            f.writelines(f"service-{i},team-{i % 10},High\n" for i in range(args.services))
+        writer = DuckDBConnector(db_path=DB_PATH).open_writer()
+        writer.insert_batch(make_rows(args.rows))
+        writer.close()
+        get_connector(DB_PATH), get_connector(DB_PATH, read_only=True)  # First call initialises
+
+        print("| Step | DuckDBConnector() per call (ms) | get_connector (ms) |")
+        print("| :--- | :--- | :--- |")
+        rows = [
+            ("writable handle", lambda: new_connector(False), lambda: shared_connector(False)),
+            ("read-only handle", lambda: new_connector(True), lambda: shared_connector(True)),
+            ("`/query` database work (5 handles)", lambda: query_request(new_connector),
+             lambda: query_request(shared_connector)),
+        ]
+        for label, before, after in rows:
+            print(f"| {label} | {bench(before, args.repeat):.2f} | {bench(after, args.repeat):.2f} |")
+
+        # A changed catalog is picked up by the next handle
+        with open(CATALOG_PATH, "a") as f:
+            f.write("service-new,team-0,Low\n")
+        count = shared_connector(False).query("SELECT count(*) FROM system_catalog")[0][0]
+        print(f"\nCatalog after edit: {count} rows")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.db.duckdb_client import DuckDBConnector
+
+
+def make_rows(count: int):
+    """Builds LogEvent-shaped dicts like the ingestion worker produces."""
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    services = ["payment-service", "auth-service", "db-service", "frontend"]
+    rows = []
+    for i in range(count):
+        rows.append({
+            "timestamp": start + timedelta(milliseconds=i * 10),
+            "severity": random.choice(["INFO", "WARN", "ERROR"]),
+            "service_name": random.choice(services),
+            "trace_id": None,
+            "body": f"Payment processed for user_id={random.randint(100, 200)} amount={random.randint(10, 500)}.00",
+            "environment": "prod",
+            "app_id": None,
+            "department": "finance",
+            "host": f"server-{random.randint(1, 100):03d}",
+            "region": "us-east-1",
+            "context": {"template_id": "1", "template_str": "Payment processed for <*> <*>", "change_type": "none"},
+        })
+    return rows
+
+
+def bench(label: str, insert, rows, batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(rows), batch_size):
+        insert(rows[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed
+    print(f"| {label} | {batch_size} | {rate:,.0f} |")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DuckDB insert paths.")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows per run.")
+    parser.add_argument("--batch_size", type=int, default=5000, help="Batch size for the bulk writer.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_insert_")
+    rows = make_rows(args.rows)
+    try:
+        legacy_db = DuckDBConnector(db_path=os.path.join(work_dir, "legacy.duckdb"))
+        bulk_db = DuckDBConnector(db_path=os.path.join(work_dir, "bulk.duckdb"))
+        writer = bulk_db.open_writer()
+
+        print("| Path | Batch Size | Rows/sec |")
+        print("| :--- | :--- | :--- |")
+        legacy = bench("Transient connection + executemany", legacy_db.insert_batch, rows, 100)
+        bulk = bench("Persistent writer + Arrow", writer.insert_batch, rows, args.batch_size)
+        writer.close()
+        print(f"\n🚀 Speedup: {bulk / legacy:.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from scripts.generate_logs import generate_logs
+from shared.utils.parallel_pipeline import ParallelPreprocessor
+from shared.utils.template_miner import LogTemplateMiner
+
+
+def build_corpus(path: str, size_mb: int, log_format: str = "standard"):
+    """Builds a single log file of ~size_mb by repeating generated sample logs."""
+    sample_dir = tempfile.mkdtemp(prefix="logpilot_sample_")
+    try:
+        generate_logs(output_dir=sample_dir, count=20000, days=30, log_format=log_format)
+        sample = b"".join(
+            open(os.path.join(sample_dir, name), "rb").read() for name in sorted(os.listdir(sample_dir))
+        )
+    finally:
+        shutil.rmtree(sample_dir, ignore_errors=True)
+
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "wb") as f:
+        while written < target:
+            f.write(sample)
+            written += len(sample)
+    print(f"📄 Corpus ready: {path} ({written / 1024 / 1024:.0f} MB)")
+
+
+def run_once(path: str, workers: int, state_dir: str) -> float:
+    """Runs Parse -> Mask -> Mine over the corpus and returns lines/sec."""
+    miner = LogTemplateMiner(persistence_file=os.path.join(state_dir, f"drain3_{workers}.bin"))
+    preprocessor = ParallelPreprocessor(workers=workers)
+    lines = 0
+    start = time.perf_counter()
+    try:
+        with open(path, "r") as f:
+            for raw_log, masked, error in preprocessor.imap(f):
+                if masked is not None:
+                    miner.mine_template(masked["body"])
+                lines += 1
+    finally:
+        preprocessor.close()
+    elapsed = time.perf_counter() - start
+    miner.close()
+    return lines / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion throughput vs. worker count.")
+    parser.add_argument("--size_mb", type=int, default=256, help="Size of the generated corpus (use 2048+ for multi-GB).")
+    parser.add_argument("--workers", type=str, default="1,2,4,8", help="Comma separated worker counts.")
+    parser.add_argument("--format", type=str, default="standard", choices=["standard", "json", "syslog", "nginx"])
+    parser.add_argument("--corpus", type=str, default=None, help="Reuse an existing corpus file instead of generating one.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_bench_")
+    try:
+        corpus = args.corpus
+        if not corpus:
+            corpus = os.path.join(work_dir, "corpus.log")
+            build_corpus(corpus, args.size_mb, args.format)
+
+        print("\n| Workers | Lines/sec | Speedup |")
+        print("| :--- | :--- | :--- |")
+        baseline = None
+        for workers in [int(w) for w in args.workers.split(",")]:
+            rate = run_once(corpus, workers, work_dir)
+            baseline = baseline or rate
+            print(f"| {workers} | {rate:,.0f} | {rate / baseline:.2f}x |")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from scripts.benchmark_ingestion import build_corpus
+from shared.db.duckdb_client import build_log_columns
+from shared.log_schema import LogEvent
+from shared.utils.log_parser import LogParser
+from shared.utils.pii_masker import PIIMasker
+from shared.utils import json_codec
+from shared.utils.timestamps import TimestampDecoder, NGINX_FORMAT, STANDARD_FORMAT, SYSLOG_FORMAT
+
+FORMATS = ["standard", "json", "syslog", "nginx"]
+
+
+def parse_all(lines, log_format: str = None, repeat: int = 3) -> float:
+    """
+    Lines/sec parsing every line with a fresh parser, best of `repeat`.
+    With a `log_format`, only that extractor is run: the ceiling of any
+    per-source format dispatch, which would still pay for its sniffing.
+    """
+    best = None
+    for _ in range(repeat):
+        parser = LogParser()
+        if log_format is None:
+            parse = parser._detect_and_parse
+        else:
+            parse = lambda line: parser._extract(log_format, line)
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def timestamps_per_sec(log_format: str, lines, ordered: bool = False) -> tuple:
+    """
+    (strptime, TimestampDecoder) decodes/sec over the corpus' own timestamps.
+    The generator scatters timestamps over 30 days; `ordered` sorts them
+    first, which is what a real log file looks like.
+    """
+    parser = LogParser()
+    raw = []
+    for line in lines:
+        match = parser._PATTERNS.get(log_format, parser.PATTERN_STANDARD).match(line)
+        if match:
+            raw.append(match.group("timestamp"))
+    if not raw:
+        return None, None
+
+    year = time.localtime().tm_year
+    reference = {
+        "standard": lambda ts: parser._parse_timestamp(ts, STANDARD_FORMAT),
+        "syslog": lambda ts: parser._parse_timestamp(f"{year} {ts}", SYSLOG_FORMAT),
+        "nginx": lambda ts: parser._parse_timestamp(ts, NGINX_FORMAT),
+    }[log_format]
+    if ordered:
+        raw.sort(key=reference)
+    decoder = TimestampDecoder()
+    fast = getattr(decoder, log_format)
+
+    rates = []
+    for decode in (reference, fast):
+        start = time.perf_counter()
+        for ts in raw:
+            decode(ts)
+        rates.append(len(raw) / (time.perf_counter() - start))
+    return tuple(rates)
+
+
+def rows_vs_columns(lines, chunk: int = 5000) -> tuple:
+    """
+    lines/sec from raw lines to bulk-insert columns (Parse + Mask, no mining):
+    (dict -> LogEvent -> model_dump -> build_log_columns, parse_many -> mask_batch -> to_columns).
+    """
+    parser, masker = LogParser(), PIIMasker()
+    start = time.perf_counter()
+    for i in range(0, len(lines), chunk):
+        events = []
+        for line in lines[i:i + chunk]:
+            masked = masker.mask_context(parser.parse(line))
+            events.append(LogEvent(**masked).model_dump())
+        build_log_columns(events)
+    per_row = len(lines) / (time.perf_counter() - start)
+
+    parser, masker = LogParser(), PIIMasker()
+    start = time.perf_counter()
+    for i in range(0, len(lines), chunk):
+        masker.mask_batch(parser.parse_many(lines[i:i + chunk])).to_columns()
+    columnar = len(lines) / (time.perf_counter() - start)
+    return per_row, columnar
+
+
+def json_context_path(lines, chunk: int = 5000) -> tuple:
+    """
+    lines/sec of JSON lines to insert-ready columns:
+    (stdlib codec, every context walked and re-encoded; orjson + lazy raw context).
+    """
+    def run(eager: bool) -> float:
+        parser, masker = LogParser(), PIIMasker()
+        start = time.perf_counter()
+        for i in range(0, len(lines), chunk):
+            batch = parser.parse_many(lines[i:i + chunk])
+            if eager:
+                batch.columns["context_raw"] = [None] * len(batch)
+            masker.mask_batch(batch).to_columns()
+        return len(lines) / (time.perf_counter() - start)
+
+    fast = json_codec.orjson
+    json_codec.orjson = None
+    try:
+        eager = run(eager=True)
+    finally:
+        json_codec.orjson = fast
+    return eager, run(eager=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark format dispatch, timestamp decoding and the columnar parse path.")
+    parser.add_argument("--size_mb", type=int, default=16, help="Size of each generated (homogeneous) corpus.")
+    parser.add_argument("--formats", type=str, default=",".join(FORMATS), help="Comma-separated formats to run.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_parser_")
+    try:
+        corpora = {}
+        for log_format in args.formats.split(","):
+            corpus = os.path.join(work_dir, f"{log_format}.log")
+            build_corpus(corpus, args.size_mb, log_format=log_format)
+            with open(corpus, "r") as f:
+                corpora[log_format] = [line.strip() for line in f if line.strip()]
+
+        print("\n| Format | Lines | Full chain (lines/s) | Direct extractor (lines/s) | Ceiling |")
+        print("| :--- | :--- | :--- | :--- | :--- |")
+        for name, lines in corpora.items():
+            full = parse_all(lines)
+            direct = parse_all(lines, log_format=name)
+            print(f"| {name} | {len(lines):,} | {full:,.0f} | {direct:,.0f} | {direct / full:.2f}x |")
+
+        print("\n| Format | Order | strptime (decodes/s) | TimestampDecoder (decodes/s) | Speedup |")
+        print("| :--- | :--- | :--- | :--- | :--- |")
+        for log_format, lines in corpora.items():
+            if log_format == "json":
+                continue  # ISO-8601 already goes through the C `fromisoformat`
+            for ordered in (False, True):
+                slow, fast = timestamps_per_sec(log_format, lines, ordered=ordered)
+                if slow:
+                    order = "sorted" if ordered else "generated"
+                    print(f"| {log_format} | {order} | {slow:,.0f} | {fast:,.0f} | {fast / slow:.1f}x |")
+
+        print("\n| Format | Row path (lines/s) | Columnar `parse_many` (lines/s) | Speedup |")
+        print("| :--- | :--- | :--- | :--- |")
+        for log_format, lines in corpora.items():
+            per_row, columnar = rows_vs_columns(lines)
+            print(f"| {log_format} | {per_row:,.0f} | {columnar:,.0f} | {columnar / per_row:.2f}x |")
+
+        if "json" in corpora:
+            eager, lazy = json_context_path(corpora["json"])
+            print("\n| JSON path | lines/s |")
+            print("| :--- | :--- |")
+            print(f"| stdlib decode, walk + re-encode every context | {eager:,.0f} |")
+            print(f"| orjson, lazy raw context | {lazy:,.0f} ({lazy / eager:.2f}x) |")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, connect_with_retry
+from shared.db.read_pool import list_snapshots, snapshot_dir
+from scripts.benchmark_duckdb_insert import make_rows
+
+QUERY = "SELECT service_name, count(*) FROM logs WHERE severity = 'ERROR' GROUP BY 1"
+
+
+def percentile(values, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+
+def seed(db_path: str, rows: int):
+    """Pre-existing history, written directly (much faster than batches of dicts)."""
+    DuckDBConnector(db_path=db_path)
+    conn = duckdb.connect(db_path)
+    conn.execute("""
+        INSERT INTO logs (timestamp, severity, service_name, body, context)
+        SELECT TIMESTAMP '2025-01-01' + to_seconds(i // 20),
+               CASE WHEN i % 10 = 0 THEN 'ERROR' ELSE 'INFO' END, 'service-' || (i % 20),
+               'Request ' || i || ' from 10.0.' || (i % 250) || '.' || (i % 7) || ' took ' || (i % 900) || ' ms',
+               '{"source_file": "app.log", "template_id": "' || (i % 50) || '"}'
+        FROM range(?) t(i)
+    """, [rows])
+    conn.execute("CHECKPOINT")
+    conn.close()
+
+
+def run_writer(db_path: str, seconds: float, snapshot_interval_s: float):
+    """Ingestion-worker stand-in: holds the database and inserts without going idle."""
+    writer = DuckDBConnector(db_path=db_path).open_writer()
+    writer.snapshot_interval_s = snapshot_interval_s
+    rows = make_rows(2000)
+    writer.insert_batch(rows)
+    print("ready", flush=True)
+    latencies = []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        start = time.perf_counter()
+        writer.insert_batch(rows)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    print(f"{writer.rows_written} {writer.snapshots_published} {writer.snapshot_s} "
+          f"{percentile(latencies, 0.5)} {percentile(latencies, 0.99)} {max(latencies)}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read latency next to a busy writer: transient connections vs. ReadPool.")
+    parser.add_argument("--seconds", type=float, default=20, help="How long the writer ingests.")
+    parser.add_argument("--snapshot_interval_s", type=float, default=5, help="Writer's snapshot interval.")
+    parser.add_argument("--live_queries", type=int, default=2, help="Queries on transient live connections.")
+    parser.add_argument("--seed_rows", type=int, default=5_000_000, help="Rows already stored before ingesting.")
+    parser.add_argument("--role", default="bench", choices=["bench", "writer"], help=argparse.SUPPRESS)
+    parser.add_argument("--db_path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == "writer":
+        run_writer(args.db_path, args.seconds, args.snapshot_interval_s)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_read_pool_")
+    try:
+        db_path = os.path.join(work_dir, "logs.duckdb")
+        seed(db_path, args.seed_rows)
+        first = DuckDBConnector(db_path=db_path).open_writer()
+        first.snapshot_interval_s = args.snapshot_interval_s
+        first.insert_batch(make_rows(2000))
+        first.close()  # Publishes the first snapshot
+
+        writer = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--role", "writer",
+                                   "--db_path", db_path, "--seconds", str(args.seconds),
+                                   "--snapshot_interval_s", str(args.snapshot_interval_s)],
+                                  stdout=subprocess.PIPE, text=True)
+        while writer.stdout.readline().strip() not in ("ready", ""):
+            pass  # Writer holds the file from here on
+
+        # Before: a transient connection per query (retries while the writer holds the lock)
+        live = []
+        for _ in range(args.live_queries):
+            start = time.perf_counter()
+            try:
+                conn = connect_with_retry(db_path, read_only=True)
+                conn.execute(QUERY).fetchall()
+                conn.close()
+                outcome = "ok"
+            except Exception:
+                outcome = "failed"
+            live.append((time.perf_counter() - start, outcome))
+
+        # After: pooled reads on the writer's snapshots
+        reader = DuckDBConnector(db_path=db_path, read_only=True, pooled=True)
+        latencies, staleness = [], []
+        while writer.poll() is None:
+            start = time.perf_counter()
+            reader.query(QUERY)
+            latencies.append(time.perf_counter() - start)
+            staleness.append(reader.pool.metrics()["staleness_s"])
+            time.sleep(0.05)
+        metrics = reader.pool.metrics()
+        rows, published, snapshot_s, insert_p50, insert_p99, insert_max = writer.stdout.read().split()[-6:]
+
+        print("| Read path | Queries | p50 | p99 / max | Outcome |")
+        print("| :--- | :--- | :--- | :--- | :--- |")
+        live_s = [elapsed for elapsed, _ in live]
+        outcomes = ", ".join(sorted({outcome for _, outcome in live}))
+        print(f"| Transient live connection | {len(live)} | {statistics.median(live_s):.1f} s | "
+              f"{max(live_s):.1f} s | {outcomes} |")
+        print(f"| ReadPool on snapshots | {len(latencies)} | {percentile(latencies, 0.5) * 1000:.1f} ms | "
+              f"{percentile(latencies, 0.99) * 1000:.1f} ms | {metrics['refreshes']} snapshot refreshes |")
+        print(f"\nSnapshot staleness while ingesting: median {statistics.median(staleness):.1f} s, "
+              f"max {max(staleness):.1f} s (interval {args.snapshot_interval_s:.0f} s)")
+        print(f"Writer: {int(rows):,} rows, {published} snapshots, {float(snapshot_s) / max(1, int(published)):.2f} s per snapshot; "
+              f"2,000-row insert p50 {float(insert_p50) * 1000:.0f} ms, p99 {float(insert_p99) * 1000:.0f} ms, "
+              f"max {float(insert_max) * 1000:.0f} ms")
+        snapshots = list_snapshots(snapshot_dir(db_path))
+        print(f"Pool wait: avg {metrics['wait_ms_avg']:.3f} ms, max {metrics['wait_ms_max']:.3f} ms; "
+              f"{len(snapshots)} snapshot files on disk (latest {os.path.getsize(snapshots[-1]) / 1024 / 1024:.1f} MB, "
+              f"live file {os.path.getsize(db_path) / 1024 / 1024:.1f} MB)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, LOG_COLUMNS
+
+ERRORS = "severity IN ('ERROR', 'CRITICAL', 'FATAL')"
+
+# (question, raw `logs` SQL, rollup SQL)
+QUERIES = [
+    ("Sentry window (last minute vs. 5 before)",
+     [f"SELECT count(*) FROM logs WHERE timestamp > (NOW() - INTERVAL 1 MINUTE) AND {ERRORS}",
+      f"SELECT count(*) / 5.0 FROM logs WHERE timestamp > (NOW() - INTERVAL 6 MINUTE) "
+      f"AND timestamp <= (NOW() - INTERVAL 1 MINUTE) AND {ERRORS}"],
+     [f"""WITH minute AS (SELECT date_trunc('minute', NOW() AT TIME ZONE 'UTC') AS current)
+          SELECT coalesce(sum(count) FILTER (WHERE bucket >= current - INTERVAL 1 MINUTE), 0),
+                 coalesce(sum(count) FILTER (WHERE bucket < current - INTERVAL 1 MINUTE), 0) / 5.0
+          FROM log_rollup_1m, minute
+          WHERE bucket >= current - INTERVAL 6 MINUTE AND bucket < current AND {ERRORS}"""]),
+    ("Errors per service per hour, last 7 days",
+     ["SELECT date_trunc('hour', timestamp), service_name, count(*) FROM logs "
+      "WHERE severity = 'ERROR' AND timestamp > now() - INTERVAL '7 DAYS' GROUP BY ALL"],
+     ["SELECT bucket, service_name, sum(count) FROM log_rollup_1h "
+      "WHERE severity = 'ERROR' AND bucket > now() - INTERVAL '7 DAYS' GROUP BY ALL"]),
+    ("Errors per service per day, whole year",
+     ["SELECT date_trunc('day', timestamp), service_name, count(*) FROM logs WHERE severity = 'ERROR' GROUP BY ALL"],
+     ["SELECT bucket, service_name, sum(count) FROM log_rollup_1d WHERE severity = 'ERROR' GROUP BY ALL"]),
+    ("Top templates, last 30 days",
+     ["SELECT template_id, count(*) FROM logs WHERE timestamp > now() - INTERVAL '30 DAYS' "
+      "GROUP BY ALL ORDER BY 2 DESC LIMIT 10"],
+     ["SELECT template_id, sum(count) FROM log_rollup_1d WHERE bucket > now() - INTERVAL '30 DAYS' "
+      "GROUP BY ALL ORDER BY 2 DESC LIMIT 10"]),
+]
+
+
+def make_batch(count: int, start: datetime, seconds: float):
+    """`count` rows spread over `seconds` from `start` (columnar, as the writer takes them)."""
+    services = [f"service-{i}" for i in range(20)]
+    columns = {name: [None] * count for name in LOG_COLUMNS}
+    columns["timestamp"] = sorted(start + timedelta(seconds=random.random() * seconds) for _ in range(count))
+    columns["severity"] = random.choices(["INFO", "WARN", "ERROR"], weights=[8, 1, 1], k=count)
+    columns["service_name"] = random.choices(services, k=count)
+    templates = [random.randrange(50) for _ in range(count)]
+    columns["body"] = [f"Request {t} took {random.randint(1, 900)} ms" for t in templates]
+    columns["context"] = [f'{{"template_id":"{t}"}}' for t in templates]
+    return columns
+
+
+def bench(conn, statements, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sql in statements:
+            conn.execute(sql).fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard-style counts: scans of `logs` vs. the rollup tables.")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows spread over --days up to now.")
+    parser.add_argument("--days", type=int, default=365, help="Days of data.")
+    parser.add_argument("--batch_size", type=int, default=5000, help="Rows per writer batch.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (best is reported).")
+    parser.add_argument("--pending_rows", type=int, default=150_000,
+                        help="Rows of the last 30 s stored after the final checkpoint (read through the views).")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_rollups_")
+    try:
+        db_path = os.path.join(work_dir, "logs.duckdb")
+        writer = DuckDBConnector(db_path=db_path).open_writer()
+        writer.snapshot_interval_s = 0
+        # Batches follow each other in time, as the worker reads files
+        batches = -(-args.rows // args.batch_size)
+        step = args.days * 86400 / batches
+        start_time = datetime.now(timezone.utc) - timedelta(days=args.days)
+        insert_s = 0.0
+        for i, done in enumerate(range(0, args.rows, args.batch_size)):
+            columns = make_batch(min(args.batch_size, args.rows - done), start_time + timedelta(seconds=i * step), step)
+            start = time.perf_counter()
+            writer.insert_columns(columns)
+            insert_s += time.perf_counter() - start
+        # The last checkpoint (on close) refreshes the rollups for the remaining rows
+        start = time.perf_counter()
+        writer.close()
+        total_s = insert_s + time.perf_counter() - start
+        print(f"Ingest: {args.rows:,} rows over {args.days} days ({args.rows / args.days / 1440:,.0f} per minute) "
+              f"in {args.batch_size:,}-row batches, "
+              f"{args.rows / total_s:,.0f} rows/s incl. close; rollup refresh at checkpoints {writer.rollup_s:.1f} s "
+              f"of {total_s:.1f} s ({writer.rollup_s / total_s:.0%})")
+
+        conn = duckdb.connect(db_path, read_only=True)
+        sizes = ", ".join(f"{table} {conn.execute(f'SELECT count(*) FROM {table}').fetchone()[0]:,}"
+                          for table in ("log_rollup_1m", "log_rollup_1h", "log_rollup_1d"))
+        print(f"Rollup rows: {sizes}\n")
+        results = [(bench(conn, raw, args.repeat), bench(conn, rolled, args.repeat)) for _, raw, rolled in QUERIES]
+        conn.close()
+
+        # A worker between two checkpoints: the views count the unrefreshed tail from `logs`
+        writer = DuckDBConnector(db_path=db_path).open_writer()
+        writer.snapshot_interval_s = 0
+        writer.checkpoint_interval_s = float("inf")
+        now = datetime.now(timezone.utc)
+        for done in range(0, args.pending_rows, args.batch_size):
+            writer.insert_columns(make_batch(min(args.batch_size, args.pending_rows - done),
+                                             now - timedelta(seconds=30), 30))
+        tail = [bench(writer._conn, rolled, args.repeat) for _, _, rolled in QUERIES]
+
+        print(f"| Question | `logs` scan (ms) | Rollup (ms) | Speedup | Rollup, {args.pending_rows:,} rows pending (ms) |")
+        print("| :--- | :--- | :--- | :--- | :--- |")
+        for (label, _, _), (before, after), pending in zip(QUERIES, results, tail):
+            print(f"| {label} | {before:.1f} | {after:.1f} | {before / after:.0f}x | {pending:.1f} |")
+        writer.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
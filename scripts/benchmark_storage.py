@@ -0,0 +1,192 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from scripts.generate_logs import generate_logs
+from shared.db.duckdb_client import DuckDBConnector
+from shared.utils.log_parser import LogParser
+from shared.utils.pii_masker import PIIMasker
+from shared.utils.parallel_pipeline import preprocess_lines
+from shared.utils.template_miner import LogTemplateMiner, SnapshotPolicy
+
+BATCH_SIZE = 5000
+LAYOUTS = ("row", "compact", "tiered")
+
+# Reader workloads over the `logs` view (orchestrator SQL, MCP, retrieve_context).
+# `{last}` is the newest timestamp in the data set.
+QUERIES = {
+    "count, last hour": "SELECT count(*) FROM logs WHERE timestamp > TIMESTAMP '{last}' - INTERVAL 1 HOUR",
+    "count errors, last 7 days": """
+        SELECT count(*) FROM logs
+        WHERE severity = 'ERROR' AND timestamp > TIMESTAMP '{last}' - INTERVAL 7 DAY
+    """,
+    "daily volume per service": """
+        SELECT service_name, date_trunc('day', timestamp) AS day, count(*) FROM logs GROUP BY 1, 2
+    """,
+    "body search (ILIKE)": "SELECT count(*) FROM logs WHERE body ILIKE '%failed%'",
+    "latest 100 rows (SELECT *)": "SELECT * FROM logs ORDER BY timestamp DESC LIMIT 100",
+    "anchor logs by template_id (JSON)": """
+        SELECT timestamp, service_name, body FROM logs
+        WHERE json_extract_string(context, '$.template_id') IN ('1', '2', '3')
+        ORDER BY timestamp DESC LIMIT 5
+    """,
+    "anchor logs by template_id (column)": """
+        SELECT timestamp, service_name, body FROM logs
+        WHERE template_id IN ('1', '2', '3')
+        ORDER BY timestamp DESC LIMIT 5
+    """,
+    "logs per source file (JSON)": "SELECT context->>'source_file', count(*) FROM logs GROUP BY 1",
+    "logs per source file (column)": "SELECT source_file, count(*) FROM logs GROUP BY 1",
+}
+
+
+def mine_corpus(files, state_dir: str) -> dict:
+    """Parses each file once and mines every row's template (shared by all layouts)."""
+    parser, masker = LogParser(), PIIMasker()
+    miner = LogTemplateMiner(os.path.join(state_dir, "drain3.bin"),
+                             policy=SnapshotPolicy(every_changes=0, every_seconds=0, on_shutdown=False))
+    chunks = {}
+    for path in files:
+        with open(path, "r") as f:
+            lines = f.readlines()
+        for start in range(0, len(lines), BATCH_SIZE):
+            chunk = lines[start:start + BATCH_SIZE]
+            batch = preprocess_lines(parser, masker, chunk)
+            templates = []
+            for body in batch.columns["body"]:
+                result = miner.mine_template(body)
+                templates.append((str(result["cluster_id"]), result["template_mined"]))
+            chunks[(path, start)] = (chunk, templates)
+    miner.close()
+    return chunks
+
+
+def load(db_path: str, storage: str, chunks: dict) -> float:
+    """Loads the mined chunks as the bulk loader would and returns the load time."""
+    db = DuckDBConnector(db_path=db_path, storage=storage)
+    parser, masker = LogParser(), PIIMasker()
+    writer = db.open_writer()
+    inline = not writer.compact
+    start = time.perf_counter()
+    for (path, _), (chunk, templates) in chunks.items():
+        batch = preprocess_lines(parser, masker, chunk)
+        for i, (template_id, template) in enumerate(templates):
+            batch.wrap_template(i, template_id, template, after={"source_file": os.path.basename(path)}, inline=inline)
+        writer.insert_log_batch(batch)
+    if writer.storage == "tiered":
+        result = writer.archive_closed()
+        print(f"   {storage}: {result['rows']:,} rows archived into {result['files']:,} Parquet files")
+    writer.checkpoint()
+    elapsed = time.perf_counter() - start
+    if writer.compact:
+        print(f"   {storage}: {writer.bodies_rebuilt:,} bodies stored as parameters, {writer.bodies_kept:,} kept verbatim")
+    writer.close()
+    return elapsed
+
+
+def archive_mb(path: str) -> float:
+    size = 0
+    for root, _, names in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, name)) for name in names)
+    return size / 1024 / 1024
+
+
+def retention(dbs: dict, days: int) -> dict:
+    """Time to drop everything older than `days`: DELETE + CHECKPOINT (row) vs. directory drop (tiered)."""
+    oldest = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    timings = {}
+    for storage in ("row", "tiered"):
+        writer = dbs[storage].open_writer()
+        conn = writer._connection()
+        start = time.perf_counter()
+        if storage == "row":
+            conn.execute("DELETE FROM logs WHERE timestamp < ?", [oldest])
+        else:
+            writer.archive.retention_days = days
+            writer.archive_closed()
+        writer.checkpoint()
+        timings[storage] = time.perf_counter() - start
+        writer.close()
+    return timings
+
+
+def time_query(db: DuckDBConnector, sql: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.query(sql)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare row vs compact (template-normalised) vs tiered (Parquet archive) log storage.")
+    parser.add_argument("--count", type=int, default=500000, help="Number of generated logs.")
+    parser.add_argument("--days", type=int, default=365, help="Time range in days.")
+    parser.add_argument("--format", type=str, default="standard", choices=["standard", "json", "syslog", "nginx"], help="Log format.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (best is reported).")
+    parser.add_argument("--retention_days", type=int, default=335, help="Retention applied at the end (row vs. tiered).")
+    parser.add_argument("--by_service", action="store_true", help="Also partition the archive by service_name.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_storage_")
+    try:
+        source_dir = os.path.join(work_dir, "landing_zone")
+        generate_logs(output_dir=source_dir, count=args.count, days=args.days, log_format=args.format)
+        files = [os.path.join(source_dir, name) for name in sorted(os.listdir(source_dir))]
+        source_mb = sum(os.path.getsize(path) for path in files) / 1024 / 1024
+        chunks = mine_corpus(files, work_dir)
+
+        dbs, load_s = {}, {}
+        os.environ["LOG_ARCHIVE_BY_SERVICE"] = "1" if args.by_service else "0"
+        for storage in LAYOUTS:
+            path = os.path.join(work_dir, storage, "logs.duckdb")
+            os.makedirs(os.path.dirname(path))
+            load_s[storage] = load(path, storage, chunks)
+            dbs[storage] = DuckDBConnector(db_path=path)
+
+        sql = "SELECT * FROM logs ORDER BY timestamp, service_name, body, context"
+        expected = dbs["row"].query(sql)
+        for storage in LAYOUTS[1:]:
+            assert dbs[storage].query(sql) == expected, f"{storage} storage must read back identically"
+        last = dbs["row"].query("SELECT max(timestamp) FROM logs")[0][0]
+
+        # Used blocks: the file also keeps blocks freed by earlier checkpoints
+        sizes, file_sizes = {}, {}
+        for storage, db in dbs.items():
+            block_size, used_blocks = db.query("SELECT block_size, used_blocks FROM pragma_database_size()")[0]
+            sizes[storage] = block_size * used_blocks / 1024 / 1024
+            file_sizes[storage] = os.path.getsize(db.db_path) / 1024 / 1024
+        templates = dbs["compact"].query("SELECT count(*) FROM log_templates")[0][0]
+        print(f"\n{args.count:,} {args.format} logs over {args.days} days ({source_mb:.1f} MB source, {templates} templates)")
+        print("\n| Layout | Used blocks (MB) | File size (MB) | Parquet archive (MB) | Load time (s) |")
+        print("| :--- | :--- | :--- | :--- | :--- |")
+        for storage in LAYOUTS:
+            archive = archive_mb(os.path.join(os.path.dirname(dbs[storage].db_path), "archive"))
+            print(f"| {storage} | {sizes[storage]:.1f} | {file_sizes[storage]:.1f} | {archive:.1f} | {load_s[storage]:.2f} |")
+        print(f"\nStorage reduction (compact): {1 - sizes['compact'] / sizes['row']:.0%}")
+
+        print("\n| Query | Row (ms) | Compact view (ms) | Tiered view (ms) |")
+        print("| :--- | :--- | :--- | :--- |")
+        for name, query in QUERIES.items():
+            query = query.format(last=last)
+            timings = [time_query(dbs[storage], query, args.repeat) for storage in LAYOUTS]
+            print(f"| {name} | " + " | ".join(f"{ms:,.1f}" for ms in timings) + " |")
+
+        timings = retention(dbs, args.retention_days)
+        print(f"\nRetention ({args.retention_days} days): row DELETE + CHECKPOINT {timings['row']:.2f}s, "
+              f"tiered directory drop {timings['tiered']:.2f}s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
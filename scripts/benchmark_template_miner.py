@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# Add project root to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from drain3 import TemplateMiner
+from drain3.file_persistence import FilePersistence
+from scripts.generate_logs import generate_logs
+from shared.utils.log_parser import LogParser
+from shared.utils.pii_masker import PIIMasker
+from shared.utils.template_miner import LogTemplateMiner, SnapshotPolicy
+
+
+def burst(count: int) -> list:
+    """`count` messages that each create a new cluster (distinct token counts and words)."""
+    return [f"event{i} " + " ".join(f"w{i}x{j}" for j in range(i % 7 + 2)) for i in range(count)]
+
+
+def stock_miner(path: str, messages) -> float:
+    """Seconds to mine the burst with Drain3's FilePersistence (snapshot on every change)."""
+    miner = LogTemplateMiner(os.path.join(os.path.dirname(path), "unused.bin"))
+    miner.close()
+    stock = TemplateMiner(FilePersistence(path), miner.config)
+    start = time.perf_counter()
+    for message in messages:
+        stock.add_log_message(message)
+    return time.perf_counter() - start
+
+
+def policy_miner(path: str, messages, policy: SnapshotPolicy) -> tuple:
+    """(seconds to mine the burst, seconds until the final snapshot is on disk, stats, load seconds)."""
+    miner = LogTemplateMiner(path, policy=policy)
+    start = time.perf_counter()
+    for message in messages:
+        miner.mine_template(message)
+    mined = time.perf_counter() - start
+    miner.close()
+    closed = time.perf_counter() - start
+    stats = miner.stats()
+    restored = LogTemplateMiner(path)
+    assert restored.get_total_clusters() == len(messages)
+    restored.close()
+    return mined, closed, stats, restored.stats()["load_s"]
+
+
+def generated_bodies(work_dir: str, count: int, log_format: str) -> list:
+    """Masked bodies of `scripts/generate_logs.py` output, in file order (what the worker mines)."""
+    sample_dir = os.path.join(work_dir, f"sample_{log_format}")
+    generate_logs(output_dir=sample_dir, count=count, days=30, log_format=log_format)
+    parser, masker = LogParser(), PIIMasker()
+    bodies = []
+    for name in sorted(os.listdir(sample_dir)):
+        with open(os.path.join(sample_dir, name), "r") as f:
+            batch = masker.mask_batch(parser.parse_many(f))
+        bodies.extend(batch.columns["body"])
+    return bodies
+
+
+def cached_vs_uncached(work_dir: str, bodies) -> tuple:
+    """(uncached lines/s, cached lines/s, stats of the cached miner). Results must be identical."""
+    results, rates, stats = [], [], None
+    for cache_size in (0, 10000):
+        miner = LogTemplateMiner(os.path.join(work_dir, f"cache_{cache_size}_{len(bodies)}.bin"),
+                                 policy=SnapshotPolicy(every_changes=0, every_seconds=0, on_shutdown=False),
+                                 cache_size=cache_size)
+        start = time.perf_counter()
+        results.append([miner.mine_template(body) for body in bodies])
+        rates.append(len(bodies) / (time.perf_counter() - start))
+        stats = miner.stats()
+        miner.close()
+    assert results[0] == results[1]
+    return rates[0], rates[1], stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Drain3 state snapshotting during a new-pattern burst.")
+    parser.add_argument("--clusters", type=str, default="1000,5000,20000", help="Comma-separated burst sizes.")
+    parser.add_argument("--lines", type=int, default=100000, help="Generated lines per format for the cache benchmark.")
+    parser.add_argument("--formats", type=str, default="standard,json,syslog,nginx", help="Formats for the cache benchmark.")
+    parser.add_argument("--stock_max", type=int, default=2000, help="Largest burst to run with snapshot-per-change (it is quadratic).")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="logpilot_drain3_")
+    try:
+        print("\n| New clusters | Snapshot per change (s) | Policy: mining (s) | Policy: incl. final write (s) | Snapshots | Avg serialize (ms) | Avg write (ms) | Load (s) |")
+        print("| :--- | :--- | :--- | :--- | :--- | :--- | :--- | :--- |")
+        for count in map(int, args.clusters.split(",")):
+            messages = burst(count)
+            stock = "-"
+            if count <= args.stock_max:
+                stock = f"{stock_miner(os.path.join(work_dir, f'stock_{count}.bin'), messages):.2f}"
+            mined, closed, stats, load_s = policy_miner(
+                os.path.join(work_dir, f"policy_{count}.bin"), messages, SnapshotPolicy(every_changes=1000, every_seconds=60))
+            serialize = stats["serialize_latency_s"]["avg"] * 1000
+            write = stats["write_latency_s"]["avg"] * 1000
+            print(f"| {count:,} | {stock} | {mined:.2f} | {closed:.2f} | {stats['snapshots_saved']} "
+                  f"(+{stats['snapshots_superseded']} superseded) | {serialize:.1f} | {write:.1f} | {load_s:.2f} |")
+
+        print("\n| Format | Lines | Drain3 only (lines/s) | Exact-match cache (lines/s) | Speedup | Hit rate | Invalidations |")
+        print("| :--- | :--- | :--- | :--- | :--- | :--- | :--- |")
+        for log_format in args.formats.split(","):
+            bodies = generated_bodies(work_dir, args.lines, log_format)
+            uncached, cached, stats = cached_vs_uncached(work_dir, bodies)
+            print(f"| {log_format} | {len(bodies):,} | {uncached:,.0f} | {cached:,.0f} | {cached / uncached:.2f}x "
+                  f"| {stats['cache_hit_rate']:.1%} | {stats['cache_invalidations']} |")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,15 +10,17 @@ from typing import List
 # Add project root to python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from shared.log_schema import LogEvent
 from shared.db.duckdb_client import DuckDBConnector
 from shared.utils.log_parser import LogParser
 from shared.utils.template_miner import LogTemplateMiner
 from shared.utils.pii_masker import PIIMasker
+from shared.utils.parallel_pipeline import preprocess_lines
+from shared.utils.compressed_reader import LOG_EXTENSIONS, iter_log_lines
 
 class BulkLoaderJob:
     def __init__(self):
         self.db = DuckDBConnector()
+        self.writer = self.db.open_writer()
         self.miner = LogTemplateMiner(persistence_file="data/state/drain3_state.bin")
         self.parser = LogParser()
         self.pii_masker = PIIMasker()
@@ -28,69 +30,63 @@ class BulkLoaderJob:
         filename = os.path.basename(file_path)
         print(f"📄 Processing file: {filename}")
         
-        batch_size = 100
-        batch = []
+        batch_size = 5000
+        chunk = []
         
         try:
-            with open(file_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    try:
-                        # 1. Parse (Multi-Format)
-                        parsed = self.parser.parse(line)
-                        
-                        # 2. Mask PII
-                        safe_body = self.pii_masker.mask_text(parsed["body"])
-                        
-                        # 3. Mine Template
-                        template = self.miner.mine_template(safe_body)
-                        
-                        # 4. Extract Context
-                        context = parsed.get("context", {})
-                        context["source_file"] = filename
-                        
-                        # Extract standard metadata from context if present
-                        environment = context.get("environment") or context.get("env")
-                        app_id = context.get("app_id")
-                        department = context.get("department") or context.get("dept")
-                        host = context.get("host")
-                        region = context.get("region")
-
-                        event = LogEvent(
-                            timestamp=parsed["timestamp"],
-                            severity=parsed["severity"],
-                            service_name=parsed["service_name"],
-                            body=template,
-                            environment=environment,
-                            app_id=app_id,
-                            department=department,
-                            host=host,
-                            region=region,
-                            context=context
-                        )
-                        
-                        batch.append(event.model_dump())
-                        
-                        if len(batch) >= batch_size:
-                            self.db.insert_batch(batch)
-                            batch = []
-                            sys.stdout.write(".")
-                            sys.stdout.flush()
-                    except Exception as e:
-                        print(f"\n⚠️ Error processing line: {line[:50]}... -> {e}")
-                        continue
+            # Buffered line reads for plain files, streaming decompression for .gz/.bz2/.zst
+            for line in iter_log_lines(file_path):
+                chunk.append(line)
+                if len(chunk) >= batch_size:
+                    self.load_chunk(chunk, file_path)
+                    chunk = []
+                    sys.stdout.write(".")
+                    sys.stdout.flush()
 
             # Insert remaining
-            if batch:
-                self.db.insert_batch(batch)
+            if chunk:
+                self.load_chunk(chunk, file_path)
             print("\n")
             
         except FileNotFoundError:
             print(f"❌ File not found: {file_path}")
 
+    def load_chunk(self, lines: List[str], file_path: str) -> int:
+        """Parses, masks and mines a chunk of lines as one columnar batch and bulk-inserts it."""
+        filename = os.path.basename(file_path)
+
+        # 1. Parse (Multi-Format) + 2. Mask PII
+        batch = preprocess_lines(self.parser, self.pii_masker, lines)
+        for _, line, error in batch.errors:
+            print(f"\n⚠️ Error processing line: {line[:50]}... -> {error}")
+
+        columns = batch.columns
+        inline = not self.writer.compact
+        failed = []
+        for i, body in enumerate(columns["body"]):
+            # 3. Mine Template (a bad line is skipped, not the whole chunk)
+            try:
+                template = self.miner.mine_template(body)
+            except Exception as e:
+                failed.append(i)
+                print(f"\n⚠️ Error processing line: {batch.raw[i][:50]}... -> {e}")
+                continue
+
+            # 4. Extract Context (compact storage keeps the template out of it)
+            context = batch.wrap_template(i, str(template["cluster_id"]), template["template_mined"],
+                                          after={"source_file": filename}, inline=inline)
+
+            # Extract standard metadata from context if present
+            columns["environment"][i] = context.get("environment") or context.get("env")
+            columns["app_id"][i] = context.get("app_id")
+            columns["department"][i] = context.get("department") or context.get("dept")
+            columns["host"][i] = context.get("host")
+            columns["region"][i] = context.get("region")
+
+        if failed:
+            batch = batch.without(failed)
+        return self.writer.insert_log_batch(batch)
+
     def run(self, landing_zone: str = "data/source/landing_zone"):
         print(f"🚀 Starting Phase 1: Bulk Loader Job (Scanning {landing_zone})")
         
@@ -98,18 +94,29 @@ class BulkLoaderJob:
             print(f"❌ Landing zone {landing_zone} does not exist.")
             return
 
-        files = [f for f in os.listdir(landing_zone) if f.endswith(".log")]
+        files = [f for f in os.listdir(landing_zone) if f.endswith(LOG_EXTENSIONS)]
         if not files:
-            print(f"⚠️ No .log files found in {landing_zone}.")
+            print(f"⚠️ No log files found in {landing_zone}.")
             return
 
         for filename in files:
             file_path = os.path.join(landing_zone, filename)
             self.process_file(file_path)
         
-        # Save Miner State
+        # Save Miner State (snapshot + wait for the background write)
         print("💾 Saving Template Miner State...")
         self.miner.save_state()
+        self.miner.flush()
+        if self.writer.storage == "tiered":
+            print("🧊 Archiving closed time buckets to Parquet...")
+            result = self.writer.archive_closed()
+            print(f"   {result['rows']} rows in {result['files']} files")
+        # Files are loaded one after another, so row groups overlap in time
+        print("🗜️ Re-clustering closed rows by timestamp...")
+        result = self.writer.compact_closed()
+        print(f"   {result['rows']} rows, overlapping row groups "
+              f"{result['before']['overlapping']} -> {result['after']['overlapping']}")
+        self.writer.release()
         
         # Verify
         count = self.db.query("SELECT count(*) FROM logs")[0][0]
@@ -117,7 +124,7 @@ class BulkLoaderJob:
         
         print("🔍 Sample JSON Query (Source File Distribution):")
         results = self.db.query("""
-            SELECT context->>'source_file' as file, count(*) as count
+            SELECT source_file as file, count(*) as count
             FROM logs 
             GROUP BY 1
             ORDER BY 2 DESC
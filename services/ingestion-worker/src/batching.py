@@ -0,0 +1,167 @@
+import time
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+from shared.utils.metrics import Histogram, LATENCY_BUCKETS
+
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+# Rough per-row Python object overhead, added to the body length when sizing rows
+ROW_OVERHEAD_BYTES = 256
+
+
+class AdaptiveBatchPolicy:
+    """
+    Decides when a micro-batch is ready: row count, byte size or age,
+    whichever comes first.
+
+    The row target adapts to traffic:
+    - Batches that fill up quickly (load) double the target, up to `max_rows`.
+    - Batches cut by the latency timer (idle trickle) halve it, down to `min_rows`.
+    """
+    def __init__(self, min_rows: int = 100, max_rows: int = 20000,
+                 max_bytes: int = 16 * 1024 * 1024, max_latency_s: float = 1.0):
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_latency_s = max_latency_s
+        self.target_rows = min_rows
+
+    def flush_reason(self, rows: int, nbytes: int, age_s: float) -> Optional[str]:
+        if rows <= 0:
+            return None
+        if rows >= self.target_rows:
+            return "rows"
+        if nbytes >= self.max_bytes:
+            return "bytes"
+        if age_s >= self.max_latency_s:
+            return "latency"
+        return None
+
+    def adapt(self, reason: str, age_s: float):
+        if reason in ("rows", "bytes") and age_s < self.max_latency_s / 2:
+            self.target_rows = min(self.max_rows, self.target_rows * 2)
+        elif reason == "latency":
+            self.target_rows = max(self.min_rows, self.target_rows // 2)
+
+
+class MicroBatcher:
+    """
+    Buffers rows and hands complete batches to `sink` on a background thread.
+
+    Backpressure: `add()` blocks the caller (i.e. the file reader) while the
+    bytes buffered or queued for persistence exceed `max_pending_bytes`, so a
+    slow sink cannot make a large backlog OOM the worker.
+    """
+    def __init__(self, sink: Callable[[List[Any]], None], policy: AdaptiveBatchPolicy = None,
+                 max_pending_bytes: int = 256 * 1024 * 1024):
+        self.sink = sink
+        self.policy = policy or AdaptiveBatchPolicy()
+        self.max_pending_bytes = max_pending_bytes
+
+        self.batch_size_hist = Histogram(BATCH_SIZE_BUCKETS)
+        self.flush_latency_hist = Histogram(LATENCY_BUCKETS)
+        self.backpressure_wait_s = 0.0
+
+        self._current: List[Any] = []
+        self._current_bytes = 0
+        self._current_started = 0.0
+        self._ready: List[Tuple[List[Any], int, str, float]] = []
+        self._pending_bytes = 0
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_bytes
+
+    def add(self, item: Any, nbytes: int):
+        with self._cond:
+            if self._pending_bytes > 0 and self._pending_bytes + nbytes > self.max_pending_bytes:
+                if self._current:
+                    self._cut("backpressure")
+                wait_start = time.perf_counter()
+                while self._pending_bytes > 0 and self._pending_bytes + nbytes > self.max_pending_bytes:
+                    self._cond.wait()
+                self.backpressure_wait_s += time.perf_counter() - wait_start
+
+            if not self._current:
+                self._current_started = time.monotonic()
+                self._cond.notify_all()  # arm the latency timer
+            self._current.append(item)
+            self._current_bytes += nbytes
+            self._pending_bytes += nbytes
+
+            reason = self.policy.flush_reason(
+                len(self._current), self._current_bytes, time.monotonic() - self._current_started
+            )
+            if reason:
+                self._cut(reason)
+
+    def flush(self):
+        """Cuts the current batch and blocks until everything is persisted."""
+        with self._cond:
+            if self._current:
+                self._cut("explicit")
+            while self._ready or self._in_flight:
+                self._cond.wait()
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "target_rows": self.policy.target_rows,
+            "pending_bytes": self._pending_bytes,
+            "queued_batches": len(self._ready),
+            "backpressure_wait_s": round(self.backpressure_wait_s, 3),
+            "batch_size": self.batch_size_hist.snapshot(),
+            "flush_latency_s": self.flush_latency_hist.snapshot(),
+        }
+
+    def _cut(self, reason: str):
+        # Caller holds the lock
+        age = time.monotonic() - self._current_started
+        self._ready.append((self._current, self._current_bytes, reason, age))
+        self._current = []
+        self._current_bytes = 0
+        self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ready and not self._closed:
+                    if self._current:
+                        age = time.monotonic() - self._current_started
+                        if age >= self.policy.max_latency_s:
+                            self._cut("latency")
+                            break
+                        self._cond.wait(timeout=self.policy.max_latency_s - age)
+                    else:
+                        self._cond.wait()
+                if not self._ready and self._closed:
+                    return
+                batch, nbytes, reason, age = self._ready.pop(0)
+                self._in_flight += 1
+
+            start = time.perf_counter()
+            try:
+                self.sink(batch)
+            except Exception as e:
+                print(f"❌ Batch sink failed: {e}")
+            finally:
+                elapsed = time.perf_counter() - start
+                self.batch_size_hist.observe(len(batch))
+                self.flush_latency_hist.observe(elapsed)
+                with self._cond:
+                    self.policy.adapt(reason, age)
+                    self._pending_bytes -= nbytes
+                    self._in_flight -= 1
+                    self._cond.notify_all()
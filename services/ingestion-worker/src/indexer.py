@@ -0,0 +1,151 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional
+
+from shared.utils.metrics import Histogram, LATENCY_BUCKETS
+
+
+class PatternIndexer:
+    """
+    Background stage that embeds new / changed Drain3 patterns into the vector store.
+
+    Embedding runs on CPU and can take seconds for a burst of new templates,
+    so it must never sit on the DuckDB write path. Patterns are queued here
+    and indexed by a dedicated thread:
+    - Coalescing: the queue is keyed by `cluster_id`. A cluster that changes
+      again while still queued only replaces its pending event, so a template
+      that is refined 50 times in a burst is embedded once, in its final form.
+    - Batching: up to `batch_size` patterns per `sink` call, sent once the
+      oldest pending pattern has waited `coalesce_window_s`.
+    - Bounded: `submit()` blocks while `max_queue` distinct clusters are pending.
+    """
+    def __init__(self, sink: Callable[[List[Any]], None], batch_size: int = 64,
+                 coalesce_window_s: float = 0.5, max_queue: int = 10000,
+                 on_error: Optional[Callable[[List[Any], Exception], None]] = None):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.coalesce_window_s = coalesce_window_s
+        self.max_queue = max_queue
+        self.on_error = on_error
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.indexed = 0
+        self.failed = 0
+        self.last_lag_s = 0.0
+        self.index_latency_hist = Histogram(LATENCY_BUCKETS)
+
+        # cluster_id -> (event, first_enqueued_at); insertion order = age order
+        self._pending: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="pattern-indexer", daemon=True)
+        self._thread.start()
+
+    def submit(self, cluster_id: str, event: Any):
+        with self._cond:
+            self.submitted += 1
+            if cluster_id in self._pending:
+                # Keep the original enqueue time (and queue position): lag is honest
+                _, enqueued = self._pending[cluster_id]
+                self._pending[cluster_id] = (event, enqueued)
+                self.coalesced += 1
+                return
+            while len(self._pending) >= self.max_queue and not self._closed:
+                self._cond.wait()
+            self._pending[cluster_id] = (event, time.monotonic())
+            self._cond.notify_all()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def lag_s(self) -> float:
+        """Age of the oldest pattern still waiting to be indexed."""
+        with self._cond:
+            if not self._pending:
+                return 0.0
+            _, enqueued = next(iter(self._pending.values()))
+            return time.monotonic() - enqueued
+
+    def flush(self):
+        """Indexes everything queued (ignoring the coalescing window) and waits."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                self._cond.wait()
+            self._flush_requested = False
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "lag_s": round(self.lag_s(), 3),
+            "last_lag_s": round(self.last_lag_s, 3),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "index_latency_s": self.index_latency_hist.snapshot(),
+        }
+
+    def _take_batch(self) -> Optional[List[tuple]]:
+        # Caller holds the lock. Returns None when nothing is due yet.
+        if not self._pending:
+            return None
+        _, oldest = next(iter(self._pending.values()))
+        due = (
+            self._flush_requested
+            or len(self._pending) >= self.batch_size
+            or time.monotonic() - oldest >= self.coalesce_window_s
+        )
+        if not due:
+            return None
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            _, entry = self._pending.popitem(last=False)
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+                while batch is None:
+                    if self._closed:
+                        return
+                    if self._pending:
+                        _, oldest = next(iter(self._pending.values()))
+                        self._cond.wait(timeout=max(0.0, self.coalesce_window_s - (time.monotonic() - oldest)))
+                    else:
+                        self._cond.wait()
+                    batch = self._take_batch()
+                self._in_flight += 1
+                self._cond.notify_all()  # room in the queue
+
+            events = [event for event, _ in batch]
+            self.last_lag_s = time.monotonic() - batch[0][1]
+            start = time.perf_counter()
+            try:
+                self.sink(events)
+                self.indexed += len(events)
+            except Exception as e:
+                self.failed += len(events)
+                print(f"❌ Pattern indexing failed: {e}")
+                if self.on_error is not None:
+                    self.on_error(events, e)
+            finally:
+                self.index_latency_hist.observe(time.perf_counter() - start)
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
@@ -9,15 +9,24 @@ from typing import Dict, Any, List
 # Add project root to python path to allow importing shared modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from shared.log_schema import LogEvent
+from shared.log_schema import LogBatch, LogEvent
 from shared.db.duckdb_client import DuckDBConnector
 from shared.utils.pii_masker import PIIMasker
 from services.knowledge_base.src.store import KnowledgeStore
 from shared.llm.client import LLMClient
-from llama_index.core import Document
 from shared.utils.template_miner import LogTemplateMiner
 from shared.utils.log_parser import LogParser
+from shared.utils.compressed_reader import LOG_EXTENSIONS, is_compressed
+from shared.utils.parallel_pipeline import ParallelPreprocessor, preprocess_lines
+from shared.utils.metrics import MetricsRegistry
 from janitor import Janitor
+from tailer import FileTailer
+from indexer import PatternIndexer
+from runbooks import RunbookIngestor
+from batching import AdaptiveBatchPolicy, MicroBatcher, ROW_OVERHEAD_BYTES
+
+# Position of the body in a `LogBatch.ROW_FIELDS` row tuple
+BODY = LogBatch.ROW_FIELDS.index("body")
 
 # --- File Watcher Imports ---
 import glob
@@ -27,7 +36,7 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 class LogFileHandler(FileSystemEventHandler):
-    def __init__(self, queue, allowed_extensions=(".log", ".md")):
+    def __init__(self, queue, allowed_extensions=LOG_EXTENSIONS + (".md",)):
         self.queue = queue
         self.allowed_extensions = allowed_extensions
 
@@ -42,11 +51,20 @@ class LogFileHandler(FileSystemEventHandler):
             self.queue.put(event.dest_path)
 
 class FileWatcherConsumer:
-    """Consumes logs from files in a directory using Watchdog."""
-    def __init__(self, source_dir="data/source/landing_zone", processed_dir="data/source/processed"):
+    """
+    Consumes logs from files in a directory using Watchdog.
+    
+    In follow mode (`follow=True`) `.log` files are tailed in place by a
+    `FileTailer` instead, and only whole documents (`.md`) go through the queue.
+    Rotated archives (`.log.gz`, `.log.bz2`, `.log.zst`) are whole-file inputs
+    and are streamed through the decompressor, never inflated to disk.
+    """
+    def __init__(self, source_dir="data/source/landing_zone", processed_dir="data/source/processed", follow: bool = False):
         self.source_dir = source_dir
         self.processed_dir = processed_dir
+        self.follow = follow
         self.file_queue = Queue()
+        extensions = (".md",) if follow else LOG_EXTENSIONS + (".md",)
         
         # Ensure directories exist
         os.makedirs(source_dir, exist_ok=True)
@@ -55,7 +73,7 @@ class FileWatcherConsumer:
         # 1. Scan existing files
         print(f"📂 Scanning {source_dir} for existing files...")
         existing_files = []
-        for ext in ["*.log", "*.md"]:
+        for ext in ["*" + e for e in extensions]:
             existing_files.extend(glob.glob(os.path.join(source_dir, ext)))
             
         for f in sorted(existing_files):
@@ -64,17 +82,22 @@ class FileWatcherConsumer:
             
         # 2. Start Watchdog
         self.observer = Observer()
-        handler = LogFileHandler(self.file_queue)
+        handler = LogFileHandler(self.file_queue, allowed_extensions=extensions)
         self.observer.schedule(handler, source_dir, recursive=False)
         self.observer.start()
         print(f"👀 Watching for new logs/docs in {source_dir}...")
 
     def __iter__(self):
         while True:
-            if self.file_queue.empty():
+            ready = self.poll()
+            if ready is None:
                 time.sleep(1) # Wait for files
                 continue
-                
+            yield ready
+
+    def poll(self):
+        """Returns the next stable (filepath, processed_path) or None if nothing is queued."""
+        while not self.file_queue.empty():
             filepath = self.file_queue.get()
             filename = os.path.basename(filepath)
             processed_path = os.path.join(self.processed_dir, filename)
@@ -92,7 +115,8 @@ class FileWatcherConsumer:
                 print(f"⚠️ Skipping unstable file: {filepath}")
                 continue
                 
-            yield filepath, processed_path
+            return filepath, processed_path
+        return None
 
     def _wait_for_file_stability(self, filepath: str, timeout: int = 5) -> bool:
         """Waits for file size to stop changing."""
@@ -117,20 +141,50 @@ class LogIngestor:
         print("DEBUG: Initializing LogIngestor...")
         
         print("DATA SOURCE: 📁 File Processor (Real-Time Watcher)")
-        self.consumer = FileWatcherConsumer()
+        # INGESTION_MODE=follow tails growing .log files in place instead of
+        # ingesting (and moving) whole files
+        self.follow = os.getenv("INGESTION_MODE", "batch").lower() == "follow"
+        self.consumer = FileWatcherConsumer(follow=self.follow)
             
         self.miner = LogTemplateMiner(persistence_file="data/state/drain3_state.bin")
         print("DEBUG: Initializing KnowledgeStore...")
         self.kb = KnowledgeStore() # ChromaDB (might download models)
         print("DEBUG: KnowledgeStore initialized.")
         self.db = DuckDBConnector() # Acquire DB lock ONLY after heavy init
+        self.writer = self.db.open_writer() # Long-lived bulk-load session (lazy connect)
         self.pii_masker = PIIMasker()
         self.parser = LogParser()
         self.janitor = Janitor(self.kb) # Initialize Janitor
         self.llm_client = LLMClient() 
-        self.batch_size = 5
-        self.batch_buffer = []
-        self.log_event_buffer = [] # Buffer for LogEvent objects
+        # Runbooks: discovery + concurrent, cached card synthesis in the background
+        self.runbooks = RunbookIngestor(
+            self.llm_client, self.kb,
+            max_concurrency=int(os.getenv("RUNBOOK_SYNTHESIS_CONCURRENCY", "4")),
+        )
+        # Parse + Mask fan out to worker processes; mining stays in this process
+        self.preprocessor = ParallelPreprocessor(workers=int(os.getenv("INGESTION_WORKERS", "1")))
+        # Micro-batching: flush on rows / bytes / latency (whichever first),
+        # persisted on a background thread. Reading blocks above the memory cap.
+        self.batcher = MicroBatcher(
+            sink=self._persist_batch,
+            policy=AdaptiveBatchPolicy(
+                min_rows=int(os.getenv("INGESTION_BATCH_MIN_ROWS", "100")),
+                max_rows=int(os.getenv("INGESTION_BATCH_MAX_ROWS", "20000")),
+                max_bytes=int(os.getenv("INGESTION_BATCH_MAX_MB", "16")) * 1024 * 1024,
+                max_latency_s=float(os.getenv("INGESTION_BATCH_MAX_LATENCY_S", "1.0")),
+            ),
+            max_pending_bytes=int(os.getenv("INGESTION_MAX_PENDING_MB", "256")) * 1024 * 1024,
+        )
+        # New/changed patterns are embedded off the DuckDB write path,
+        # coalesced per cluster_id
+        self.indexer = PatternIndexer(
+            sink=self.kb.add_logs,
+            batch_size=int(os.getenv("INDEXER_BATCH_SIZE", "64")),
+            coalesce_window_s=float(os.getenv("INDEXER_COALESCE_WINDOW_S", "0.5")),
+            max_queue=int(os.getenv("INDEXER_MAX_QUEUE", "10000")),
+            on_error=self._on_index_error,
+        )
+        self._init_metrics()
         
         # ==============================================================================
         # ⚙️  Ingestion Pipeline Overview
@@ -138,77 +192,171 @@ class LogIngestor:
         # 1. Parse: Normalize raw text into structured key-value pairs.
         # 2. Mask: Redact sensitive info (IPs, Emails, etc.)
         # 3. Mine: Extract structural templates (Drain3) to group similar logs.
-        # 4. Buffer & Flush: Persist to DuckDB (All Logs) and ChromaDB (Unique Patterns).
+        # 4. Buffer & Flush: Persist to DuckDB (All Logs).
+        # 5. Index: Embed unique patterns into ChromaDB (background stage).
         # ==============================================================================
 
+    def _init_metrics(self):
+        """
+        Hot-path metrics (replaces per-line prints). Exposed on METRICS_PORT
+        (`/metrics`, `/metrics.json`) and summarised every METRICS_DUMP_INTERVAL_S.
+        """
+        m = self.metrics = MetricsRegistry(prefix="logpilot_ingest_")
+        self.lines_total = m.counter("lines_total", "Lines persisted or queued for persistence")
+        self.lines_by_format = m.counter("lines_by_format_total", "Lines per detected log format", label="format")
+        self.errors_total = m.counter("line_errors_total", "Lines that failed parse/mask/mine", label="stage")
+        self.templates_new = m.counter("templates_new_total", "Templates created or changed by Drain3")
+        self.dlq_total = m.counter("dlq_records_total", "Records written to the DLQ", label="error_type")
+        self.mine_hist = m.histogram("mine_latency_seconds")
+        self.insert_hist = m.histogram("insert_latency_seconds")
+        m.register("parse_latency_seconds", self.preprocessor.parse_latency_hist)
+        m.register("mask_latency_seconds", self.preprocessor.mask_latency_hist)
+        m.register("lines_by_source_format_total", self.preprocessor.source_formats)
+        m.register("batch_rows", self.batcher.batch_size_hist)
+        m.register("flush_latency_seconds", self.batcher.flush_latency_hist)
+        m.gauge("batcher_pending_bytes", lambda: self.batcher.pending_bytes)
+        m.gauge("batcher_target_rows", lambda: self.batcher.policy.target_rows)
+        m.gauge("indexer_queue_depth", lambda: self.indexer.queue_depth)
+        m.gauge("indexer_lag_seconds", self.indexer.lag_s)
+        m.register("drain3_serialize_seconds", self.miner.miner.serialize_latency_hist)
+        m.register("drain3_snapshot_write_seconds", self.miner.persistence.write_latency_hist)
+        m.gauge("drain3_pending_changes", lambda: self.miner.miner.changes)
+        m.gauge("drain3_load_seconds", lambda: self.miner.miner.load_s)
+        m.gauge("template_cache_hits", lambda: self.miner.cache_hits)
+        m.gauge("template_cache_misses", lambda: self.miner.cache_misses)
+        m.gauge("template_cache_invalidations", lambda: self.miner.cache_invalidations)
+        m.gauge("template_cache_hit_rate", lambda: self.miner.cache_hit_rate)
+
+        # Per-line logging: every Nth line only (0 = off), or all of them with INGESTION_DEBUG=1
+        self.log_sample_every = 1 if os.getenv("INGESTION_DEBUG") == "1" else int(os.getenv("INGESTION_LOG_SAMPLE_EVERY", "0"))
+
+        port = int(os.getenv("METRICS_PORT", "0"))
+        if port:
+            m.serve(port)
+        interval = float(os.getenv("METRICS_DUMP_INTERVAL_S", "30"))
+        if interval > 0:
+            m.start_reporter(interval, rate_counters=("lines_total",))
+
+    def _log_sampled(self, counter, message: str):
+        """Per-line logging: printed for every `log_sample_every`-th count of `counter` only."""
+        if self.log_sample_every and counter.total() % self.log_sample_every == 0:
+            print(message)
+
     # ... (Keep parse_log and flush_batch methods as is) ...
     # Wait, I cannot use '...' in replacement. I must provide the full content or clever chunks. 
     # Since I'm replacing the whole file logic or large parts, I should be careful.
     # The tool allows replacing a chunk. Let's target the LogFileHandler and FileWatcherConsumer and run loop first.
 
-    def parse_log(self, raw_log: str) -> LogEvent:
-        """Parses, masks, and enriches a raw log line."""
-        # 1. Parser: Extract timestamp, severity, service, body
-        parsed = self.parser.parse(raw_log)
-        
-        # 2. PII Masker: Replace sensitive patterns with <REDACTED>
-        masked = self.pii_masker.mask_context(parsed)
-        
-        # 3. Template Miner (Drain3):
-        #    - Discovers the underlying log structure (e.g. "User * failed to login").
-        #    - Assigns a stable 'cluster_id' for grouping.
-        mining_result = self.miner.mine_template(masked["body"])
-        template_str = mining_result["template_mined"]
-        cluster_id = mining_result["cluster_id"]
-        change_type = mining_result["change_type"]
-        
-        # 4. Create LogEvent
-        return LogEvent(
-            timestamp=masked["timestamp"],
-            severity=masked["severity"],
-            service_name=masked["service_name"],
-            body=masked["body"],
-            # Map top-level optional fields
-            department=masked.get("department"),
-            environment=masked.get("environment"),
-            host=masked.get("host"),
-            region=masked.get("region"),
-            context={
-                "template_id": str(cluster_id), # Store ID as string
-                "template_str": template_str,
-                "change_type": change_type,
-                **masked.get("context", {})
-            }
-        )
+    def process_batch(self, batch: LogBatch, position: tuple = None):
+        """
+        Mines and buffers a parsed & masked batch (columnar, in input order).
+        `position` is the read position reached after the batch's last line;
+        with `batch.offsets`, every row carries its own.
+        """
+        for _, raw_log, error in batch.errors:
+            self.errors_total.inc(label_value="parse")
+            self._log_sampled(self.errors_total, f"⚠️ Failed to process log: {raw_log} -> {error}")
+
+        columns = batch.columns
+        failed = set()
+        clock = time.perf_counter
+        inline = not self.writer.compact  # Compact storage keeps templates out of the context
+        for i, body in enumerate(columns["body"]):
+            # 3. Template Miner (Drain3):
+            #    - Discovers the underlying log structure (e.g. "User * failed to login").
+            #    - Assigns a stable 'cluster_id' for grouping.
+            #    - Always runs in this process, in input order, so IDs are deterministic.
+            try:
+                start = clock()
+                mining_result = self.miner.mine_template(body)
+                self.mine_hist.observe(clock() - start)
+                template_id = str(mining_result["cluster_id"])  # Store ID as string
+                template_str = mining_result["template_mined"]
+                change_type = mining_result["change_type"]
+                batch.wrap_template(i, template_id, template_str, {"change_type": change_type}, inline=inline)
+                # ChromaDB Pattern (Only if Pattern Changed/Created) - queued for the indexer
+                if change_type in ["cluster_created", "cluster_template_changed"]:
+                    self.templates_new.inc()
+                    self._log_sampled(self.templates_new, f"✨ New Pattern Discovered: {template_str}")
+                    self.indexer.submit(template_id, LogEvent(
+                        timestamp=columns["timestamp"][i],
+                        severity=columns["severity"][i],
+                        service_name=columns["service_name"][i],
+                        body=template_str,
+                        context={
+                            "cluster_id": template_id,
+                            "is_pattern": True
+                        }
+                    ))
+            except Exception as e:
+                failed.add(i)
+                self.errors_total.inc(label_value="mine")
+                self._log_sampled(self.errors_total, f"⚠️ Failed to process log: {batch.raw[i]} -> {e}")
+
+        formats: Dict[str, int] = {}
+        for fmt in columns["log_format"]:
+            formats[fmt] = formats.get(fmt, 0) + 1
+        for fmt, count in formats.items():
+            self.lines_by_format.inc(count, label_value=fmt)
+
+        # DuckDB Row (Always). A row carries the read position just past its line,
+        # journaled with the micro-batch that persists it - the batcher may cut
+        # anywhere in this batch. Without per-row offsets only the last row has one.
+        offsets = batch.offsets if position is not None else None
+        last = len(batch) - 1
+        reached = None
+        for i, row in enumerate(batch.rows()):
+            if i in failed:
+                continue
+            self.lines_total.inc()
+            self._log_sampled(self.lines_total, f"✅ Processed: {row[0]} [{row[2]}] {row[BODY]}")
+            if offsets is not None:
+                reached = (*position[:3], *offsets[i], *position[5:])
+            else:
+                reached = position if i == last else None
+            # Blocks here (backpressure) when too much is waiting for persistence
+            self.batcher.add((row, reached), len(row[BODY]) + ROW_OVERHEAD_BYTES)
+        if position is not None and reached != position:
+            # Trailing blank / failed lines (or nothing parsed): still advance the read position
+            self.batcher.add((None, position), ROW_OVERHEAD_BYTES)
 
     def flush_batch(self):
-        """Persists buffered logs to DuckDB and ChromaDB with DLQ support."""
-        if not self.batch_buffer:
-            return
+        """Cuts the current micro-batch and waits until everything buffered is persisted."""
+        self.batcher.flush()
 
-        print(f"💾 Persisting batch of {len(self.batch_buffer)} logs...")
-        
-        # 1. DuckDB (Structured Data) - ALL LOGS
+    def _persist_batch(self, items: List[tuple]):
+        """Persists one micro-batch to DuckDB with DLQ support (batcher thread)."""
+        batch = LogBatch.from_rows([row for row, _ in items if row is not None])
+
+        # Latest read position per source file in this batch (items are in read order)
+        offsets = {}
+        for _, position in items:
+            if position is not None:
+                offsets[position[:2]] = position
+        offsets = list(offsets.values())
+
+        # 1. DuckDB (Structured Data) - ALL LOGS + read offsets, in one transaction
+        start = time.perf_counter()
         try:
-            self.db.insert_batch(self.batch_buffer)
+            self.writer.insert_log_batch(batch, offsets)
+            self.insert_hist.observe(time.perf_counter() - start)
         except Exception as e:
             print(f"❌ DuckDB Insert Failed: {e}")
-            self._write_to_dlq(self.batch_buffer, "duckdb_insert_error")
-
-        # 2. ChromaDB (Vector Data) - ONLY PATTERNS
-        if self.log_event_buffer:
+            self._write_to_dlq([batch.row(i) for i in range(len(batch))], "duckdb_insert_error")
             try:
-                print(f"🧠 Indexing {len(self.log_event_buffer)} new/updated patterns to ChromaDB...")
-                self.kb.add_logs(self.log_event_buffer)
+                # The rows are safe in the DLQ - don't re-read them on restart
+                self.writer.commit_offsets(offsets)
             except Exception as e:
-                print(f"❌ ChromaDB Insert Failed: {e}")
-                # We don't necessarily DLQ vector patterns as they are re-creatable, 
-                # but let's log them to be safe.
-                self._write_to_dlq([e.model_dump() for e in self.log_event_buffer], "chroma_insert_error")
+                print(f"❌ Offset journal update failed: {e}")
 
-        # Clear buffers
-        self.batch_buffer = []
-        self.log_event_buffer = []
+    def _report_indexer(self):
+        stats = self.indexer.stats()
+        print(f"🧠 Pattern indexer: {stats['queue_depth']} queued, lag {stats['lag_s']}s, "
+              f"{stats['indexed']} indexed, {stats['coalesced']} coalesced")
+
+    def _on_index_error(self, patterns: List[LogEvent], error: Exception):
+        # Vector patterns are re-creatable, but keep them to be safe
+        self._write_to_dlq([p.model_dump() for p in patterns], "chroma_insert_error")
 
     def _write_to_dlq(self, data: List[Dict[str, Any]], error_type: str):
         """Writes failed data to a Dead Letter Queue (JSON files)."""
@@ -221,97 +369,22 @@ class LogIngestor:
         try:
             with open(filepath, "w") as f:
                 json.dump(data, f, indent=2, default=str)
+            self.dlq_total.inc(len(data), label_value=error_type)
             print(f"⚠️  Written {len(data)} records to DLQ: {filepath}")
         except Exception as e:
             print(f"💀 CRITICAL: Failed to write to DLQ: {e}")
 
     def process_markdown_smart(self, filepath: str):
         """
-        Intelligently ingests a markdown file by discovering topics and synthesizing knowledge cards.
+        Queues a markdown runbook for smart ingestion (topic discovery + knowledge
+        card synthesis). The LLM work runs on the RunbookIngestor's threads, so
+        log ingestion is never blocked behind it.
         """
-        print(f"🧠 Smart Ingestion: Reading {filepath}...")
         try:
-            with open(filepath, 'r') as f:
-                content = f.read()
-
-            filename = os.path.basename(filepath)
-            
-            # Pass 1: Discovery
-            prompt_discovery = f"""
-            Read the following technical documentation.
-            Identify all unique ERROR CODES or KEY TOPICS defined or explained in the text.
-            
-            IMPORTANT:
-            - Look for headers (e.g., "# Error 503").
-            - Look for TABLES containing error codes (e.g., "| 502 | Bad Gateway |").
-            
-            Return a JSON list of strings only.
-            Example: ["Error 503", "502 Bad Gateway", "Authentication Failure"]
-            
-            Document:
-            {content[:4000]} 
-            (Truncated for discovery if too long)
-            """
-            
-            print("   -> 🕵️  Discovering topics...")
-            topics_json = self.llm_client.generate(prompt_discovery, model_type="smart")
-            
-            # Clean JSON using regex to find the first list
-            import re
-            json_match = re.search(r'\[.*\]', topics_json, re.DOTALL)
-            if json_match:
-                topics_json = json_match.group(0)
-            
-            try:
-                topics = json.loads(topics_json)
-                print(f"   -> Found {len(topics)} topics: {topics}")
-            except:
-                print(f"   ❌ Failed to parse topics JSON: {topics_json}")
-                topics = ["General Content"] # Fallback
-
-            # Pass 2: Synthesis
-            documents = []
-            for topic in topics:
-                print(f"   -> 🧪 Synthesizing knowledge for: {topic}")
-                prompt_synthesis = f"""
-                You are a Technical Writer.
-                Read the document below and extract EVERYTHING related to the topic: "{topic}".
-                Combine scattered information (definitions, causes, fixes) into a single, comprehensive KNOWLEDGE CARD.
-                
-                Format:
-                # {topic}
-                **Definition**: ...
-                **Review**: ...
-                **Fix**: ...
-                
-                Keep it concise and actionable.
-                
-                Document:
-                {content}
-                """
-                
-                card_content = self.llm_client.generate(prompt_synthesis, model_type="smart") # Use smart model for quality
-                
-                # Create Document
-                doc = Document(
-                    text=card_content,
-                    metadata={
-                        "source": filename,
-                        "topic": topic,
-                        "type": "runbook_card"
-                    }
-                )
-                documents.append(doc)
-            
-            # Index
-            if documents:
-                print(f"   -> 💾 Indexing {len(documents)} synthesized cards...")
-                self.kb.add_documents(documents)
-                
+            self.runbooks.submit(filepath)
         except Exception as e:
             print(f"❌ Smart Ingestion Failed: {e}")
 
-
     def run(self):
         print("🚀 Starting Ingestion Worker (Real-Time Mode)...")
         print("🔒 PII Masking Enabled")
@@ -320,10 +393,15 @@ class LogIngestor:
         
         self.janitor.run_cleanup(retention_days=30)
  
+        if self.follow:
+            self.run_follow()
+            return
+
         try:
             # File Watcher Path (Logs + Markdown)
             for filepath, processed_path in self.consumer:
                 filename = os.path.basename(filepath)
+                inode = None
                 
                 if filename.endswith(".md"):
                     # Smart Ingestion for Runbooks
@@ -333,11 +411,15 @@ class LogIngestor:
                     try:
                         # wait slightly to ensure writing is done
                         time.sleep(0.5) 
-                        with open(filepath, 'r') as f:
-                            for line in f:
-                                if line.strip():
-                                    self.process_raw_log(line.strip())
+                        st = os.stat(filepath)
+                        inode = st.st_ino
+                        offset, line_count = self._resume_point(filepath, st)
+                        # Newline-aligned ranges (mmap'd for the pool, buffered line reads inline,
+                        # or a decompressed stream), parsed into one columnar batch per range
+                        for batch, pos in self.preprocessor.imap_file_batches(filepath, offset, line_count):
+                            self.process_batch(batch, (filepath, inode, st.st_size, *pos, st.st_dev))
                         self.flush_batch()
+                        self._report_indexer()
                     except Exception as e:
                         print(f"❌ Error reading log file {filepath}: {e}")
                         
@@ -345,45 +427,113 @@ class LogIngestor:
                 print(f"✅ Finished {filename}, moving to processed.")
                 try:
                     shutil.move(filepath, processed_path)
+                    if inode is not None:
+                        self.writer.clear_offset(filepath, inode)
+                        self.writer.maybe_archive()  # Tiered storage: closed buckets -> Parquet
+                        self.writer.maybe_compact()  # Closed rows re-sorted by timestamp
+                        self.writer.release()
                 except Exception as e:
                         print(f"⚠️ Failed to move file {filepath}: {e}")
 
             # Safe cleanup
+            self.batcher.close()
+            self.miner.close()
+            self.indexer.close()
+            self.runbooks.close()
+            self.metrics.close()
+            self.preprocessor.close()
+            self.writer.close()
             self.db.close()
 
         except KeyboardInterrupt:
             print("\n🛑 Stopping worker...")
-            self.flush_batch()
+            self.batcher.close()
+            self.miner.close()
+            self.indexer.close()
+            self.runbooks.close()
+            self.metrics.close()
+            self.preprocessor.close()
+            self.writer.close()
+            self.db.close()
+
+    def run_follow(self):
+        """
+        Follow Mode: tails every `*.log` in the landing zone (by inode + offset)
+        and ingests appended lines as they arrive. Files are never moved.
+        Markdown runbooks dropped alongside are still ingested as whole files.
+        """
+        print(f"📡 Follow Mode: tailing *.log in {self.consumer.source_dir}")
+        tailer = FileTailer(self.consumer.source_dir, patterns=("*.log",), offset_lookup=self._journaled_offset)
+        idle_since = time.monotonic()
+        try:
+            while True:
+                batches = tailer.poll()
+                if batches:
+                    idle_since = time.monotonic()
+                for path, lines, ends, position, retired in batches:
+                    # Every row carries the file position past its own line (see process_batch)
+                    line_count = position[4] - len(lines)
+                    for batch, pos in self.preprocessor.imap_read_batches(path, lines, ends, line_count):
+                        self.process_batch(batch, (*position[:3], *pos, *position[5:]))
+                    if retired:
+                        # Rotated away and drained: once its last lines are persisted, forget the old inode
+                        self.flush_batch()
+                        self.writer.clear_offset(path, position[1], position[5])
+                if batches:
+                    self.writer.maybe_archive()  # Never idle under steady traffic
+
+                document = self.consumer.poll()
+                if document is not None:
+                    filepath, processed_path = document
+                    self.process_markdown_smart(filepath)
+                    try:
+                        shutil.move(filepath, processed_path)
+                    except Exception as e:
+                        print(f"⚠️ Failed to move file {filepath}: {e}")
+
+                if not batches and document is None:
+                    # Quiet for a while: persist and drop the write lock for readers
+                    if time.monotonic() - idle_since > 2.0:
+                        self.flush_batch()
+                        self.writer.maybe_archive()  # Tiered storage: closed buckets -> Parquet
+                        self.writer.maybe_compact()  # Closed rows re-sorted by timestamp
+                        self.writer.release()
+                    time.sleep(tailer.poll_interval)
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping worker...")
+        finally:
+            tailer.close()
+            self.batcher.close()
+            self.miner.close()
+            self.indexer.close()
+            self.runbooks.close()
+            self.metrics.close()
+            self.preprocessor.close()
+            self.writer.close()
             self.db.close()
             
+    def _resume_point(self, filepath: str, st: os.stat_result):
+        """Returns (offset, line_count) to start reading a file from (0, 0 if new)."""
+        journal = self.writer.get_offset(filepath, st.st_ino)
+        # Offsets into compressed files count decompressed bytes; archives are immutable
+        valid = journal and (journal[2] == st.st_size if is_compressed(filepath) else journal[3] <= st.st_size)
+        if valid:
+            _, _, _, offset, line_count, _ = journal
+            print(f"⏩ Resuming {filepath} at byte {offset} (line {line_count})")
+            return offset, line_count
+        return 0, 0
+
+    def _journaled_offset(self, path: str, inode: int, device: int):
+        # By (device, inode): a file rotated to another followed name resumes where it was
+        journal = self.writer.get_offset(path, inode, device)
+        return (journal[3], journal[4]) if journal else None
+
     def process_raw_log(self, raw_log):
         try:
-            event = self.parse_log(raw_log)
-            # 1. Add to DuckDB Buffer (Always)
-            self.batch_buffer.append(event.model_dump())
-            
-            # 2. Add to ChromaDB Buffer (Only if Pattern Changed/Created)
-            change_type = event.context.get("change_type")
-            if change_type in ["cluster_created", "cluster_template_changed"]:
-                print(f"✨ New Pattern Discovered: {event.context['template_str']}")
-                pattern_event = LogEvent(
-                    timestamp=event.timestamp,
-                    severity=event.severity,
-                    service_name=event.service_name,
-                    body=event.context["template_str"], 
-                    context={
-                        "cluster_id": event.context["template_id"],
-                        "is_pattern": True
-                    }
-                )
-                self.log_event_buffer.append(pattern_event)
-            
-            print(f"✅ Processed: {event.timestamp} [{event.service_name}] {event.body}")
-            
-            if len(self.batch_buffer) >= self.batch_size:
-                self.flush_batch()
+            self.process_batch(preprocess_lines(self.parser, self.pii_masker, [raw_log]))
         except Exception as e:
-            print(f"⚠️ Failed to process log: {raw_log} -> {e}")
+            self.errors_total.inc(label_value="parse")
+            self._log_sampled(self.errors_total, f"⚠️ Failed to process log: {raw_log} -> {e}")
 
 if __name__ == "__main__":
     ingestor = LogIngestor()
@@ -0,0 +1,248 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from llama_index.core import Document
+
+HEADER_RE = re.compile(r"^#{1,6}\s", re.MULTILINE)
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def split_sections(content: str) -> List[str]:
+    """Splits markdown at headers; text before the first header is its own section."""
+    starts = [m.start() for m in HEADER_RE.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(content)]
+    sections = [content[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+    return [s for s in sections if s]
+
+
+def section_hash(section: str) -> str:
+    return hashlib.sha256(section.encode("utf-8")).hexdigest()
+
+
+def sections_for_topic(topic: str, sections: List[str]) -> List[str]:
+    """
+    Sections that mention the topic, wherever they are in the document (a
+    runbook often splits symptoms, cause and fix into separate sections).
+    Codes are what identify a topic ("Error 503" -> "503"). Topics without
+    a code need all of their words to appear. Falls back to the whole
+    document (what the original prompt always sent) if nothing matches.
+    """
+    tokens = set(TOKEN_RE.findall(topic.lower()))
+    codes = {t for t in tokens if any(c.isdigit() for c in t)}
+    required = codes or tokens
+    if not required:
+        return sections
+    matched = [s for s in sections if required <= set(TOKEN_RE.findall(s.lower()))]
+    return matched or sections
+
+
+class RunbookCardCache:
+    """
+    JSON file of synthesised cards keyed by (topic, hashes of its source sections),
+    plus discovered topics keyed by whole-document hash.
+    """
+    def __init__(self, path: str = "data/state/runbook_cards.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._data = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Could not load runbook card cache {path}: {e}")
+
+    @staticmethod
+    def card_key(topic: str, sections: List[str]) -> str:
+        joined = "\n".join([topic] + [section_hash(s) for s in sections])
+        return "card:" + hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._data.get(key)
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = value
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._data)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+class RunbookIngestor:
+    """
+    Smart ingestion of markdown runbooks, off the log ingestion loop.
+
+    `submit()` only reads the file and queues it; a background thread runs
+    the 2-pass strategy (topic discovery, then one knowledge card per topic).
+    - Synthesis calls run concurrently, at most `max_concurrency` at a time.
+    - Each synthesis prompt carries only the sections that mention its topic.
+    - Cards are cached by (topic, section hashes): re-dropping an unchanged or
+      slightly edited runbook only re-synthesises topics whose text changed,
+      and only those cards are re-indexed.
+    """
+    def __init__(self, llm_client, kb, max_concurrency: int = 4, cache: RunbookCardCache = None):
+        self.llm_client = llm_client
+        self.kb = kb
+        self.max_concurrency = max_concurrency
+        self.cache = cache or RunbookCardCache()
+        self._queue: "Queue[Optional[Tuple[str, str]]]" = Queue()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="runbook-synth")
+        self._thread = threading.Thread(target=self._run, name="runbook-ingestor", daemon=True)
+        self._thread.start()
+
+    def submit(self, filepath: str):
+        """Reads a runbook and queues it for smart ingestion (returns immediately)."""
+        print(f"🧠 Smart Ingestion: Reading {filepath}...")
+        with open(filepath, "r") as f:
+            content = f.read()
+        self._queue.put((os.path.basename(filepath), content))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def join(self):
+        """Blocks until every queued runbook has been ingested."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=60)
+        self._pool.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.ingest(*item)
+            except Exception as e:
+                print(f"❌ Smart Ingestion Failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def ingest(self, filename: str, content: str) -> List[Document]:
+        """Runs discovery + (cached, concurrent) synthesis and indexes new cards."""
+        start = time.perf_counter()
+        sections = split_sections(content)
+        topics = self.discover_topics(content)
+
+        futures = []
+        cached = 0
+        for topic in topics:
+            relevant = sections_for_topic(topic, sections)
+            key = self.cache.card_key(topic, relevant)
+            if self.cache.get(key) is not None:
+                cached += 1
+                continue
+            futures.append((topic, key, self._pool.submit(self.synthesize, topic, relevant)))
+
+        documents = []
+        for topic, key, future in futures:
+            try:
+                card_content = future.result()
+            except Exception as e:
+                print(f"   ❌ Synthesis failed for {topic}: {e}")
+                continue
+            self.cache.put(key, card_content)
+            documents.append(Document(
+                text=card_content,
+                metadata={
+                    "source": filename,
+                    "topic": topic,
+                    "type": "runbook_card"
+                }
+            ))
+
+        if documents:
+            print(f"   -> 💾 Indexing {len(documents)} synthesized cards...")
+            for doc in documents:
+                # Replace the previous version of a card whose source text changed
+                self.kb.delete_documents({"$and": [
+                    {"source": filename}, {"topic": doc.metadata["topic"]}, {"type": "runbook_card"}
+                ]})
+            self.kb.add_documents(documents)
+        self.cache.save()
+        print(f"✅ Runbook {filename}: {len(documents)} cards synthesized, {cached} unchanged "
+              f"({time.perf_counter() - start:.1f}s)")
+        return documents
+
+    def discover_topics(self, content: str) -> List[str]:
+        """Pass 1: Discovery (cached per exact document content)."""
+        key = "topics:" + section_hash(content)
+        topics = self.cache.get(key)
+        if topics is not None:
+            return topics
+
+        prompt_discovery = f"""
+            Read the following technical documentation.
+            Identify all unique ERROR CODES or KEY TOPICS defined or explained in the text.
+
+            IMPORTANT:
+            - Look for headers (e.g., "# Error 503").
+            - Look for TABLES containing error codes (e.g., "| 502 | Bad Gateway |").
+
+            Return a JSON list of strings only.
+            Example: ["Error 503", "502 Bad Gateway", "Authentication Failure"]
+
+            Document:
+            {content[:4000]}
+            (Truncated for discovery if too long)
+            """
+
+        print("   -> 🕵️  Discovering topics...")
+        topics_json = self.llm_client.generate(prompt_discovery, model_type="smart")
+
+        # Clean JSON using regex to find the first list
+        json_match = re.search(r'\[.*\]', topics_json, re.DOTALL)
+        if json_match:
+            topics_json = json_match.group(0)
+
+        try:
+            topics = [str(t) for t in json.loads(topics_json)]
+            print(f"   -> Found {len(topics)} topics: {topics}")
+        except Exception:
+            print(f"   ❌ Failed to parse topics JSON: {topics_json}")
+            return ["General Content"]  # Fallback (not cached)
+
+        self.cache.put(key, topics)
+        return topics
+
+    def synthesize(self, topic: str, sections: List[str]) -> str:
+        """Pass 2: Synthesis of one knowledge card from the topic's sections only."""
+        print(f"   -> 🧪 Synthesizing knowledge for: {topic}")
+        source = "\n\n".join(sections)
+        prompt_synthesis = f"""
+                You are a Technical Writer.
+                Read the document below and extract EVERYTHING related to the topic: "{topic}".
+                Combine scattered information (definitions, causes, fixes) into a single, comprehensive KNOWLEDGE CARD.
+
+                Format:
+                # {topic}
+                **Definition**: ...
+                **Review**: ...
+                **Fix**: ...
+
+                Keep it concise and actionable.
+
+                Document:
+                {source}
+                """
+        return self.llm_client.generate(prompt_synthesis, model_type="smart")  # Use smart model for quality
@@ -0,0 +1,209 @@
+import os
+import glob
+import time
+from itertools import accumulate
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Read position after a batch of lines: (path, inode, size, offset, line_count, device)
+Position = Tuple[str, int, int, int, int, int]
+
+# One poll result: (path, new_lines, line_ends, position, retired). `line_ends`
+# holds the byte offset just past each new line. `retired` is set once a
+# rotated-away or deleted inode has been drained to its end.
+PollResult = Tuple[str, List[str], List[int], Position, bool]
+
+
+class TailedFile:
+    """Read position of one followed file, identified by device + inode (not by name)."""
+    def __init__(self, path: str, offset: int = 0, line_count: int = 0):
+        self.path = path
+        self.fh = open(path, "rb")
+        st = os.fstat(self.fh.fileno())
+        self.inode = st.st_ino
+        self.device = st.st_dev
+        self.offset = offset
+        self.line_count = line_count
+        self.fh.seek(offset)
+        self.partial = b""
+
+    @property
+    def identity(self) -> Tuple[int, int]:
+        return self.device, self.inode
+
+    def position(self) -> Position:
+        size = os.fstat(self.fh.fileno()).st_size
+        return self.path, self.inode, size, self.committed_offset, self.line_count, self.device
+
+    @property
+    def committed_offset(self) -> int:
+        """Offset just past the last complete line handed out."""
+        return self.offset - len(self.partial)
+
+    def read_lines(self, max_bytes: int) -> Tuple[List[str], List[int]]:
+        """
+        Reads newly appended bytes and returns the complete lines among them,
+        with the byte offset just past each one.
+        """
+        data = self.fh.read(max_bytes)
+        if not data:
+            return [], []
+        start = self.committed_offset
+        self.offset += len(data)
+        data = self.partial + data
+        *lines, self.partial = data.split(b"\n")
+        self.line_count += len(lines)
+        ends = list(accumulate((len(line) + 1 for line in lines), initial=start))[1:]
+        return [line.decode("utf-8", errors="replace") for line in lines], ends
+
+    def close(self):
+        self.fh.close()
+
+
+class FileTailer:
+    """
+    Follows growing log files (`tail -F` semantics) without moving them.
+
+    Files are tracked by inode and byte offset, so each poll only reads the
+    bytes appended since the previous poll. Rotation is handled:
+    - rename/recreate: the old inode is drained to EOF and returned as its
+      own result (with its own position, marked retired), then the new file
+      is followed from byte 0. If the new name matches a pattern too (e.g.
+      `app.1.log`), the inode keeps being followed under that name instead.
+    - truncate (copytruncate): the offset is reset to 0.
+
+    `offset_lookup(path, inode, device)` may return a previously committed
+    (offset, line_count) so following resumes where the last run stopped,
+    also after the file was renamed.
+    """
+    def __init__(self, source_dir: str, patterns=("*.log",), poll_interval: float = 0.2,
+                 max_read_bytes: int = 4 * 1024 * 1024,
+                 offset_lookup: Callable[[str, int, int], Optional[Tuple[int, int]]] = None):
+        self.source_dir = source_dir
+        self.patterns = patterns
+        self.poll_interval = poll_interval
+        self.max_read_bytes = max_read_bytes
+        self.offset_lookup = offset_lookup
+        self.files: Dict[str, TailedFile] = {}
+
+    def follow(self, path: str, offset: Optional[int] = None):
+        """Starts following `path` at a given byte offset (default: journaled offset or 0)."""
+        if path in self.files:
+            return
+        tailed = TailedFile(path)
+        renamed = self._tracked(tailed.identity)
+        if renamed is not None:
+            # Rotated to a name we also follow: same inode, keep its position
+            tailed.close()
+            moved = self.files.pop(renamed)
+            moved.path = path
+            self.files[path] = moved
+            return
+        if offset is None and self.offset_lookup is not None:
+            resume = self.offset_lookup(path, tailed.inode, tailed.device)
+            if resume and resume[0] <= os.fstat(tailed.fh.fileno()).st_size:
+                offset, tailed.line_count = resume
+                print(f"⏩ Resuming {path} at byte {offset} (line {tailed.line_count})")
+        if offset:
+            tailed.offset = offset
+            tailed.fh.seek(offset)
+        self.files[path] = tailed
+
+    def position(self, path: str) -> Optional[Position]:
+        """Current (path, inode, size, offset, line_count, device) of a followed file."""
+        tailed = self.files.get(path)
+        return tailed.position() if tailed is not None else None
+
+    def poll(self) -> List[PollResult]:
+        """
+        Returns (path, new_lines, line_ends, position, retired) for every file
+        that grew since the last poll, and for every inode retired by rotation
+        or deletion. `position` is the read position after the last of `new_lines`.
+        """
+        for pattern in self.patterns:
+            for path in glob.glob(os.path.join(self.source_dir, pattern)):
+                if path not in self.files:
+                    try:
+                        self.follow(path)
+                    except OSError:
+                        continue  # Vanished between glob and open
+
+        results = []
+        for path, tailed in list(self.files.items()):
+            results.extend(self._poll_file(path, tailed))
+        return results
+
+    def __iter__(self) -> Iterator[PollResult]:
+        while True:
+            batches = self.poll()
+            if not batches:
+                time.sleep(self.poll_interval)
+                continue
+            yield from batches
+
+    def close(self):
+        for tailed in self.files.values():
+            tailed.close()
+        self.files = {}
+
+    def _poll_file(self, path: str, tailed: TailedFile) -> List[PollResult]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+
+        if st is None or (st.st_dev, st.st_ino) != tailed.identity:
+            # Rotated away: drain what is left of the old inode and retire it, then switch
+            lines, ends = self._drain(tailed)
+            results = [(path, lines, ends, tailed.position(), True)]
+            tailed.close()
+            del self.files[path]
+            if st is not None:
+                try:
+                    self.follow(path, offset=0)
+                    new = self.files[path]
+                    lines, ends = new.read_lines(self.max_read_bytes)
+                    if lines:
+                        results.append((path, lines, ends, new.position(), False))
+                except OSError:
+                    pass
+            return results
+
+        if st.st_size < tailed.offset:
+            # Truncated in place
+            print(f"✂️  Truncation detected, rewinding: {path}")
+            tailed.fh.seek(0)
+            tailed.offset = 0
+            tailed.line_count = 0
+            tailed.partial = b""
+
+        if st.st_size == tailed.offset:
+            return []
+        lines, ends = tailed.read_lines(self.max_read_bytes)
+        return [(path, lines, ends, tailed.position(), False)] if lines else []
+
+    def _drain(self, tailed: TailedFile) -> Tuple[List[str], List[int]]:
+        lines, ends = [], []
+        while True:
+            chunk, chunk_ends = tailed.read_lines(self.max_read_bytes)
+            if not chunk and not self._has_more(tailed):
+                break
+            lines.extend(chunk)
+            ends.extend(chunk_ends)
+        if tailed.partial:
+            # Last line of a rotated file may lack a trailing newline
+            lines.append(tailed.partial.decode("utf-8", errors="replace"))
+            tailed.partial = b""
+            tailed.line_count += 1
+            ends.append(tailed.offset)
+        return lines, ends
+
+    def _tracked(self, identity: Tuple[int, int]) -> Optional[str]:
+        """Path a (device, inode) is currently followed under, if any."""
+        for path, tailed in self.files.items():
+            if tailed.identity == identity:
+                return path
+        return None
+
+    @staticmethod
+    def _has_more(tailed: TailedFile) -> bool:
+        return os.fstat(tailed.fh.fileno()).st_size > tailed.offset
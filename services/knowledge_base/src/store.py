@@ -95,6 +95,16 @@ class KnowledgeStore:
             self.index.insert(doc)
         print(f"✅ Added {len(documents)} documents to Knowledge Base.")
 
+    def delete_documents(self, where: dict):
+        """
+        Deletes documents whose metadata matches a ChromaDB `where` filter
+        (e.g. the previous version of a runbook card).
+        """
+        try:
+            self.collection.delete(where=where)
+        except Exception as e:
+            print(f"❌ Error deleting documents: {e}")
+
     def delete_older_than(self, timestamp: float):
         """
         Deletes logs older than the given timestamp.
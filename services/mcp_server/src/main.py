@@ -7,7 +7,7 @@ from fastmcp import FastMCP
 
 # Ensure we can import shared modules
 sys.path.append("/app")
-from shared.db.duckdb_client import DuckDBConnector
+from shared.db.duckdb_client import get_connector
 
 # Initialize FastMCP
 mcp = FastMCP("LogPilot")
@@ -20,9 +20,9 @@ def query_logs(sql_query: str) -> str:
     Executes a read-only SQL query against the logs database.
     """
     try:
-        db = DuckDBConnector(read_only=True)
+        db = get_connector(read_only=True)
         try:
-            result = db.conn.execute(sql_query).fetchall()
+            result = db.query(sql_query)
             return str(result)
         finally:
             db.close()
@@ -51,9 +51,9 @@ def get_recent_logs() -> str:
     Returns the last 50 log entries.
     """
     try:
-        db = DuckDBConnector(read_only=True)
+        db = get_connector(read_only=True)
         try:
-            result = db.conn.execute("SELECT * FROM logs ORDER BY timestamp DESC LIMIT 50").fetchall()
+            result = db.query("SELECT * FROM logs ORDER BY timestamp DESC LIMIT 50")
             return str(result)
         finally:
             db.close()
@@ -66,14 +66,21 @@ def get_schema() -> str:
     Returns the schema of the logs table.
     """
     try:
-        db = DuckDBConnector(read_only=True)
+        db = get_connector(read_only=True)
         try:
-            result = db.conn.execute("DESCRIBE logs").fetchall()
+            result = db.query("DESCRIBE logs")
             return str(result)
         finally:
             db.close()
     except Exception as e:
         return f"Error fetching schema: {e}"
 
+@mcp.resource("logs://read-pool")
+def get_read_pool_metrics() -> str:
+    """
+    Returns the read pool's wait times and snapshot staleness.
+    """
+    return str(get_connector(read_only=True).pool.metrics())
+
 # End of file
 
@@ -51,11 +51,9 @@ def run_query(request: QueryRequest):
         start_time = time.time()
         print("DEBUG: Fetching History...")
         # Fetch History for Context
-        from shared.db.duckdb_client import DuckDBConnector
-        # Use a fresh connector for history operations
-        print("DEBUG: Initializing DuckDBConnector...")
-        db = DuckDBConnector(read_only=False) 
-        print("DEBUG: DuckDBConnector initialized.")
+        from shared.db.duckdb_client import get_connector
+        # Shared connector: schemas were initialised by the first request
+        db = get_connector(read_only=False)
         
         history_rows = db.get_history("default")
         print(f"DEBUG: History fetched: {len(history_rows)} rows.")
@@ -79,7 +77,7 @@ def run_query(request: QueryRequest):
         # Save to History (Session ID = default for demo)
         try:
             # Re-open DB for saving
-            db = DuckDBConnector(read_only=False)
+            db = get_connector(read_only=False)
             # Save User Query
             db.save_message("default", "user", request.query)
             # Save AI Answer
@@ -112,8 +110,8 @@ def get_chat_history():
     Retrieves chat history for the default session.
     """
     try:
-        from shared.db.duckdb_client import DuckDBConnector
-        db = DuckDBConnector(read_only=True)
+        from shared.db.duckdb_client import get_connector
+        db = get_connector(read_only=True)
         history = db.get_history("default")
         db.close()
         # Format: [(role, content, timestamp), ...]
@@ -127,13 +125,9 @@ def get_alerts():
     Retrieves unread alerts.
     """
     try:
-        from shared.db.duckdb_client import DuckDBConnector
-        db = DuckDBConnector(read_only=False) # Need write access?? No, read only is fine for select but we might need lock management
-        # Actually DuckDBConnector handles connection creation. 
-        # But get_history uses _get_history_connection which is independent of read_only flag for main DB?
-        # Yes, _get_history_connection just opens history.duckdb.
-        # But wait, DuckDBConnector init calls _init_alerts_schema logic which uses _get_history_connection.
-        # So it's safe.
+        from shared.db.duckdb_client import get_connector
+        # Alerts live in the history DB, whose schema the first connector initialised
+        db = get_connector(read_only=True)
         alerts = db.get_alerts()
         db.close()
         return alerts
@@ -146,14 +140,27 @@ def read_alert(alert_id: str):
     Marks an alert as read.
     """
     try:
-        from shared.db.duckdb_client import DuckDBConnector
-        db = DuckDBConnector(read_only=False)
+        from shared.db.duckdb_client import get_connector
+        db = get_connector(read_only=False)
         db.mark_alert_read(alert_id)
         db.close()
         return {"status": "ok"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics/db")
+def get_db_metrics():
+    """
+    Read pool metrics: wait times and the age of the snapshot queries are served from
+    (plus the storage broker's commit stats, if one owns the writes).
+    """
+    from shared.db.duckdb_client import get_connector
+    db = get_connector(read_only=True)
+    metrics = db.pool.metrics()
+    if db.broker is not None:
+        metrics["broker"] = db.broker.call("broker.stats")
+    return metrics
+
 @app.get("/metrics")
 def get_metrics():
     """
@@ -11,7 +11,7 @@ from shared.llm.prompt_factory import PromptFactory
 from services.pilot_orchestrator.src.tools.sql_tool import SQLGenerator
 from services.pilot_orchestrator.src.tools.web_search import WebSearchTool
 from services.knowledge_base.src.store import KnowledgeStore
-from shared.db.duckdb_client import DuckDBConnector
+from shared.db.duckdb_client import get_connector
 from datetime import datetime, timedelta
 import re
 
@@ -191,7 +191,7 @@ def validate_sql(state: AgentState) -> AgentState:
         return state
 
     try:
-        db = DuckDBConnector(read_only=True)
+        db = get_connector(read_only=True)
         try:
             # 1. Syntax Check (EXPLAIN)
             db.query(f"EXPLAIN {sql}")
@@ -281,7 +281,7 @@ def execute_sql(state: AgentState) -> AgentState:
         return state
 
     try:
-        db = DuckDBConnector(read_only=True)
+        db = get_connector(read_only=True)
         try:
             print(f"⚡ Executing SQL: {sql}")
             result = db.query(sql)
@@ -351,7 +351,7 @@ def retrieve_context(state: AgentState) -> AgentState:
         # 3. Query DuckDB for ANCHOR matches and fetch WINDOWS
         if template_ids:
             try:
-                db = DuckDBConnector(read_only=True)
+                db = get_connector(read_only=True)
                 # Create a parameterized query for IN clause
                 placeholders = ','.join(['?'] * len(template_ids))
                 
@@ -359,7 +359,7 @@ def retrieve_context(state: AgentState) -> AgentState:
                 sql_anchors = f"""
                     SELECT timestamp, service_name, severity, body 
                     FROM logs 
-                    WHERE json_extract_string(context, '$.template_id') IN ({placeholders})
+                    WHERE template_id IN ({placeholders})
                     ORDER BY timestamp DESC 
                     LIMIT 5
                 """
@@ -459,7 +459,6 @@ def synthesize_answer(state: AgentState) -> AgentState:
     shadow_model = os.getenv("SHADOW_MODEL")
     if shadow_model:
         import threading
-        import duckdb
         import time
         
         def run_shadow(p, original_ans, q):
@@ -472,10 +471,7 @@ def synthesize_answer(state: AgentState) -> AgentState:
                 latency = time.time() - start
                 
                 # Log to metrics DB
-                conn = duckdb.connect("data/target/metrics.duckdb")
-                conn.execute("CREATE TABLE IF NOT EXISTS shadow_logs (timestamp TIMESTAMP, query VARCHAR, shadow_model VARCHAR, answer VARCHAR, latency DOUBLE)")
-                conn.execute("INSERT INTO shadow_logs VALUES (current_timestamp, ?, ?, ?, ?)", (q, shadow_model, shadow_ans, latency))
-                conn.close()
+                get_connector().log_shadow_run(q, shadow_model, shadow_ans, latency)
                 print(f"👻 Shadow Run ({shadow_model}): Completed in {latency:.2f}s")
             except Exception as e:
                 print(f"❌ Shadow Run Failed: {e}")
@@ -6,7 +6,7 @@ import os
 # Add project root to python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from shared.db.duckdb_client import DuckDBConnector
+from shared.db.duckdb_client import get_connector, describe_logs, describe_rollups
 from shared.llm.client import LLMClient
 from shared.llm.prompt_factory import PromptFactory
 
@@ -19,6 +19,8 @@ class SQLGenerator:
         # self.db removed to avoid persistent connection
         self.llm = LLMClient()
         self.prompts = PromptFactory()
+        # `logs` columns incl. the promoted context keys, and the count rollups (rendered into the prompt)
+        self.schema = describe_logs() + "\n" + describe_rollups()
 
     def generate_sql(self, query: str, chat_history: str = "") -> Optional[str]:
         """Generates SQL from a natural language query using LLM."""
@@ -27,7 +29,8 @@ class SQLGenerator:
                 "pilot_orchestrator", 
                 "sql_generator", 
                 query=query,
-                chat_history=chat_history
+                chat_history=chat_history,
+                schema=self.schema
             )
             sql = self.llm.generate(prompt, model_type="fast")
             
@@ -46,8 +49,8 @@ class SQLGenerator:
         
         print(f"🤖 Generated SQL: {sql}")
         try:
-            # Use short-lived connection
-            db = DuckDBConnector(read_only=True)
+            # Shared handle: each query still uses a short-lived connection
+            db = get_connector(read_only=True)
             try:
                 results = db.query(sql)
                 return results
@@ -13,9 +13,7 @@ from shared.llm.client import LLMClient
 
 class SentryService:
     def __init__(self):
-        self.db = DuckDBConnector()
-        # Initialize alerts schema just in case
-        self.db._init_alerts_schema()
+        self.db = DuckDBConnector()  # Initialises the alerts schema (or the storage broker does)
         self.check_interval = 10 # Check every 10s for demo purposes (usually 60m)
         self.threshold_ratio = 1.15 # 15% increase
         self.running = True
@@ -31,29 +29,23 @@ class SentryService:
             time.sleep(self.check_interval)
 
     def check_anomalies(self):
-        conn = self.db._get_connection()
-        
-        # 1. Get error count for last window (e.g., last 1 minute for demo)
-        now_query = """
-            SELECT COUNT(*) 
-            FROM logs 
-            WHERE 
-                timestamp > (NOW() - INTERVAL 1 MINUTE)
-                AND severity IN ('ERROR', 'CRITICAL', 'FATAL')
-        """
-        current_errors = conn.execute(now_query).fetchone()[0]
-        
-        # 2. Get baseline (previous 5 minutes avg)
-        baseline_query = """
-            SELECT COUNT(*) / 5.0
-            FROM logs 
+        # Per-minute error counts come from the rollup (a few rows instead of a scan of `logs`).
+        # The view also counts the rows stored since the writer's last checkpoint, so the window is current.
+        # Buckets are UTC, like the stored timestamps.
+        # 1. Error count for the last complete minute
+        # 2. Baseline: average of the 5 minutes before it
+        window_query = """
+            WITH minute AS (SELECT date_trunc('minute', NOW() AT TIME ZONE 'UTC') AS current)
+            SELECT
+                coalesce(sum(count) FILTER (WHERE bucket >= current - INTERVAL 1 MINUTE), 0),
+                coalesce(sum(count) FILTER (WHERE bucket < current - INTERVAL 1 MINUTE), 0) / 5.0
+            FROM log_rollup_1m, minute
             WHERE 
-                timestamp > (NOW() - INTERVAL 6 MINUTE)
-                AND timestamp <= (NOW() - INTERVAL 1 MINUTE)
+                bucket >= current - INTERVAL 6 MINUTE
+                AND bucket < current
                 AND severity IN ('ERROR', 'CRITICAL', 'FATAL')
         """
-        avg_errors = conn.execute(baseline_query).fetchone()[0]
-        conn.close()
+        current_errors, avg_errors = self.db.query(window_query)[0]
         
         # Avoid division by zero
         if avg_errors == 0:
@@ -77,12 +69,7 @@ class SentryService:
         analysis = "Potential service degradation. Immediate investigation recommended."
         
         # 4. Save to DB
-        conn = self.db._get_history_connection()
-        conn.execute("""
-            INSERT INTO alerts (id, timestamp, severity, service, message, analysis, is_read)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (alert_id, datetime.now(), 'critical', service, message, analysis, False))
-        conn.close()
+        self.db.insert_alert(alert_id, datetime.now(), 'critical', service, message, analysis)
         
         print(f"✅ Alert {alert_id} saved.")
 
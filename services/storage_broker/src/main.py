@@ -0,0 +1,369 @@
+import sys
+import os
+import time
+import queue
+import argparse
+import threading
+import socketserver
+from typing import Any, Callable, Dict, List, Optional
+
+import duckdb
+
+# Add project root to python path to allow importing shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
+
+from shared.db.duckdb_client import DuckDBConnector, METRICS_PATH, SHADOW_LOGS_DDL, WRITE_SQL
+from shared.db.broker import recv_frame, send_frame, decode_table
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - required by the broker
+    pa = None
+
+
+class Request:
+    """One client request, answered by the committer thread that applies it."""
+    def __init__(self, op: str, header: Dict[str, Any], table=None):
+        self.op = op
+        self.header = header
+        self.table = table
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+
+    def finish(self, result: Any = None, error: Optional[Exception] = None):
+        self.result, self.error = result, error
+        self.done.set()
+
+
+class GroupCommitter:
+    """
+    Owns one database: a single thread applies every request for it, in
+    arrival order. Whatever queued up while the previous commit ran is taken
+    at once, and consecutive requests of a groupable op are committed by
+    `commit_group` in one transaction. If that fails, they are retried one
+    by one, so a bad request only fails its own client.
+
+    `on_idle` runs once after `idle_s` without requests (e.g. to drop the
+    file lock so tools outside the broker can open the database).
+    """
+    def __init__(self, name: str, groupable: tuple, commit_group: Callable[[List[Request]], List[Any]],
+                 apply_one: Callable[[Request], Any], on_idle: Callable[[], None] = None,
+                 commit_window_s: float = 0.0, idle_s: float = 2.0):
+        self.name = name
+        self.groupable = groupable
+        self.commit_group = commit_group
+        self.apply_one = apply_one
+        self.on_idle = on_idle
+        self.commit_window_s = commit_window_s
+        self.idle_s = idle_s
+        self._queue: "queue.Queue[Optional[Request]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"broker-{name}", daemon=True)
+        # Metrics
+        self.requests = 0
+        self.commits = 0
+        self.group_max = 0
+        self.failed = 0
+        self.commit_s = 0.0
+        self._thread.start()
+
+    def submit(self, request: Request) -> Request:
+        self._queue.put(request)
+        request.done.wait()
+        return request
+
+    def _drain(self, first: Request) -> List[Request]:
+        pending = [first]
+        if self.commit_window_s:
+            time.sleep(self.commit_window_s)  # Let concurrent clients join the group
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                return pending
+
+    def _run(self):
+        active = False
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_s)
+            except queue.Empty:
+                if active and self.on_idle is not None:
+                    try:
+                        self.on_idle()
+                    except Exception as e:
+                        print(f"⚠️ Broker {self.name}: idle release failed: {e}")
+                active = False
+                continue
+            if first is None:
+                return
+            active = True
+            pending = self._drain(first)
+            stop = None in pending
+            pending = [request for request in pending if request is not None]
+            self.requests += len(pending)
+            i = 0
+            while i < len(pending):
+                j = i + 1
+                if pending[i].op in self.groupable:
+                    while j < len(pending) and pending[j].op in self.groupable:
+                        j += 1
+                self._apply(pending[i:j])
+                i = j
+            if stop:
+                return
+
+    def _apply(self, group: List[Request]):
+        start = time.perf_counter()
+        try:
+            if group[0].op in self.groupable:
+                results = self.commit_group(group)
+                self.commits += 1
+                self.group_max = max(self.group_max, len(group))
+                self.commit_s += time.perf_counter() - start
+            else:
+                results = [self.apply_one(group[0])]
+        except Exception as e:
+            if len(group) > 1:
+                for request in group:
+                    self._apply([request])
+                return
+            self.failed += 1
+            group[0].finish(error=e)  # Only this client sees the error
+            return
+        for request, result in zip(group, results):
+            request.finish(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "commits": self.commits,
+            "group_avg": round(self.requests / self.commits, 2) if self.commits else 0.0,
+            "group_max": self.group_max,
+            "failed": self.failed,
+            "commit_ms_avg": round(self.commit_s / self.commits * 1000, 3) if self.commits else 0.0,
+        }
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class StorageBroker:
+    """
+    Single writer for the logs, history and metrics databases.
+
+    DuckDB allows one writing process per file, so the ingestion worker, the
+    bulk loader, Sentry and the orchestrator used to take turns on the file
+    lock (retrying, or failing history writes outright). With the broker
+    running, they send their writes over a Unix socket instead (see
+    `BrokerClient`) and get an ack once it is committed. Each database has
+    one `GroupCommitter`: log batches that arrive together become one
+    INSERT (with all their offsets), and chat messages, alerts and shadow
+    runs share one transaction per group.
+    """
+    def __init__(self, socket_path: str, db_path: str = "data/target/logs.duckdb",
+                 history_path: str = "data/target/history.duckdb", metrics_path: str = METRICS_PATH,
+                 commit_window_s: float = 0.0, idle_release_s: float = 2.0):
+        if pa is None:
+            raise ImportError("The storage broker needs pyarrow")
+        self.socket_path = socket_path
+        self.metrics_path = metrics_path
+        # Schemas and catalog are initialised here, before any client connects
+        self.db = DuckDBConnector(db_path=db_path, history_path=history_path, broker_socket="")
+        self.writer = self.db.open_writer()
+        self._history = None
+        self._metrics = None
+        self.logs = GroupCommitter("logs", ("logs.insert",), self._insert_logs, self._logs_op,
+                                   on_idle=self._release_logs, commit_window_s=commit_window_s,
+                                   idle_s=idle_release_s)
+        self.history = GroupCommitter("history", ("history.save_message", "history.insert_alert",
+                                                  "history.mark_alert_read"),
+                                      lambda group: self._write(self._history_conn(), group), self._history_op,
+                                      on_idle=self._release_history, commit_window_s=commit_window_s,
+                                      idle_s=idle_release_s)
+        self.metrics = GroupCommitter("metrics", ("metrics.shadow_log",),
+                                      lambda group: self._write(self._metrics_conn(), group), self._unknown_op,
+                                      on_idle=self._release_metrics, commit_window_s=commit_window_s,
+                                      idle_s=idle_release_s)
+        self.committers = {"logs": self.logs, "history": self.history, "metrics": self.metrics}
+        self.server: Optional[socketserver.ThreadingUnixStreamServer] = None
+
+    # --- logs -------------------------------------------------------------
+
+    def _insert_logs(self, group: List[Request]) -> List[int]:
+        tables = [request.table for request in group]
+        offsets = [tuple(offset) for request in group for offset in request.header.get("offsets") or []]
+        templates = None
+        if any(request.header.get("templates") for request in group):
+            templates = []
+            for request, table in zip(group, tables):
+                given = request.header.get("templates") or [None] * table.num_rows
+                templates += [tuple(template) if template else None for template in given]
+        table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+        self.writer.insert_columns(table, offsets, templates)
+        return [table.num_rows for table in tables]
+
+    def _logs_op(self, request: Request) -> Any:
+        op, header = request.op, request.header
+        if op == "logs.info":
+            return {"storage": self.writer.storage, "rows_written": self.writer.rows_written}
+        if op == "logs.get_offset":
+            return self.writer.get_offset(header["path"], header["inode"], header.get("device"))
+        if op == "logs.clear_offset":
+            return self.writer.clear_offset(header["path"], header["inode"], header.get("device"))
+        if op == "logs.archive_closed":
+            return self.writer.archive_closed(header.get("now"))
+        if op == "logs.maybe_archive":
+            return self.writer.maybe_archive()
+        if op == "logs.compact_closed":
+            return self.writer.compact_closed(header.get("now"))
+        if op == "logs.maybe_compact":
+            return self.writer.maybe_compact()
+        if op == "logs.checkpoint":
+            return self.writer.checkpoint()
+        if op == "logs.publish_snapshot":
+            return self.writer.publish_snapshot(force=header.get("force", False))
+        if op == "logs.release":
+            return self.writer.release()
+        self._unknown_op(request)
+
+    def _release_logs(self):
+        self.writer.release()
+        self.db.refresh_catalog()
+
+    # --- history / metrics ------------------------------------------------
+
+    def _history_conn(self):
+        if self._history is None:
+            self._history = duckdb.connect(self.db.history_path)
+        return self._history
+
+    def _metrics_conn(self):
+        if self._metrics is None:
+            os.makedirs(os.path.dirname(self.metrics_path) or ".", exist_ok=True)
+            self._metrics = duckdb.connect(self.metrics_path)
+            self._metrics.execute(SHADOW_LOGS_DDL)
+        return self._metrics
+
+    @staticmethod
+    def _write(conn, group: List[Request]) -> List[None]:
+        """Runs a group of small writes in one transaction."""
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            for request in group:
+                conn.execute(WRITE_SQL[request.op], request.header["params"])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [None] * len(group)
+
+    def _history_op(self, request: Request) -> Any:
+        op, header = request.op, request.header
+        if op == "history.get_history":
+            rows = self._history_conn().execute(
+                "SELECT role, content, timestamp FROM chat_history WHERE session_id = ? ORDER BY timestamp ASC",
+                [header.get("session_id", "default")]
+            ).fetchall()
+            return [list(row) for row in rows]
+        if op == "history.get_alerts":
+            return self.db.get_alerts(header.get("unread_only", True))
+        self._unknown_op(request)
+
+    def _release_history(self):
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+    @staticmethod
+    def _unknown_op(request: Request):
+        raise ValueError(f"Unknown op: {request.op}")
+
+    def _release_metrics(self):
+        if self._metrics is not None:
+            self._metrics.close()
+            self._metrics = None
+
+    # --- server -----------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {name: committer.stats() for name, committer in self.committers.items()}
+        stats["logs"]["rows_written"] = self.writer.rows_written
+        stats["logs"]["snapshots_published"] = self.writer.snapshots_published
+        return stats
+
+    def handle(self, header: Dict[str, Any], body: bytes) -> Any:
+        op = header.get("op", "")
+        if op == "broker.stats":
+            return self.stats()
+        committer = self.committers.get(op.split(".", 1)[0])
+        if committer is None:
+            raise ValueError(f"Unknown op: {op}")
+        # Decoded on the connection's thread, while the committer works on earlier requests
+        request = committer.submit(Request(op, header, decode_table(body) if body else None))
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def serve_forever(self):
+        broker = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header, body = recv_frame(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    try:
+                        reply = {"ok": True, "result": broker.handle(header, body)}
+                    except Exception as e:
+                        reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                    send_frame(self.request, reply)
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # Left over by a previous run
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self.server.daemon_threads = True
+        print(f"🗄️ Storage broker listening on {self.socket_path} (logs: {self.db.db_path})")
+        self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        for committer in self.committers.values():
+            committer.close()
+        self.writer.close()
+        self._release_history()
+        self._release_metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-writer storage broker for the DuckDB databases.")
+    parser.add_argument("--socket", default=os.getenv("LOG_BROKER_SOCKET", "data/target/broker.sock"))
+    parser.add_argument("--db_path", default="data/target/logs.duckdb")
+    parser.add_argument("--history_path", default="data/target/history.duckdb")
+    parser.add_argument("--metrics_path", default=METRICS_PATH)
+    parser.add_argument("--commit_window_s", type=float, default=float(os.getenv("LOG_BROKER_COMMIT_WINDOW_S", "0")),
+                        help="Extra wait before each commit so more requests join the group.")
+    parser.add_argument("--idle_release_s", type=float, default=float(os.getenv("LOG_BROKER_IDLE_RELEASE_S", "2")),
+                        help="Idle time after which the broker releases its file locks.")
+    args = parser.parse_args()
+
+    broker = StorageBroker(args.socket, args.db_path, args.history_path, args.metrics_path,
+                           commit_window_s=args.commit_window_s, idle_release_s=args.idle_release_s)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping storage broker...")
+    finally:
+        broker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import socket
+import struct
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - only log batches need Arrow
+    pa = None
+
+# Frame: header length + body length (network order), the JSON header, the body
+FRAME_PREFIX = struct.Struct("!II")
+
+
+class BrokerError(RuntimeError):
+    """A request the storage broker received but could not apply."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Storage broker connection closed")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+# JSON has no date types: they travel tagged, and `recv_frame` restores them, so
+# results through the broker compare equal to the direct connector's
+_DATE_TYPES = {"__datetime__": datetime.fromisoformat, "__date__": date.fromisoformat}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _json_object(value: Dict[str, Any]) -> Any:
+    if len(value) == 1:
+        for tag, parse in _DATE_TYPES.items():
+            if tag in value:
+                return parse(value[tag])
+    return value
+
+
+def send_frame(sock: socket.socket, header: Dict[str, Any], body: bytes = b""):
+    head = json.dumps(header, default=_json_default).encode()
+    sock.sendall(FRAME_PREFIX.pack(len(head), len(body)) + head + body)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    head_size, body_size = FRAME_PREFIX.unpack(_recv_exact(sock, FRAME_PREFIX.size))
+    header = json.loads(_recv_exact(sock, head_size), object_hook=_json_object)
+    return header, _recv_exact(sock, body_size) if body_size else b""
+
+
+def encode_table(table) -> bytes:
+    """Arrow IPC stream of a log batch (the broker scans it without a row-by-row decode)."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_table(body: bytes):
+    return pa.ipc.open_stream(body).read_all()
+
+
+class BrokerClient:
+    """
+    Connection to the storage broker (`services/storage_broker`) over its Unix
+    socket. Calls are serialized per client and block until the broker has
+    committed the request (or failed it, raising `BrokerError`).
+
+    A request is never resent once written, so a lost ack cannot apply it
+    twice. Only connecting is retried, for `connect_timeout_s`, while the
+    broker starts.
+    """
+    def __init__(self, socket_path: str, connect_timeout_s: float = 60.0):
+        self.socket_path = socket_path
+        self.connect_timeout_s = connect_timeout_s
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        # Metrics
+        self.calls = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            start = time.monotonic()
+            while True:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    sock.connect(self.socket_path)
+                    break
+                except OSError:
+                    sock.close()
+                    if time.monotonic() - start > self.connect_timeout_s:
+                        raise
+                    time.sleep(0.5)
+            self._sock = sock
+        return self._sock
+
+    def call(self, op: str, body: bytes = b"", **fields) -> Any:
+        with self._lock:
+            sock = self._connect()
+            start = time.perf_counter()
+            try:
+                send_frame(sock, {"op": op, **fields}, body)
+                header, _ = recv_frame(sock)
+            except OSError:
+                self.close()
+                raise
+            waited = time.perf_counter() - start
+            self.calls += 1
+            self.wait_s_total += waited
+            self.wait_s_max = max(self.wait_s_max, waited)
+        if not header.get("ok"):
+            raise BrokerError(header.get("error", "unknown error"))
+        return header.get("result")
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
@@ -1,18 +1,390 @@
 import duckdb
 import json
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Optional, Set, Tuple
 import os
 import time
+import hashlib
+import threading
+from datetime import datetime
+
+from shared.log_schema import LogBatch
+from shared.db.log_archive import LogArchive
+from shared.db.log_compaction import LogCompactor
+from shared.db.read_pool import ReadPool, publish_snapshot, snapshot_dir
+from shared.db.broker import BrokerClient, encode_table
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pandas fallback
+    pa = None
+
+# Column order of the `logs` table (also the order of the bulk-load batch)
+LOG_COLUMNS = LogBatch.COLUMNS
+
+# Storage layouts: "row" (one `logs` table), "compact" (template-normalised
+# `log_rows` + `log_templates`, read through a `logs` view) or "tiered"
+# (`logs_hot` + Parquet archive, see `LogArchive`). LOG_STORAGE only applies to
+# a new database (and upgrades "row" to "tiered"); otherwise the layout is kept.
+STORAGE_MODES = ("row", "compact", "tiered")
+# Table the writer inserts into, per layout
+STORAGE_TABLES = {"row": "logs", "compact": "log_rows", "tiered": "logs_hot"}
+
+# Column order of `log_rows` (compact storage): `body` is NULL when
+# `template_key` + `params` rebuild it exactly
+COMPACT_COLUMNS = (
+    "timestamp", "severity", "service_name", "trace_id", "template_key", "params", "body",
+    "environment", "app_id", "department", "host", "region", "context"
+)
+
+# Drain3's wildcard token
+WILDCARD = "<*>"
+
+# Context keys promoted to typed columns at insert time (LOG_HOT_KEYS, comma
+# separated "key" or "key:TYPE"), so filters and GROUP BYs on them read a
+# column instead of parsing every row's context JSON
+DEFAULT_HOT_KEYS = "template_id,change_type,source_file"
+HOT_KEY_TYPES = ("VARCHAR", "BIGINT", "DOUBLE", "BOOLEAN", "TIMESTAMP")
+HOT_KEY_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# (column / context key, DuckDB type)
+HotColumn = Tuple[str, str]
+
+# Log counts per (bucket, service_name, severity, template_id), brought up to
+# date by the writer at each checkpoint: table -> bucket width
+ROLLUPS = {"log_rollup_1m": "minute", "log_rollup_1h": "hour", "log_rollup_1d": "day"}
+# Databases whose rollup tables this process has checked (see `DuckDBWriter._connection`)
+_rollups_checked: Set[str] = set()
+
+# Read position of a source file: (path, inode, size, offset, line_count, device)
+FileOffset = Tuple[str, int, int, int, int, int]
+
+# Service catalog loaded into `system_catalog` (relative to the working directory)
+CATALOG_PATH = "data/system_catalog.csv"
+# Shadow-mode runs and evaluation results
+METRICS_PATH = "data/target/metrics.duckdb"
+SHADOW_LOGS_DDL = ("CREATE TABLE IF NOT EXISTS shadow_logs "
+                   "(timestamp TIMESTAMP, query VARCHAR, shadow_model VARCHAR, answer VARCHAR, latency DOUBLE)")
+
+# Small writes by op name (also the storage broker's ops for them)
+WRITE_SQL = {
+    "history.save_message": "INSERT INTO chat_history (session_id, role, content) VALUES (?, ?, ?)",
+    "history.insert_alert": "INSERT INTO alerts (id, timestamp, severity, service, message, analysis, is_read) "
+                            "VALUES (?, ?, ?, ?, ?, ?, FALSE)",
+    "history.mark_alert_read": "UPDATE alerts SET is_read = TRUE WHERE id = ?",
+    "metrics.shadow_log": "INSERT INTO shadow_logs VALUES (current_timestamp, ?, ?, ?, ?)",
+}
+
+# Per database: (mtime_ns, size, sha256) of the catalog CSV last loaded by this process
+_catalog_loaded: Dict[str, tuple] = {}
+
+# Shared connectors handed out by `get_connector`, per (database, read_only)
+_connectors: Dict[tuple, "DuckDBConnector"] = {}
+_connectors_lock = threading.Lock()
+
+
+def connect_with_retry(db_path: str, read_only: bool = False):
+    """Opens a DuckDB connection, retrying while another process holds the file lock."""
+    # Wait for DB file to exist if read-only
+    if read_only:
+        start_wait = time.time()
+        while not os.path.exists(db_path):
+            if time.time() - start_wait > 60:
+                 raise TimeoutError(f"Timed out waiting for {db_path}")
+            time.sleep(1)
+            
+    max_retries = 30
+    for i in range(max_retries):
+        try:
+            if read_only:
+                return duckdb.connect(db_path, read_only=True, config={'access_mode': 'READ_ONLY'})
+            else:
+                return duckdb.connect(db_path)
+        except Exception as e:
+            # If locked, wait and retry
+            if "lock" in str(e).lower() or "read-only" in str(e).lower():
+                if i < max_retries - 1:
+                    time.sleep(0.5) 
+                else:
+                    raise e
+            else:
+                raise e
+
+
+def parse_hot_keys(spec: Optional[str] = None) -> List[HotColumn]:
+    """Parses a hot-key spec (default: `LOG_HOT_KEYS`)."""
+    if spec is None:
+        spec = os.getenv("LOG_HOT_KEYS", DEFAULT_HOT_KEYS)
+    columns = []
+    for item in spec.split(","):
+        name, _, col_type = item.strip().partition(":")
+        if not name:
+            continue
+        col_type = col_type.strip().upper() or "VARCHAR"
+        if not HOT_KEY_NAME.match(name) or name in LOG_COLUMNS or name in COMPACT_COLUMNS:
+            raise ValueError(f"Invalid hot key: {name}")
+        if col_type not in HOT_KEY_TYPES:
+            raise ValueError(f"Unsupported type for hot key {name}: {col_type}")
+        columns.append((name, col_type))
+    return columns
+
+
+def hot_column_sql(name: str, col_type: str, context: str = "context") -> str:
+    """SQL that reads a hot key out of a context JSON expression (NULL if absent or not castable)."""
+    expr = f"json_extract_string({context}, '$.{name}')"
+    return expr if col_type == "VARCHAR" else f"TRY_CAST({expr} AS {col_type})"
+
+
+def table_columns(conn, table: str) -> List[HotColumn]:
+    """(name, type) of a table's columns, in order."""
+    return [tuple(row) for row in conn.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_name = ? AND table_schema = 'main' ORDER BY ordinal_position", [table]
+    ).fetchall()]
+
+
+def migrate_hot_columns(conn, table: str, columns: List[HotColumn]) -> List[str]:
+    """
+    Adds the hot columns a table is missing and backfills them from the
+    stored contexts (one pass per new column). Returns the added names.
+    Columns are never dropped: a key removed from the config stays, but new
+    rows leave it NULL.
+    """
+    existing = {name for name, _ in table_columns(conn, table)}
+    added = []
+    for name, col_type in columns:
+        if name in existing:
+            continue
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+            conn.execute(f"UPDATE {table} SET {name} = {hot_column_sql(name, col_type)}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        added.append(name)
+    return added
+
+
+def describe_logs(columns: Optional[List[HotColumn]] = None) -> str:
+    """The `logs` schema as shown to the SQL generator (from the config, no connection)."""
+    described = [
+        "timestamp (TIMESTAMP)", "severity (VARCHAR)", "service_name (VARCHAR)", "trace_id (VARCHAR)",
+        "body (VARCHAR)", "environment (VARCHAR)", "app_id (VARCHAR)", "department (VARCHAR)",
+        "host (VARCHAR)", "region (VARCHAR)", "context (VARCHAR, JSON text)"
+    ]
+    described += [f"{name} ({col_type}, = context->>'{name}')"
+                  for name, col_type in (parse_hot_keys() if columns is None else columns)]
+    return f"Table: logs\nColumns: {', '.join(described)}"
+
+
+# Rollup input: the stored rows of a layout (`logs` covers the tiered archive too; compact joins its templates)
+ROLLUP_SOURCE = ("SELECT timestamp, service_name, severity, "
+                 "json_extract_string(context, '$.template_id') AS template_id FROM {table}")
+COMPACT_ROLLUP_SOURCE = ("SELECT b.timestamp, b.service_name, b.severity, "
+                         "coalesce(json_extract_string(b.context, '$.template_id'), t.template_id) AS template_id "
+                         "FROM log_rows b LEFT JOIN log_templates t ON b.template_key = t.template_key")
+
+
+def rollup_source(storage: Optional[str]) -> str:
+    """The rollup input query for a database layout."""
+    return COMPACT_ROLLUP_SOURCE if storage == "compact" else ROLLUP_SOURCE.format(table="logs")
+
+
+def describe_rollups() -> str:
+    """The rollup tables as shown to the SQL generator."""
+    return "\n".join(
+        f"Table: {table}\nColumns: bucket (TIMESTAMP, start of the {unit}), service_name (VARCHAR), "
+        f"severity (VARCHAR), template_id (VARCHAR, '' if none), count (BIGINT, logs in the bucket)"
+        for table, unit in ROLLUPS.items()
+    )
+
+
+def _rollup_counts(unit: str, source: str, start_unit: str) -> str:
+    """
+    Counts per `unit` bucket of the rows of `source` from the `start_unit`
+    bucket of the pending timestamp on. (A join on `rollup_pending`, not a
+    scalar subquery, so DuckDB prunes the scan by the pending timestamp.)
+    """
+    return f"""
+        SELECT date_trunc('{unit}', timestamp::TIMESTAMP) AS bucket, coalesce(service_name, '') AS service_name,
+               coalesce(severity, '') AS severity, coalesce(template_id, '') AS template_id, count(*) AS count
+        FROM ({source}) JOIN rollup_pending ON timestamp >= date_trunc('{start_unit}', since) GROUP BY ALL
+    """
+
+
+def create_rollups(conn) -> List[str]:
+    """
+    Creates the missing rollup tables, backfilled from `logs`, and the
+    `ROLLUPS` views over them. Returns the created names.
+
+    Each view reads its stored table (`<name>_stored`) up to the bucket of
+    the timestamp pending in `rollup_pending`. The rest is counted at read
+    time: the finer stored tables fill in the buckets up to the pending
+    minute, and the rows of `logs` from that minute on. Readers therefore
+    never see stale counts, and only scan the rows stored since the last
+    `refresh_rollups`. Those can share a key with a stored row, so readers
+    `sum(count)`.
+    """
+    # Earliest timestamp stored since the last `refresh_rollups`. Always one row
+    # ('infinity': nothing pending), which lets the views' joins on it prune
+    conn.execute("CREATE TABLE IF NOT EXISTS rollup_pending (since TIMESTAMP)")
+    conn.execute("INSERT INTO rollup_pending SELECT 'infinity' WHERE NOT EXISTS (SELECT * FROM rollup_pending)")
+    existing = dict(conn.execute(
+        "SELECT table_name, table_type FROM information_schema.tables WHERE table_schema = 'main'"
+    ).fetchall())
+    source = rollup_source(storage_mode(conn))
+    units = list(ROLLUPS.items())
+    created = []
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        for level, (table, unit) in enumerate(units):
+            if existing.get(table) == "BASE TABLE":
+                # Materialised by older versions
+                conn.execute(f"ALTER TABLE {table} RENAME TO {table}_stored")
+            elif f"{table}_stored" not in existing:
+                conn.execute(f"""
+                    CREATE TABLE {table}_stored (
+                        bucket TIMESTAMP,
+                        service_name VARCHAR,
+                        severity VARCHAR,
+                        template_id VARCHAR,
+                        count BIGINT
+                    );
+                """)
+                created.append(table)
+            parts = [f"SELECT * FROM {table}_stored "
+                     f"WHERE bucket < (SELECT date_trunc('{unit}', min(since)) FROM rollup_pending)"]
+            for (finer, finer_unit), (_, coarser_unit) in zip(units[:level], units[1:level + 1]):
+                parts.append(f"""
+                    SELECT date_trunc('{unit}', bucket) AS bucket, service_name, severity, template_id, count
+                    FROM {finer}_stored JOIN rollup_pending
+                    ON bucket >= date_trunc('{coarser_unit}', since) AND bucket < date_trunc('{finer_unit}', since)
+                """)
+            parts.append(_rollup_counts(unit, source, units[0][1]))
+            conn.execute(f"CREATE OR REPLACE VIEW {table} AS {' UNION ALL '.join(parts)}")
+        if created and "logs" in existing:
+            journal_rollups(conn, conn.execute(f"SELECT min(timestamp)::TIMESTAMP FROM ({source})").fetchone()[0])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if created and "logs" in existing:
+        refresh_rollups(conn, source)
+    return created
+
+
+def journal_rollups(conn, since: Optional[datetime]):
+    """Records that rows from `since` on are not in the stored rollups yet (keeps the earliest)."""
+    if since is not None:
+        conn.execute("UPDATE rollup_pending SET since = least(since, ?)", [since])
+
+
+def pending_rollups(conn) -> Optional[datetime]:
+    """The timestamp `refresh_rollups` will start from, None if nothing is pending."""
+    return conn.execute("SELECT min(since) FROM rollup_pending WHERE isfinite(since)").fetchone()[0]
+
+
+def refresh_rollups(conn, source: str):
+    """
+    Recomputes every stored rollup bucket from the pending timestamp on, one
+    row per key: the minutes from the rows of `source` (see `rollup_source`),
+    then the hours from the minutes and the days from the hours. Ingestion
+    mostly appends recent rows, so this reads a small tail of the table
+    (an upsert per batch would maintain an index on the whole table).
+    """
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        since = pending_rollups(conn)
+        finer = None
+        for table, unit in (ROLLUPS.items() if since is not None else ()):
+            if finer is None:
+                counts = _rollup_counts(unit, source, unit)
+            else:
+                counts = f"""
+                    SELECT date_trunc('{unit}', bucket), service_name, severity, template_id, sum(count)::BIGINT
+                    FROM {finer} WHERE bucket >= date_trunc('{unit}', ?::TIMESTAMP) GROUP BY ALL
+                """
+            conn.execute(f"CREATE OR REPLACE TEMP TABLE rollup_merged AS {counts}", [since] if finer else None)
+            conn.execute(f"DELETE FROM {table}_stored WHERE bucket >= date_trunc('{unit}', ?::TIMESTAMP)", [since])
+            conn.execute(f"INSERT INTO {table}_stored SELECT * FROM rollup_merged")
+            finer = f"{table}_stored"
+        if since is not None:
+            conn.execute("DROP TABLE rollup_merged")
+            conn.execute("UPDATE rollup_pending SET since = 'infinity'")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def trim_rollups(conn, oldest: datetime):
+    """Drops rollup buckets before `oldest` (retention)."""
+    for table in ROLLUPS:
+        conn.execute(f"DELETE FROM {table}_stored WHERE bucket < ?", [oldest])
+
+
+def template_tokens(template: str) -> Optional[List[str]]:
+    """A template's tokens, or None if a literal token contains the wildcard (not splittable)."""
+    tokens = template.split(" ")
+    for token in tokens:
+        if token != WILDCARD and WILDCARD in token:
+            return None
+    return tokens
+
+
+def split_body(body: str, tokens: List[str]) -> Optional[List[str]]:
+    """
+    The wildcard values of `body` under a template's `tokens`, or None if the
+    body is not exactly the template with its wildcards filled in (e.g. it
+    has other whitespace than Drain3's single spaces).
+    """
+    values = body.split(" ")
+    if len(values) != len(tokens):
+        return None
+    params = []
+    for value, token in zip(values, tokens):
+        if token == WILDCARD:
+            params.append(value)
+        elif token != value:
+            return None
+    return params
+
 
 class DuckDBConnector:
-    def __init__(self, db_path: str = "data/target/logs.duckdb", read_only: bool = False):
+    """
+    Per-process access to the logs, history and metrics databases.
+
+    With LOG_BROKER_SOCKET set (or `broker_socket`; "" disables), every write
+    goes to the storage broker, which owns the write connections and also
+    initialises the schemas. `open_writer()` then returns a `BrokerWriter`,
+    history reads go to the broker, and log queries use the read pool.
+    """
+    def __init__(self, db_path: str = "data/target/logs.duckdb", read_only: bool = False,
+                 storage: Optional[str] = None, pooled: bool = False,
+                 history_path: str = "data/target/history.duckdb", broker_socket: Optional[str] = None):
         self.db_path = db_path
-        self.history_path = "data/target/history.duckdb"
+        self.history_path = history_path
         self.read_only = read_only
+        if broker_socket is None:
+            broker_socket = os.getenv("LOG_BROKER_SOCKET", "")
+        self.broker = BrokerClient(broker_socket) if broker_socket else None
+        # Read-only connectors can serve queries from the writer's snapshots. These
+        # exist only if the writer sets LOG_SNAPSHOT_INTERVAL_S (default off), else
+        # the pool falls back to transient connections on the live file
+        pooled = (pooled and read_only) or self.broker is not None
+        self.pool = ReadPool.from_env(db_path, self._get_connection) if pooled else None
+        self.storage = storage or os.getenv("LOG_STORAGE", "row")
+        if self.storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown LOG_STORAGE: {self.storage}")
+        self.hot_columns = parse_hot_keys()
         
         # Ensure data directory exists
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
+        if self.broker is not None:
+            return
+
         # Init schemas if not read only (or check existence)
         if not self.read_only:
              self._init_schema()
@@ -20,60 +392,62 @@ class DuckDBConnector:
         self._init_history_schema()
         self._init_alerts_schema()
         
-        # Auto-load catalog if present
-        if os.path.exists("data/system_catalog.csv"):
-            self.load_catalog("data/system_catalog.csv")
+        # Auto-load catalog if present (a read-only connection cannot write it)
+        if not self.read_only:
+            self.refresh_catalog()
 
     def _get_connection(self):
         """Creates a transient connection to the DB."""
-        # Wait for DB file to exist if read-only
-        if self.read_only:
-            start_wait = time.time()
-            while not os.path.exists(self.db_path):
-                if time.time() - start_wait > 60:
-                     raise TimeoutError(f"Timed out waiting for {self.db_path}")
-                time.sleep(1)
-                
-        max_retries = 30
-        for i in range(max_retries):
-            try:
-                if self.read_only:
-                    return duckdb.connect(self.db_path, read_only=True, config={'access_mode': 'READ_ONLY'})
-                else:
-                    return duckdb.connect(self.db_path)
-            except Exception as e:
-                # If locked, wait and retry
-                if "lock" in str(e).lower() or "read-only" in str(e).lower():
-                    if i < max_retries - 1:
-                        time.sleep(0.5) 
-                    else:
-                        raise e
-                else:
-                    raise e
+        return connect_with_retry(self.db_path, self.read_only)
 
     def _get_history_connection(self):
          """Creates a transient connection to the History DB."""
          return duckdb.connect(self.history_path)
 
     def _init_schema(self):
-        """Initializes the logs table."""
+        """Initializes the logs table (or, for compact / tiered storage, its tables and view)."""
         try:
             conn = self._get_connection()
+            existing = storage_mode(conn)
+            if existing == "row" and self.storage == "tiered":
+                # Everything already stored becomes the hot tier; the next archive run moves it out
+                conn.execute("ALTER TABLE logs RENAME TO logs_hot")
+                existing = None
+                print("🔧 Switched logs to tiered storage")
+            elif existing is not None:
+                self.storage = existing
+            elif self.storage == "compact":
+                create_compact_schema(conn)
+            else:
+                create_row_table(conn, STORAGE_TABLES[self.storage])
+            # Hot context keys as typed columns (existing databases are backfilled)
+            added = migrate_hot_columns(conn, STORAGE_TABLES[self.storage], self.hot_columns)
+            if added and existing is not None:
+                print(f"🔧 Promoted context keys to columns: {', '.join(added)}")
+            if self.storage == "compact":
+                create_compact_view(conn)
+            elif self.storage == "tiered":
+                LogArchive.create_schema(conn)
+                # Kept up to date by the writer once it archives
+                if existing is None or added:
+                    LogArchive.from_env(self.db_path).create_view(conn, table_columns(conn, "logs_hot"))
+            # Per-file read positions, committed atomically with each flush
             conn.execute("""
-                CREATE TABLE IF NOT EXISTS logs (
-                    timestamp TIMESTAMP,
-                    severity VARCHAR,
-                    service_name VARCHAR,
-                    trace_id VARCHAR,
-                    body VARCHAR,
-                    environment VARCHAR,
-                    app_id VARCHAR,
-                    department VARCHAR,
-                    host VARCHAR,
-                    region VARCHAR,
-                    context VARCHAR
+                CREATE TABLE IF NOT EXISTS ingest_offsets (
+                    path VARCHAR,
+                    inode BIGINT,
+                    size BIGINT,
+                    "offset" BIGINT,
+                    line_count BIGINT,
+                    updated_at TIMESTAMP DEFAULT current_timestamp,
+                    PRIMARY KEY (path, inode)
                 );
             """)
+            # Files are found by (device, inode) once renamed; NULL on rows from older versions
+            conn.execute("ALTER TABLE ingest_offsets ADD COLUMN IF NOT EXISTS device BIGINT")
+            # Time-series rollups (existing logs are backfilled)
+            if create_rollups(conn) and existing is not None:
+                print("🔧 Built log rollups")
             conn.close()
         except Exception as e:
             print(f"⚠️ Failed to init schema: {e}")
@@ -116,13 +490,16 @@ class DuckDBConnector:
             
     def save_message(self, session_id: str, role: str, content: str):
         """Saves a chat message to history DB."""
+        if self.broker is not None:
+            try:
+                self.broker.call("history.save_message", params=[session_id, role, content])
+            except Exception as e:
+                print(f"❌ Failed to save message: {e}")
+            return
         conn = None
         try:
             conn = self._get_history_connection()
-            conn.execute(
-                "INSERT INTO chat_history (session_id, role, content) VALUES (?, ?, ?)",
-                [session_id, role, content]
-            )
+            conn.execute(WRITE_SQL["history.save_message"], [session_id, role, content])
         except Exception as e:
             print(f"❌ Failed to save message: {e}")
         finally:
@@ -130,6 +507,8 @@ class DuckDBConnector:
 
     def get_history(self, session_id: str = "default"):
         """Retrieves chat history from history DB."""
+        if self.broker is not None:
+            return [tuple(row) for row in self.broker.call("history.get_history", session_id=session_id)]
         conn = None
         try:
             conn = self._get_history_connection()
@@ -146,6 +525,8 @@ class DuckDBConnector:
 
     def get_alerts(self, unread_only: bool = True):
         """Retrieves alerts from history DB."""
+        if self.broker is not None:
+            return self.broker.call("history.get_alerts", unread_only=unread_only)
         conn = None
         try:
             conn = self._get_history_connection()
@@ -175,22 +556,60 @@ class DuckDBConnector:
 
     def mark_alert_read(self, alert_id: str):
         """Marks an alert as read."""
+        if self.broker is not None:
+            self.broker.call("history.mark_alert_read", params=[alert_id])
+            return
         conn = None
         try:
             conn = self._get_history_connection()
-            conn.execute("UPDATE alerts SET is_read = TRUE WHERE id = ?", [alert_id])
+            conn.execute(WRITE_SQL["history.mark_alert_read"], [alert_id])
         except Exception as e:
             print(f"❌ Failed to mark alert read: {e}")
             raise e
         finally:
             if conn: conn.close()
 
+    def insert_alert(self, alert_id: str, timestamp: datetime, severity: str, service: str,
+                     message: str, analysis: str):
+        """Saves an unread alert to history DB."""
+        params = [alert_id, timestamp, severity, service, message, analysis]
+        if self.broker is not None:
+            self.broker.call("history.insert_alert", params=params)
+            return
+        conn = self._get_history_connection()
+        try:
+            conn.execute(WRITE_SQL["history.insert_alert"], params)
+        finally:
+            conn.close()
+
+    def log_shadow_run(self, query: str, shadow_model: str, answer: str, latency: float,
+                       metrics_path: str = METRICS_PATH):
+        """Records a shadow-model run in the metrics DB."""
+        params = [query, shadow_model, answer, latency]
+        if self.broker is not None:
+            self.broker.call("metrics.shadow_log", params=params)
+            return
+        conn = duckdb.connect(metrics_path)
+        try:
+            conn.execute(SHADOW_LOGS_DDL)
+            conn.execute(WRITE_SQL["metrics.shadow_log"], params)
+        finally:
+            conn.close()
+
     def insert_batch(self, logs: List[Dict[str, Any]]):
         """
         Inserts a batch of log records using a transient connection.
         """
         if not logs:
             return
+        if self.storage != "row" or self.broker is not None:
+            # `logs` is a view: go through a (transient) writer session
+            writer = self.open_writer()
+            try:
+                writer.insert_batch(logs)
+            finally:
+                writer.close()
+            return
 
         values = []
         for log in logs:
@@ -209,15 +628,28 @@ class DuckDBConnector:
                 context_json
             ))
 
-        insert_sql = """
-        INSERT INTO logs (timestamp, severity, service_name, trace_id, body, environment, app_id, department, host, region, context)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
+        # Hot columns are read out of the context parameter
+        names = list(LOG_COLUMNS) + [name for name, _ in self.hot_columns]
+        params = [f"${i + 1}" for i in range(len(LOG_COLUMNS))]
+        context = f"${LOG_COLUMNS.index('context') + 1}::VARCHAR"
+        params += [hot_column_sql(name, col_type, context) for name, col_type in self.hot_columns]
+        insert_sql = f"INSERT INTO logs ({', '.join(names)}) VALUES ({', '.join(params)})"
         
         conn = None
         try:
             conn = self._get_connection()
-            conn.executemany(insert_sql, values)
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.executemany(insert_sql, values)
+                # The rollup views count these rows until a writer's checkpoint stores them
+                conn.register("log_batch", columns_to_relation(build_log_columns(logs)))
+                journal_rollups(conn, conn.execute("SELECT min(timestamp)::TIMESTAMP FROM log_batch").fetchone()[0])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            # As a writer does when it releases the file
+            refresh_rollups(conn, rollup_source(self.storage))
         except Exception as e:
             print(f"❌ Failed to insert batch: {e}")
             raise e
@@ -225,7 +657,9 @@ class DuckDBConnector:
             if conn: conn.close()
 
     def query(self, sql: str, params: List[Any] = None) -> List[Any]:
-        """Executes a raw SQL query using a transient connection."""
+        """Executes a raw SQL query on the read pool, if any, else on a transient connection."""
+        if self.pool is not None:
+            return self.pool.query(sql, params)
         conn = None
         try:
             conn = self._get_connection()
@@ -235,19 +669,693 @@ class DuckDBConnector:
         finally:
             if conn: conn.close()
             
-    def load_catalog(self, csv_path: str):
+    def load_catalog(self, csv_path: str) -> bool:
         """Loads a CSV catalog into the system_catalog table."""
         try:
              conn = self._get_connection()
              # Use CREATE OR REPLACE to ensure fresh data on restart
-             conn.execute(f"CREATE TABLE IF NOT EXISTS system_catalog AS SELECT * FROM read_csv_auto('{csv_path}')")
-             # If table exists but we want to reload, we might need to drop or insert. 
-             # For simpler demo: 
              conn.execute(f"CREATE OR REPLACE TABLE system_catalog AS SELECT * FROM read_csv_auto('{csv_path}')")
              conn.close()
              print(f"✅ Loaded System Catalog from {csv_path}")
+             return True
         except Exception as e:
              print(f"⚠️ Failed to load catalog: {e}")
+             return False
+
+    def refresh_catalog(self, csv_path: str = CATALOG_PATH) -> bool:
+        """
+        Loads the catalog unless this process already loaded the same file.
+        Unchanged mtime and size skip it without reading the file; a touched
+        file is hashed, and only new content is loaded. Returns True if loaded.
+        """
+        if self.broker is not None:
+            return False  # The broker owns the write connection (and reloads the catalog)
+        try:
+            stat = os.stat(csv_path)
+        except OSError:
+            return False
+        key = os.path.abspath(self.db_path)
+        loaded = _catalog_loaded.get(key)
+        if loaded is not None and loaded[:2] == (stat.st_mtime_ns, stat.st_size):
+            return False
+        with open(csv_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if loaded is not None and loaded[2] == digest:
+            _catalog_loaded[key] = (stat.st_mtime_ns, stat.st_size, digest)
+            return False
+        if not self.load_catalog(csv_path):
+            return False
+        _catalog_loaded[key] = (stat.st_mtime_ns, stat.st_size, digest)
+        return True
+
+    def open_writer(self, checkpoint_interval_s: float = 30.0) -> "DuckDBWriter":
+        """Opens a long-lived single-writer session on this database (through the broker, if any)."""
+        if self.broker is not None:
+            return BrokerWriter(self.broker, self.db_path)
+        return DuckDBWriter(self.db_path, checkpoint_interval_s=checkpoint_interval_s, hot_columns=self.hot_columns)
 
     def close(self):
         pass
+
+
+def get_connector(db_path: str = "data/target/logs.duckdb", read_only: bool = False) -> DuckDBConnector:
+    """
+    Shared connector for per-request callers (API endpoints, orchestrator
+    nodes, MCP tools). One per (database, mode) serves the whole process:
+    schemas are initialised by the first call, and later calls only reload
+    the catalog if its CSV changed. Read-only handles query through a
+    `ReadPool` on the writer's snapshots, or on the live file while the
+    writer publishes none (`LOG_SNAPSHOT_INTERVAL_S` is off by default).
+    `close()` on the returned handle is a no-op, as on any connector.
+    """
+    key = (os.path.abspath(db_path), read_only)
+    with _connectors_lock:
+        db = _connectors.get(key)
+        if db is None:
+            db = _connectors[key] = DuckDBConnector(db_path=db_path, read_only=read_only, pooled=read_only)
+        elif not read_only:
+            db.refresh_catalog()
+    return db
+
+
+def storage_mode(conn) -> Optional[str]:
+    """Layout of an existing database ("row" / "compact" / "tiered"), None if it has no `logs` yet."""
+    tables = dict(conn.execute(
+        "SELECT table_name, table_type FROM information_schema.tables "
+        "WHERE table_name IN ('logs', 'logs_hot') AND table_schema = 'main'"
+    ).fetchall())
+    if "logs" not in tables:
+        return None
+    if tables["logs"] != "VIEW":
+        return "row"
+    return "tiered" if "logs_hot" in tables else "compact"
+
+
+def create_row_table(conn, name: str):
+    """A `logs`-shaped table (row storage, and the hot tier of tiered storage)."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            timestamp TIMESTAMP,
+            severity VARCHAR,
+            service_name VARCHAR,
+            trace_id VARCHAR,
+            body VARCHAR,
+            environment VARCHAR,
+            app_id VARCHAR,
+            department VARCHAR,
+            host VARCHAR,
+            region VARCHAR,
+            context VARCHAR
+        );
+    """)
+
+
+def create_compact_schema(conn):
+    """
+    Template-normalised storage. Each mined template version is stored once in
+    `log_templates` (its Drain3 cluster id, text and the literal parts between
+    wildcards). A row keeps `template_key` + `params` instead of its body, and
+    its context without `template_id` / `template_str`. The `logs` view
+    rebuilds both, so readers see the same columns as with row storage.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS log_templates (
+            template_key BIGINT PRIMARY KEY,
+            template_id VARCHAR,
+            template VARCHAR,
+            parts VARCHAR[]
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS log_rows (
+            timestamp TIMESTAMP,
+            severity VARCHAR,
+            service_name VARCHAR,
+            trace_id VARCHAR,
+            template_key BIGINT,
+            params VARCHAR[],
+            body VARCHAR,
+            environment VARCHAR,
+            app_id VARCHAR,
+            department VARCHAR,
+            host VARCHAR,
+            region VARCHAR,
+            context VARCHAR
+        );
+    """)
+    # parts[i] + params[i] for every literal part (there is one more part than params)
+    conn.execute("""
+        CREATE OR REPLACE MACRO fill_template(parts, params) AS
+            array_to_string(list_transform(parts, (part, i) -> part || coalesce(params[i], '')), '')
+    """)
+
+
+def create_compact_view(conn):
+    """
+    (Re)creates the compact `logs` view over `log_rows`, including its hot
+    columns. `template_id` / `template_str` come from `log_templates` unless
+    the row kept them in its own context.
+    """
+    from_templates = {"template_id": "t.template_id", "template_str": "t.template"}
+    hot = []
+    for name, col_type in table_columns(conn, "log_rows")[len(COMPACT_COLUMNS):]:
+        if name in from_templates:
+            hot.append(f"coalesce(TRY_CAST({from_templates[name]} AS {col_type}), r.{name}) AS {name}")
+        else:
+            hot.append(f"r.{name}")
+    # The template keys are spliced in front of the stored context text (no
+    # JSON re-encoding, so nulls and number formatting survive)
+    conn.execute(f"""
+        CREATE OR REPLACE VIEW logs AS
+        SELECT
+            r.timestamp, r.severity, r.service_name, r.trace_id,
+            coalesce(r.body, fill_template(t.parts, r.params)) AS body,
+            r.environment, r.app_id, r.department, r.host, r.region,
+            CASE WHEN t.template_key IS NULL THEN r.context
+                 ELSE '{{"template_id":' || to_json(t.template_id)::VARCHAR
+                      || ',"template_str":' || to_json(t.template)::VARCHAR
+                      || CASE WHEN r.context = '{{}}' THEN '}}' ELSE ',' || substr(r.context, 2) END
+            END AS context{"".join(", " + column for column in hot)}
+        FROM log_rows r
+        LEFT JOIN log_templates t ON r.template_key = t.template_key
+    """)
+
+
+def build_log_columns(logs: List[Dict[str, Any]]) -> Dict[str, list]:
+    """Turns row dicts into one list per `logs` column (context JSON-encoded once)."""
+    columns = {name: [] for name in LOG_COLUMNS}
+    dumps = json.dumps
+    for log in logs:
+        columns["timestamp"].append(log["timestamp"])
+        columns["severity"].append(log["severity"])
+        columns["service_name"].append(log["service_name"])
+        columns["trace_id"].append(log.get("trace_id"))
+        columns["body"].append(log["body"])
+        columns["environment"].append(log.get("environment"))
+        columns["app_id"].append(log.get("app_id"))
+        columns["department"].append(log.get("department"))
+        columns["host"].append(log.get("host"))
+        columns["region"].append(log.get("region"))
+        columns["context"].append(dumps(log.get("context", {})))
+    return columns
+
+
+def _arrow_type(name: str):
+    if name == "timestamp":
+        return pa.timestamp("us", tz="UTC")
+    if name == "template_key":
+        return pa.int64()
+    if name in ("params", "parts"):
+        return pa.list_(pa.string())
+    return pa.string()
+
+
+def columns_to_relation(columns: Dict[str, list]):
+    """Wraps columnar lists in an object DuckDB can scan natively (Arrow, else pandas)."""
+    if pa is not None and isinstance(columns, pa.Table):
+        return columns  # Already Arrow (e.g. a batch the storage broker received)
+    if pa is not None:
+        arrays = {name: pa.array(values, type=_arrow_type(name)) for name, values in columns.items()}
+        return pa.Table.from_pydict(arrays)
+
+    import pandas as pd
+    return pd.DataFrame(columns)
+
+
+class DuckDBWriter:
+    """
+    Long-lived single-writer session for ingestion.
+
+    Keeps one connection open across batches and bulk-loads every batch in a
+    single INSERT ... SELECT over an Arrow table, instead of reconnecting and
+    `executemany`-ing row tuples. Checkpoints are issued explicitly every
+    `checkpoint_interval_s`, and `release()` drops the connection (and the file
+    lock) while the worker is idle so readers in other processes can get in.
+    All methods are serialized by a lock, so the session can be shared between
+    the reader thread and the flush thread.
+
+    With tiered storage, `maybe_archive` moves closed time buckets to the
+    Parquet archive every `LOG_ARCHIVE_INTERVAL_S` (under the same lock, so
+    no insert can slip between the copy and the delete).
+
+    `maybe_compact` re-clusters the closed part of the table by timestamp
+    every `LOG_COMPACT_INTERVAL_S` (see `LogCompactor`), so the zone maps of
+    out-of-order and per-service ingests can skip row groups again.
+
+    The stored `ROLLUPS` tables are brought up to date by `checkpoint()`,
+    outside the insert transactions: it recomputes the buckets from the
+    earliest timestamp stored since the previous one (see `refresh_rollups`).
+    That timestamp is journaled in `rollup_pending` with the rows, so the
+    rollup views count those rows until then, and a writer that restarts
+    after a crash still refreshes them.
+
+    For pooled readers (`ReadPool`), the writer can publish a copy of the
+    database after inserts at most every `LOG_SNAPSHOT_INTERVAL_S` (default
+    0: off), and on `release()` if anything changed since the last one. The
+    copy runs on its own cursor in a background thread, so inserts carry on
+    while it is made (DuckDB copies one consistent transaction).
+    """
+    def __init__(self, db_path: str = "data/target/logs.duckdb", checkpoint_interval_s: float = 30.0,
+                 hot_columns: Optional[List[HotColumn]] = None, archive_interval_s: Optional[float] = None,
+                 snapshot_interval_s: Optional[float] = None, compact_interval_s: Optional[float] = None):
+        self.db_path = db_path
+        self.hot_columns = hot_columns if hot_columns is not None else parse_hot_keys()
+        self.checkpoint_interval_s = checkpoint_interval_s
+        self._conn = None
+        self._last_checkpoint = time.monotonic()
+        self._lock = threading.RLock()
+        self.rows_written = 0
+        self._storage: Optional[str] = None
+        # Tiered storage
+        self.archive = LogArchive.from_env(db_path)
+        if archive_interval_s is None:
+            archive_interval_s = float(os.getenv("LOG_ARCHIVE_INTERVAL_S", "300"))
+        self.archive_interval_s = archive_interval_s
+        self._last_archive = time.monotonic()
+        # Re-clustering
+        self.compactor = LogCompactor.from_env()
+        if compact_interval_s is None:
+            compact_interval_s = float(os.getenv("LOG_COMPACT_INTERVAL_S", "3600"))
+        self.compact_interval_s = compact_interval_s
+        self._last_compact = time.monotonic()
+        # Read snapshots
+        self.snapshot_dir = snapshot_dir(db_path)
+        if snapshot_interval_s is None:
+            snapshot_interval_s = float(os.getenv("LOG_SNAPSHOT_INTERVAL_S", "0"))
+        self.snapshot_interval_s = snapshot_interval_s
+        self._last_snapshot = time.monotonic()
+        self._snapshot_rows: Optional[int] = None  # rows_written at the last publish
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self.snapshots_published = 0
+        self.snapshot_s = 0.0
+        # Rollups: earliest timestamp stored since the last refresh, time spent on upkeep
+        self._rollup_since: Optional[datetime] = None
+        self.rollup_s = 0.0
+        # Compact storage: (template_id, template) -> (template_key, tokens), loaded on connect
+        self._templates: Dict[tuple, tuple] = {}
+        self._next_template_key = 0
+        self.bodies_rebuilt = 0
+        self.bodies_kept = 0
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = connect_with_retry(self.db_path)
+            self._conn.execute("SET TimeZone = 'UTC'")
+            self._last_checkpoint = time.monotonic()
+            self._storage = storage_mode(self._conn) or "row"
+            if self._storage == "compact":
+                self._load_templates(self._conn)
+            elif self._storage == "tiered" and self.archive.recover(self._conn):
+                self.archive.create_view(self._conn, table_columns(self._conn, "logs_hot"))
+            # The writer reconnects after every release; the schema only needs checking once
+            if self.db_path not in _rollups_checked:
+                create_rollups(self._conn)
+                _rollups_checked.add(self.db_path)
+            # Rows a previous writer stored but never refreshed (it did not get to checkpoint)
+            pending = pending_rollups(self._conn)
+            if pending is not None and (self._rollup_since is None or pending < self._rollup_since):
+                self._rollup_since = pending
+        return self._conn
+
+    @property
+    def storage(self) -> str:
+        """The database's layout ("row" / "compact" / "tiered")."""
+        if self._storage is None:
+            with self._lock:
+                self._connection()
+        return self._storage
+
+    @property
+    def compact(self) -> bool:
+        """Whether the database uses compact (template-normalised) storage."""
+        return self.storage == "compact"
+
+    def _load_templates(self, conn):
+        self._templates = {
+            (template_id, template): (key, template_tokens(template))
+            for key, template_id, template in conn.execute(
+                "SELECT template_key, template_id, template FROM log_templates"
+            ).fetchall()
+        }
+        self._next_template_key = max((key for key, _ in self._templates.values()), default=-1) + 1
+
+    def insert_batch(self, logs: List[Dict[str, Any]], offsets: List[FileOffset] = None) -> int:
+        """Bulk-inserts row dicts in one transaction. Returns the number of rows written."""
+        if not logs and not offsets:
+            return 0
+        return self.insert_columns(build_log_columns(logs), offsets)
+
+    def insert_log_batch(self, batch: LogBatch, offsets: List[FileOffset] = None) -> int:
+        """Bulk-inserts a columnar `LogBatch` (no per-row dicts on the way in)."""
+        return self.insert_columns(batch.to_columns(), offsets, batch.columns.get("template"))
+
+    def insert_columns(self, columns: Dict[str, list], offsets: List[FileOffset] = None,
+                       templates: Optional[List[Optional[tuple]]] = None) -> int:
+        """
+        Bulk-inserts a columnar batch (one list per `logs` column).
+        `offsets` (path, inode, size, offset, line_count) are journaled in the
+        same transaction, so a crash can never persist rows without their
+        read position (or vice versa).
+
+        `templates` is each row's mined `(template_id, template_str)` (or None).
+        Compact storage uses it to store the row as template + parameters; the
+        row's context must then not carry the template itself (see
+        `LogBatch.wrap_template`). Row storage ignores it.
+        """
+        with self._lock:
+            rows = len(columns["timestamp"])
+            if rows == 0 and not offsets:
+                return 0
+
+            conn = self._connection()
+            new_templates = {}
+            table = STORAGE_TABLES[self._storage]
+            if self._storage == "compact":
+                if not isinstance(columns, dict):
+                    columns = columns.to_pydict()
+                names = COMPACT_COLUMNS
+                columns, new_templates = self._normalise(columns, templates)
+            else:
+                names = LOG_COLUMNS
+            # Hot columns are extracted from the (final) context text in the same INSERT
+            names = list(names)
+            hot_names = [name for name, _ in self.hot_columns]
+            hot_values = [hot_column_sql(name, col_type) for name, col_type in self.hot_columns]
+            conn.register("log_batch", columns_to_relation(columns))
+            try:
+                conn.execute("BEGIN TRANSACTION")
+                if new_templates:
+                    conn.executemany(
+                        "INSERT INTO log_templates (template_key, template_id, template, parts) VALUES (?, ?, ?, ?)",
+                        [[key, template_id, template, template.split(WILDCARD)]
+                         for (template_id, template), (key, _) in new_templates.items()]
+                    )
+                if rows:
+                    conn.execute(
+                        f"INSERT INTO {table} ({', '.join(names + hot_names)}) "
+                        f"SELECT {', '.join(names + hot_values)} FROM log_batch"
+                    )
+                    # Rollups are refreshed at checkpoint: only journal where they will need to start
+                    since = conn.execute("SELECT min(timestamp)::TIMESTAMP FROM log_batch").fetchone()[0]
+                    if since is not None and (self._rollup_since is None or since < self._rollup_since):
+                        journal_rollups(conn, since)
+                    else:
+                        since = None
+                if offsets:
+                    self._upsert_offsets(conn, offsets)
+                conn.execute("COMMIT")
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                print(f"❌ Failed to bulk insert batch: {e}")
+                raise e
+            finally:
+                conn.unregister("log_batch")
+
+            # Only committed templates can be referenced by later batches
+            self._templates.update(new_templates)
+            if rows and since is not None:
+                self._rollup_since = since
+            self._next_template_key += len(new_templates)
+            self.rows_written += rows
+            if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval_s:
+                self.checkpoint()
+            if self.snapshot_interval_s and time.monotonic() - self._last_snapshot >= self.snapshot_interval_s:
+                self.publish_snapshot()
+            return rows
+
+    def _normalise(self, columns: Dict[str, list], templates: Optional[List[Optional[tuple]]]):
+        """
+        `log_rows` columns for a batch, plus the templates it adds. A body is
+        replaced by its template's key and wildcard values when filling them
+        back in gives the exact same text; otherwise (no template, other
+        whitespace, a wildcard inside a literal token) it is stored as-is.
+        """
+        rows = len(columns["timestamp"])
+        keys, params, bodies = [None] * rows, [None] * rows, list(columns["body"])
+        if templates:
+            known, new = self._templates, {}
+            next_key = self._next_template_key
+            for i, template in enumerate(templates):
+                if template is None:
+                    continue
+                entry = known.get(template) or new.get(template)
+                if entry is None:
+                    entry = new[template] = (next_key, template_tokens(template[1]))
+                    next_key += 1
+                # Rows whose body is kept still reference their template (for its context keys)
+                keys[i], tokens = entry
+                values = split_body(bodies[i], tokens) if tokens is not None else None
+                if values is None:
+                    self.bodies_kept += 1
+                    continue
+                params[i], bodies[i] = values, None
+                self.bodies_rebuilt += 1
+        else:
+            new = {}
+
+        normalised = {name: columns[name] for name in LOG_COLUMNS if name != "body"}
+        normalised.update(template_key=keys, params=params, body=bodies)
+        return normalised, new
+
+    def archive_closed(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Tiered storage: archives closed buckets, applies retention and refreshes the `logs` view."""
+        with self._lock:
+            self._last_archive = time.monotonic()
+            if self.storage != "tiered":
+                return {"rows": 0, "files": 0, "dropped": []}
+            conn = self._connection()
+            result = self.archive.archive(conn, now)
+            result["dropped"] = self.archive.apply_retention(conn, now)
+            oldest = self.archive.retention_cutoff(now)
+            if oldest is not None:
+                trim_rollups(conn, oldest)
+            if result["files"] or result["dropped"]:
+                self.archive.create_view(conn, table_columns(conn, "logs_hot"))
+                # Readers of the previous snapshot would see the archived rows twice
+                self.publish_snapshot(force=True)
+            return result
+
+    def maybe_archive(self):
+        """Runs `archive_closed` if tiered and `archive_interval_s` has passed since the last run."""
+        if time.monotonic() - self._last_archive < self.archive_interval_s or self.storage != "tiered":
+            return
+        start = time.perf_counter()
+        result = self.archive_closed()
+        if result["rows"] or result["dropped"]:
+            print(f"🧊 Archived {result['rows']} rows into {result['files']} Parquet files "
+                  f"({time.perf_counter() - start:.2f}s), dropped {len(result['dropped'])} expired days")
+
+    def compact_closed(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Re-clusters closed rows by (timestamp, service_name); returns `LogCompactor.compact`'s report."""
+        with self._lock:
+            self._last_compact = time.monotonic()
+            self.wait_snapshot()  # Its transaction would keep the rewritten row groups alive
+            self.checkpoint()  # Refreshes the rollups first, so the compaction's checkpoint is cheap
+            result = self.compactor.compact(self._connection(), STORAGE_TABLES[self.storage], now)
+            if result["rows"]:
+                # Readers get the clustered layout too
+                self.publish_snapshot(force=True)
+            return result
+
+    def maybe_compact(self):
+        """Runs `compact_closed` if `compact_interval_s` (0 disables) has passed since the last run."""
+        if not self.compact_interval_s or time.monotonic() - self._last_compact < self.compact_interval_s:
+            return
+        result = self.compact_closed()
+        if result["rows"]:
+            before, after = result["before"], result["after"]
+            print(f"🗜️ Re-clustered {result['rows']} rows ({result['seconds']:.2f}s): "
+                  f"{before['overlapping']}/{before['row_groups']} -> "
+                  f"{after['overlapping']}/{after['row_groups']} overlapping row groups")
+
+    def commit_offsets(self, offsets: List[FileOffset]):
+        """Journals read positions on their own (e.g. after a batch went to the DLQ)."""
+        self.insert_columns({name: [] for name in LOG_COLUMNS}, offsets)
+
+    def get_offset(self, path: str, inode: int, device: Optional[int] = None) -> Optional[FileOffset]:
+        """
+        Returns the last committed (path, inode, size, offset, line_count,
+        device) or None. With `device`, the file is found by (device, inode)
+        whatever its name is now (e.g. rotated from `app.log` to `app.1.log`).
+        """
+        where, params = self._offset_key(path, inode, device)
+        with self._lock:
+            row = self._connection().execute(
+                f'SELECT path, inode, size, "offset", line_count, device FROM ingest_offsets WHERE {where} '
+                'ORDER BY updated_at DESC LIMIT 1', params
+            ).fetchone()
+            return tuple(row) if row else None
+
+    def clear_offset(self, path: str, inode: int, device: Optional[int] = None):
+        """Forgets a fully ingested file (moved to `processed/`, or a drained rotated-away inode)."""
+        where, params = self._offset_key(path, inode, device)
+        with self._lock:
+            self._connection().execute(f"DELETE FROM ingest_offsets WHERE {where}", params)
+
+    @staticmethod
+    def _offset_key(path: str, inode: int, device: Optional[int]) -> Tuple[str, list]:
+        if device is None:
+            return "path = ? AND inode = ?", [path, inode]
+        return "inode = ? AND (device = ? OR device IS NULL AND path = ?)", [inode, device, path]
+
+    @staticmethod
+    def _upsert_offsets(conn, offsets: List[FileOffset]):
+        # One row per file: a renamed file's row under its old name is replaced
+        renamed = [[o[1], o[5], o[0]] for o in offsets if o[5] is not None]
+        if renamed:
+            conn.executemany("DELETE FROM ingest_offsets WHERE inode = ? AND device = ? AND path <> ?", renamed)
+        conn.executemany("""
+            INSERT INTO ingest_offsets (path, inode, size, "offset", line_count, device, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, current_timestamp)
+            ON CONFLICT (path, inode) DO UPDATE SET
+                size = excluded.size,
+                "offset" = excluded."offset",
+                line_count = excluded.line_count,
+                device = excluded.device,
+                updated_at = excluded.updated_at
+        """, [list(o) for o in offsets])
+
+    def checkpoint(self):
+        """Refreshes the rollups for the rows stored since the last checkpoint and flushes the WAL into the database file."""
+        with self._lock:
+            if self._conn is not None:
+                if self._rollup_since is not None:
+                    start = time.perf_counter()
+                    refresh_rollups(self._conn, rollup_source(self._storage))
+                    self._rollup_since = None
+                    self.rollup_s += time.perf_counter() - start
+                self._conn.execute("CHECKPOINT")
+                self._last_checkpoint = time.monotonic()
+
+    def publish_snapshot(self, force: bool = False) -> bool:
+        """
+        Starts publishing a read snapshot if enabled and rows changed since the
+        last one. Returns True if started. Unless `force`d, nothing is started
+        while the previous copy is still running.
+        """
+        with self._lock:
+            if not self.snapshot_interval_s or self._conn is None:
+                return False
+            if not force and self._snapshot_rows == self.rows_written:
+                return False
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                if not force:
+                    return False
+                self._snapshot_thread.join()
+            self._last_snapshot = time.monotonic()
+            self._snapshot_rows = self.rows_written
+            self._snapshot_thread = threading.Thread(target=self._copy_snapshot, args=(self._conn.cursor(),),
+                                                     daemon=True)
+            self._snapshot_thread.start()
+            return True
+
+    def wait_snapshot(self):
+        """Waits for the snapshot being copied, if any."""
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+
+    def _copy_snapshot(self, cursor):
+        # Runs without the writer lock: the cursor's transaction sees the rows committed when it started
+        start = time.perf_counter()
+        try:
+            publish_snapshot(cursor, self.snapshot_dir)
+            self.snapshots_published += 1
+        except Exception as e:
+            print(f"⚠️ Snapshot failed: {e}")
+            self._snapshot_rows = None  # Retried after the next insert
+        finally:
+            cursor.close()
+            self.snapshot_s += time.perf_counter() - start
+
+    def release(self):
+        """Checkpoints (publishing a snapshot if due) and closes the connection; the next insert reopens it."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self.checkpoint()
+                    self.publish_snapshot()
+                finally:
+                    self.wait_snapshot()
+                    self._conn.close()
+                    self._conn = None
+
+    def close(self):
+        self.release()
+
+
+class BrokerWriter:
+    """
+    `DuckDBWriter` interface on top of the storage broker: batches are sent
+    as Arrow IPC with their offsets and templates, and each call returns once
+    the broker committed it (usually grouped with other clients' batches).
+    The broker's own `DuckDBWriter` does the work, so offset journaling,
+    compact templates, archiving and snapshots behave as in a local session.
+    """
+    def __init__(self, broker: BrokerClient, db_path: str = "data/target/logs.duckdb"):
+        self.broker = broker
+        self.db_path = db_path
+        self.rows_written = 0
+        self._storage: Optional[str] = None
+
+    @property
+    def storage(self) -> str:
+        """The database's layout ("row" / "compact" / "tiered")."""
+        if self._storage is None:
+            self._storage = self.broker.call("logs.info")["storage"]
+        return self._storage
+
+    @property
+    def compact(self) -> bool:
+        return self.storage == "compact"
+
+    def insert_batch(self, logs: List[Dict[str, Any]], offsets: List[FileOffset] = None) -> int:
+        if not logs and not offsets:
+            return 0
+        return self.insert_columns(build_log_columns(logs), offsets)
+
+    def insert_log_batch(self, batch: LogBatch, offsets: List[FileOffset] = None) -> int:
+        return self.insert_columns(batch.to_columns(), offsets, batch.columns.get("template"))
+
+    def insert_columns(self, columns: Dict[str, list], offsets: List[FileOffset] = None,
+                       templates: Optional[List[Optional[tuple]]] = None) -> int:
+        if len(columns["timestamp"]) == 0 and not offsets:
+            return 0
+        rows = self.broker.call("logs.insert", encode_table(columns_to_relation(columns)),
+                                offsets=offsets or [], templates=templates)
+        self.rows_written += rows
+        return rows
+
+    def commit_offsets(self, offsets: List[FileOffset]):
+        self.insert_columns({name: [] for name in LOG_COLUMNS}, offsets)
+
+    def get_offset(self, path: str, inode: int, device: Optional[int] = None) -> Optional[FileOffset]:
+        row = self.broker.call("logs.get_offset", path=path, inode=inode, device=device)
+        return tuple(row) if row else None
+
+    def clear_offset(self, path: str, inode: int, device: Optional[int] = None):
+        self.broker.call("logs.clear_offset", path=path, inode=inode, device=device)
+
+    def archive_closed(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        return self.broker.call("logs.archive_closed", now=now)
+
+    def maybe_archive(self):
+        self.broker.call("logs.maybe_archive")
+
+    def compact_closed(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        return self.broker.call("logs.compact_closed", now=now)
+
+    def maybe_compact(self):
+        self.broker.call("logs.maybe_compact")
+
+    def checkpoint(self):
+        self.broker.call("logs.checkpoint")
+
+    def publish_snapshot(self, force: bool = False) -> bool:
+        return self.broker.call("logs.publish_snapshot", force=force)
+
+    def release(self):
+        self.broker.call("logs.release")
+
+    def close(self):
+        self.release()
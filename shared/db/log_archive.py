@@ -0,0 +1,185 @@
+import os
+import glob
+import uuid
+import shutil
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Buckets: Hive partition columns and their value, derived from `timestamp`
+PARTITIONS = {
+    "day": [("day", "%Y-%m-%d")],
+    "hour": [("day", "%Y-%m-%d"), ("hour", "%H")],
+}
+
+STAGING = "_staging"
+
+
+class LogArchive:
+    """
+    Cold tier of `tiered` storage: closed time buckets of `logs_hot`, written
+    as Hive-partitioned Parquet under `root`
+    (`day=YYYY-MM-DD[/hour=HH][/service_name=...]/part-<uuid>.parquet`).
+
+    The `logs` view unions `logs_hot` with the Parquet files, so filters on
+    `service_name` (when partitioned by it) skip whole directories, and
+    `timestamp` filters skip files and row groups by their Parquet statistics.
+    Retention drops whole `day=` directories.
+
+    Crash safety: a batch is copied to `_staging/<batch_id>` and removed from
+    `logs_hot` in one transaction that also records it in `archive_batches`.
+    Only then are its files moved into place. If the transaction never
+    committed, `recover` deletes the staging directory (the rows are still
+    hot). If it did, `recover` finishes the move.
+    """
+    def __init__(self, root: str, partition: str = "day", by_service: bool = False,
+                 hot_buckets: int = 1, retention_days: int = 0):
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown archive partition: {partition}")
+        self.root = os.path.abspath(root)
+        self.partition = partition
+        self.by_service = by_service
+        self.hot_buckets = max(1, hot_buckets)
+        self.retention_days = retention_days
+
+    @classmethod
+    def from_env(cls, db_path: str) -> "LogArchive":
+        return cls(
+            root=os.getenv("LOG_ARCHIVE_DIR", os.path.join(os.path.dirname(db_path), "archive")),
+            partition=os.getenv("LOG_ARCHIVE_PARTITION", "day"),
+            by_service=os.getenv("LOG_ARCHIVE_BY_SERVICE", "0") == "1",
+            hot_buckets=int(os.getenv("LOG_ARCHIVE_HOT_BUCKETS", "1")),
+            retention_days=int(os.getenv("LOG_RETENTION_DAYS", "0")),
+        )
+
+    @property
+    def bucket(self) -> timedelta:
+        return timedelta(hours=1) if self.partition == "hour" else timedelta(days=1)
+
+    @property
+    def pattern(self) -> str:
+        return os.path.join(self.root, "day=*", "**", "*.parquet")
+
+    def files(self) -> List[str]:
+        return glob.glob(self.pattern, recursive=True)
+
+    def scan_sql(self) -> str:
+        """Table function over every archived file (partition values stay VARCHAR)."""
+        return (f"read_parquet('{self.pattern}', hive_partitioning = true, "
+                f"hive_types_autocast = false, union_by_name = true)")
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Start of the oldest bucket kept hot: everything before it is closed (naive UTC)."""
+        now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+        if self.partition == "hour":
+            start = now.replace(minute=0, second=0, microsecond=0)
+        else:
+            start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return start - self.bucket * (self.hot_buckets - 1)
+
+    # --- Schema ---
+
+    @staticmethod
+    def create_schema(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS archive_batches (
+                batch_id VARCHAR PRIMARY KEY,
+                cutoff TIMESTAMP,
+                rows BIGINT,
+                state VARCHAR,
+                created_at TIMESTAMP DEFAULT current_timestamp
+            );
+        """)
+
+    def create_view(self, conn, columns: List[tuple]):
+        """
+        (Re)creates `logs` over `logs_hot` (`columns`: its (name, type) list)
+        and the archived files. Columns missing from every file (e.g. a hot
+        column added later) read as NULL there.
+        """
+        names = ", ".join(name for name, _ in columns)
+        sql = f"SELECT {names} FROM logs_hot"
+        if self.files():
+            archived = {row[0] for row in conn.execute(f"DESCRIBE SELECT * FROM {self.scan_sql()}").fetchall()}
+            cold = ", ".join(name if name in archived else f"CAST(NULL AS {col_type}) AS {name}"
+                             for name, col_type in columns)
+            sql += f" UNION ALL SELECT {cold} FROM {self.scan_sql()}"
+        conn.execute(f"CREATE OR REPLACE VIEW logs AS {sql}")
+
+    # --- Archiving ---
+
+    def archive(self, conn, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Moves every closed bucket of `logs_hot` to Parquet. Returns what was archived."""
+        cutoff = self.cutoff(now)
+        rows = conn.execute("SELECT count(*) FROM logs_hot WHERE timestamp < ?", [cutoff]).fetchone()[0]
+        if not rows:
+            return {"rows": 0, "files": 0, "cutoff": cutoff}
+
+        batch_id = uuid.uuid4().hex
+        staging = os.path.join(self.root, STAGING, batch_id)
+        os.makedirs(os.path.dirname(staging), exist_ok=True)
+        keys = PARTITIONS[self.partition]
+        derived = ", ".join(f"strftime(timestamp, '{fmt}') AS {name}" for name, fmt in keys)
+        partition_by = [name for name, _ in keys] + (["service_name"] if self.by_service else [])
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            conn.execute("INSERT INTO archive_batches (batch_id, cutoff, rows, state) VALUES (?, ?, ?, 'staged')",
+                         [batch_id, cutoff, rows])
+            conn.execute(f"""
+                COPY (SELECT *, {derived} FROM logs_hot WHERE timestamp < ?)
+                TO '{staging}' (FORMAT parquet, PARTITION_BY ({', '.join(partition_by)}), FILENAME_PATTERN 'part-{{uuid}}')
+            """, [cutoff])
+            conn.execute("DELETE FROM logs_hot WHERE timestamp < ?", [cutoff])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        files = self._publish(conn, batch_id)
+        return {"rows": rows, "files": files, "cutoff": cutoff}
+
+    def _publish(self, conn, batch_id: str) -> int:
+        """Moves a committed batch's files from staging into their partitions."""
+        staging = os.path.join(self.root, STAGING, batch_id)
+        moved = 0
+        for path in glob.glob(os.path.join(staging, "**", "*.parquet"), recursive=True):
+            target = os.path.join(self.root, os.path.relpath(path, staging))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+            moved += 1
+        conn.execute("UPDATE archive_batches SET state = 'published' WHERE batch_id = ?", [batch_id])
+        shutil.rmtree(staging, ignore_errors=True)
+        return moved
+
+    def recover(self, conn) -> int:
+        """Finishes committed batches and drops uncommitted staging output. Returns batches published."""
+        staged = {row[0] for row in conn.execute(
+            "SELECT batch_id FROM archive_batches WHERE state = 'staged'").fetchall()}
+        for batch_id in staged:
+            self._publish(conn, batch_id)
+        staging_root = os.path.join(self.root, STAGING)
+        if os.path.isdir(staging_root):
+            for name in os.listdir(staging_root):
+                if name not in staged:
+                    shutil.rmtree(os.path.join(staging_root, name), ignore_errors=True)
+        return len(staged)
+
+    def retention_cutoff(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Start of the oldest day kept (naive UTC), or None without retention."""
+        if not self.retention_days:
+            return None
+        now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+        return (now - timedelta(days=self.retention_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def apply_retention(self, conn, now: Optional[datetime] = None) -> List[str]:
+        """Drops archived days older than `retention_days` (and any hot rows that old). Returns dropped days."""
+        oldest = self.retention_cutoff(now)
+        if oldest is None:
+            return []
+        dropped = []
+        for path in glob.glob(os.path.join(self.root, "day=*")):
+            day = os.path.basename(path)[len("day="):]
+            if day < oldest.strftime("%Y-%m-%d"):
+                shutil.rmtree(path, ignore_errors=True)
+                dropped.append(day)
+        conn.execute("DELETE FROM logs_hot WHERE timestamp < ?", [oldest])
+        return sorted(dropped)
@@ -0,0 +1,130 @@
+import os
+import bisect
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# (min, max) of a column in one row group
+RowGroupRange = Tuple[datetime, datetime]
+
+
+def row_group_ranges(conn, table: str, column: str = "timestamp") -> List[RowGroupRange]:
+    """
+    Per row group, the min / max of `column` from DuckDB's zone maps
+    (`pragma_storage_info`). Only checkpointed data has them, so callers
+    checkpoint first.
+    """
+    rows = conn.execute(f"""
+        SELECT min(TRY_CAST(regexp_extract(stats, 'Min: ([^,\\]]+)', 1) AS TIMESTAMP)),
+               max(TRY_CAST(regexp_extract(stats, 'Max: ([^\\]]+)', 1) AS TIMESTAMP))
+        FROM pragma_storage_info('{table}')
+        WHERE column_name = ? AND stats LIKE '%Min:%'
+        GROUP BY row_group_id
+        ORDER BY row_group_id
+    """, [column]).fetchall()
+    return [(low, high) for low, high in rows if low is not None and high is not None]
+
+
+def overlap_stats(ranges: List[RowGroupRange]) -> Dict[str, Any]:
+    """
+    How much the row groups' ranges overlap: for each row group, the number
+    of other row groups a filter on a point inside it cannot skip.
+    """
+    ordered = sorted(ranges)
+    lows = [low for low, _ in ordered]
+    # Row group i overlaps the later ones whose min is <= its max (a contiguous run, found by
+    # bisection); a difference array adds one to each of those, so this stays O(n log n)
+    overlaps = [0] * len(ordered)
+    ends = [0] * (len(ordered) + 1)
+    for i, (_, high) in enumerate(ordered):
+        end = bisect.bisect_right(lows, high, lo=i + 1)
+        overlaps[i] += end - i - 1
+        ends[i + 1] += 1
+        ends[end] -= 1
+    running = 0
+    for i in range(len(ordered)):
+        running += ends[i]
+        overlaps[i] += running
+    return {
+        "row_groups": len(ordered),
+        "overlapping": sum(1 for count in overlaps if count),
+        "overlap_avg": round(sum(overlaps) / len(overlaps), 2) if overlaps else 0.0,
+        "overlap_max": max(overlaps, default=0),
+    }
+
+
+class LogCompactor:
+    """
+    Re-clusters the closed part of the writer's table by (timestamp,
+    service_name).
+
+    Rows land in the order files are read: per-service files, backfills and
+    out-of-order sources leave every row group spanning most of the time
+    range, so the zone maps cannot skip anything for a time-window filter.
+    `compact` finds the oldest row group that overlaps another one, rewrites
+    everything from there up to `closed_after_s` before now in sorted order
+    (one transaction: copy, delete, re-insert), and checkpoints so DuckDB
+    drops the emptied row groups. Newer rows are left alone, since they are
+    still arriving. A table whose closed row groups no longer overlap is
+    skipped, so later runs only redo the recent tail.
+
+    DuckDB has no separate VACUUM step to run: its VACUUM statement does not
+    rewrite storage, and space from deleted rows is reclaimed by CHECKPOINT.
+    """
+    def __init__(self, closed_after_s: float = 3600.0):
+        self.closed_after_s = closed_after_s
+
+    @classmethod
+    def from_env(cls) -> "LogCompactor":
+        return cls(closed_after_s=float(os.getenv("LOG_COMPACT_CLOSED_AFTER_S", "3600")))
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Rows before this (naive UTC) are closed."""
+        now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+        return now - timedelta(seconds=self.closed_after_s)
+
+    def compact(self, conn, table: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Re-clusters `table` (see the class docstring). Returns rows rewritten and overlap before / after."""
+        started = time.perf_counter()
+        cutoff = self.cutoff(now)
+        conn.execute("CHECKPOINT")
+        ranges = row_group_ranges(conn, table)
+        before = overlap_stats(ranges)
+        result = {"rows": 0, "start": None, "cutoff": cutoff, "before": before, "after": before}
+
+        # Sorted by min, a row group overlaps an earlier one iff its min is <= the running max of
+        # their maxes. Until the first such overlap the earlier ones are disjoint, so it is with
+        # the previous row group, whose min is where the rewrite starts
+        start, previous_low, running_high = None, None, None
+        for low, high in sorted(ranges):
+            if running_high is not None and low <= running_high:
+                start = previous_low
+                break
+            if low >= cutoff:
+                break
+            previous_low = low
+            running_high = high if running_high is None else max(running_high, high)
+        if start is None:
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            return result
+
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute(f"""
+                CREATE OR REPLACE TEMP TABLE log_compaction AS
+                SELECT * FROM {table} WHERE timestamp >= ? AND timestamp < ?
+                ORDER BY timestamp, service_name
+            """, [start, cutoff])
+            rows = conn.execute("SELECT count(*) FROM log_compaction").fetchone()[0]
+            conn.execute(f"DELETE FROM {table} WHERE timestamp >= ? AND timestamp < ?", [start, cutoff])
+            conn.execute(f"INSERT INTO {table} SELECT * FROM log_compaction")
+            conn.execute("DROP TABLE log_compaction")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("CHECKPOINT")
+
+        result.update(rows=rows, start=start, after=overlap_stats(row_group_ranges(conn, table)),
+                      seconds=round(time.perf_counter() - started, 3))
+        return result
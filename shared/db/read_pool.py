@@ -0,0 +1,221 @@
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import duckdb
+
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".duckdb"
+# Published snapshots kept on disk (readers may still be opening the previous one)
+SNAPSHOTS_KEPT = 2
+
+
+def snapshot_dir(db_path: str) -> str:
+    """Where the writer publishes read snapshots of `db_path` (LOG_SNAPSHOT_DIR overrides)."""
+    return os.getenv("LOG_SNAPSHOT_DIR", os.path.splitext(db_path)[0] + ".snapshots")
+
+
+def list_snapshots(directory: str) -> List[str]:
+    """Published snapshots, oldest first (names sort by publish time)."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names)
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)]
+
+
+def publish_snapshot(conn, directory: str) -> str:
+    """
+    Copies the database behind `conn` into a new file in `directory` and
+    returns its path. `conn` is a cursor of the writer's connection, so
+    `DuckDBWriter` can run this in a background thread while it inserts.
+
+    DuckDB does the copy (`COPY FROM DATABASE`) in the cursor's own
+    transaction, so the snapshot is one consistent state. A plain file copy
+    would open and close the database file a second time, and on POSIX
+    closing any descriptor drops the process's lock on the file. Every
+    snapshot gets its own name, because DuckDB hands out the already-open
+    database for a path it has seen before.
+    """
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f"{SNAPSHOT_PREFIX}{time.time_ns():020d}{SNAPSHOT_SUFFIX}")
+    source = conn.execute("SELECT current_database()").fetchone()[0]
+    conn.execute(f"ATTACH '{target}.tmp' AS log_snapshot")
+    try:
+        conn.execute(f'COPY FROM DATABASE "{source}" TO log_snapshot')
+    finally:
+        conn.execute("DETACH log_snapshot")
+    os.replace(target + ".tmp", target)
+    # Open connections keep reading an unlinked file
+    for old in list_snapshots(directory)[:-SNAPSHOTS_KEPT]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return target
+
+
+class _Snapshot:
+    """One opened snapshot: a read-only database and the cursors handed out on it."""
+    def __init__(self, path: str):
+        self.path = path
+        self.published = os.path.getmtime(path)
+        self.conn = duckdb.connect(path, read_only=True)
+        self.idle: List[Any] = []
+        self.busy = 0
+
+    def close(self):
+        for cursor in self.idle:
+            cursor.close()
+        self.idle = []
+        self.conn.close()
+
+
+class ReadPool:
+    """
+    Long-lived read connections for request paths (orchestrator, MCP).
+
+    No other process can open the database file while the ingestion writer
+    holds it, and a reader that holds it locks the writer out. So the pool
+    never keeps connections on the live file. It reads the newest snapshot
+    that `DuckDBWriter` publishes (see `publish_snapshot`), at most
+    `LOG_SNAPSHOT_INTERVAL_S` behind the writer while it ingests.
+
+    Each query checks the snapshot directory's mtime (one `stat`). When a
+    newer snapshot exists, new queries move to it and connections on the old
+    one are closed as they come back. Up to `size` queries run at once, each
+    on its own cursor; the others wait. Without any snapshot, queries use a
+    transient connection from `fallback`, which may have to wait for the
+    writer's lock. Publishing is off unless the writer's process sets
+    `LOG_SNAPSHOT_INTERVAL_S` (as `docker-compose.yml` does for the storage
+    broker), so elsewhere the pool only adds this fallback. The first
+    fallback query prints a warning.
+    """
+    def __init__(self, db_path: str, fallback: Callable[[], Any], size: int = 4,
+                 directory: Optional[str] = None, wait_timeout_s: float = 30.0):
+        self.db_path = db_path
+        self.fallback = fallback
+        self.size = max(1, size)
+        self.directory = directory or snapshot_dir(db_path)
+        self.wait_timeout_s = wait_timeout_s
+        self._cond = threading.Condition()
+        self._current: Optional[_Snapshot] = None
+        self._dir_mtime: Optional[int] = None
+        self._busy = 0
+        # Metrics
+        self.queries = 0
+        self.fallback_queries = 0
+        self._warned = False
+        self.refreshes = 0
+        self.waits = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+
+    @classmethod
+    def from_env(cls, db_path: str, fallback: Callable[[], Any]) -> "ReadPool":
+        return cls(db_path, fallback, size=int(os.getenv("LOG_READ_POOL_SIZE", "4")))
+
+    def _refresh(self):
+        """Moves to the newest snapshot if the directory changed (caller holds the lock)."""
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._dir_mtime:
+            return
+        snapshots = list_snapshots(self.directory)
+        if snapshots and (self._current is None or snapshots[-1] != self._current.path):
+            try:
+                snapshot = _Snapshot(snapshots[-1])
+            except (duckdb.Error, OSError):
+                return  # Removed while opening: try again on the next query
+            old, self._current = self._current, snapshot
+            self.refreshes += 1
+            if old is not None:
+                for cursor in old.idle:
+                    cursor.close()
+                old.idle = []
+                if old.busy == 0:
+                    old.conn.close()
+        self._dir_mtime = mtime
+
+    def _acquire(self):
+        start = time.perf_counter()
+        with self._cond:
+            self._refresh()
+            while self._busy >= self.size:
+                remaining = self.wait_timeout_s - (time.perf_counter() - start)
+                if remaining <= 0:
+                    raise TimeoutError(f"No read connection free after {self.wait_timeout_s:.0f}s")
+                self._cond.wait(remaining)
+            snapshot = self._current
+            if snapshot is not None:
+                cursor = snapshot.idle.pop() if snapshot.idle else snapshot.conn.cursor()
+                snapshot.busy += 1
+            else:
+                cursor = None
+            self._busy += 1
+            waited = time.perf_counter() - start
+            self.queries += 1
+            self.waits += waited > 0.001
+            self.wait_s_total += waited
+            self.wait_s_max = max(self.wait_s_max, waited)
+        return snapshot, cursor
+
+    def _release(self, snapshot: Optional[_Snapshot], cursor):
+        with self._cond:
+            self._busy -= 1
+            if snapshot is not None:
+                snapshot.busy -= 1
+                if snapshot is self._current:
+                    snapshot.idle.append(cursor)
+                else:
+                    cursor.close()
+                    if snapshot.busy == 0:
+                        snapshot.conn.close()
+            self._cond.notify()
+
+    def query(self, sql: str, params: List[Any] = None) -> List[Any]:
+        snapshot, cursor = self._acquire()
+        try:
+            if cursor is None:
+                self.fallback_queries += 1
+                if not self._warned:
+                    self._warned = True
+                    print(f"⚠️ No read snapshot in {self.directory}: queries open the live database "
+                          f"(set LOG_SNAPSHOT_INTERVAL_S on the writer)")
+                conn = self.fallback()
+                try:
+                    return (conn.execute(sql, params) if params else conn.execute(sql)).fetchall()
+                finally:
+                    conn.close()
+            return (cursor.execute(sql, params) if params else cursor.execute(sql)).fetchall()
+        finally:
+            self._release(snapshot, cursor)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool wait times and how far the served snapshot is behind the writer."""
+        with self._cond:
+            current = self._current
+            return {
+                "source": "snapshot" if current is not None else "live",
+                "snapshot": current.path if current is not None else None,
+                "staleness_s": round(time.time() - current.published, 3) if current is not None else None,
+                "size": self.size,
+                "busy": self._busy,
+                "queries": self.queries,
+                "fallback_queries": self.fallback_queries,
+                "refreshes": self.refreshes,
+                "waits": self.waits,
+                "wait_ms_avg": round(self.wait_s_total / self.queries * 1000, 3) if self.queries else 0.0,
+                "wait_ms_max": round(self.wait_s_max * 1000, 3),
+            }
+
+    def close(self):
+        with self._cond:
+            if self._current is not None:
+                self._current.close()
+                self._current = None
+            self._dir_mtime = None
@@ -1,7 +1,10 @@
+import bisect
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from pydantic import BaseModel, Field
 
+from shared.utils import json_codec
+
 class LogEvent(BaseModel):
     """
     The Golden Standard Log Event.
@@ -36,3 +39,132 @@ class LogEvent(BaseModel):
                 "context": {"user_id": 123, "error_code": "PAY_001"}
             }
         }
+
+
+class LogBatch:
+    """
+    Columnar counterpart of `LogEvent`: one list per field, for the ingestion
+    hot path (no per-row dict or model). Row `i` of every column belongs to
+    the same log line.
+
+    `log_format` is carried for metrics but is not persisted. `raw` holds the
+    (stripped) source line of each row. Lines that failed to parse or mask
+    land in `errors` as (row_index, raw_log, error), where `row_index` is the
+    number of rows that precede the failed line.
+
+    `context_raw` is the JSON text of a row's context, as long as it still
+    matches `context` (JSON logs start with the original line). It is written
+    as-is by `to_columns`, so an untouched context is never re-encoded. Any
+    change to a context must go through `wrap_context` or reset it to None.
+
+    `template` is the mined `(template_id, template_str)` of a row whose
+    context does not carry them (see `wrap_template`). Compact storage keeps
+    each template once instead of in every context.
+
+    `lines` is the 1-based number of each row's source line among the lines
+    parsed (blank and failed lines count too), and `offsets` each row's
+    resume point as (end_offset, line_count) once read from a file (see
+    `ParallelPreprocessor.imap_file_batches`). Either may be None.
+    """
+    # Persisted columns, in `logs` table order
+    COLUMNS = (
+        "timestamp", "severity", "service_name", "trace_id", "body", "environment",
+        "app_id", "department", "host", "region", "context"
+    )
+    # Per-row fields (`row`, `LogParser.parse`)
+    FIELDS = COLUMNS + ("log_format",)
+    # Row tuple layout of the parser's extractors
+    PARSED_FIELDS = FIELDS + ("context_raw",)
+    # Row tuple layout (`from_rows`, `rows`); fields set by mining come last
+    ROW_FIELDS = PARSED_FIELDS + ("template",)
+
+    def __init__(self, columns: Optional[Dict[str, List[Any]]] = None, raw: Optional[List[str]] = None,
+                 errors: Optional[List[Tuple[int, str, str]]] = None, lines: Optional[List[int]] = None):
+        self.columns: Dict[str, List[Any]] = columns or {name: [] for name in self.ROW_FIELDS}
+        self.raw: List[str] = raw if raw is not None else []
+        self.errors: List[Tuple[int, str, str]] = errors or []
+        self.lines: Optional[List[int]] = lines
+        self.offsets: Optional[List[Tuple[int, int]]] = None
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple], raw: Optional[List[str]] = None,
+                  errors: Optional[List[Tuple[int, str, str]]] = None,
+                  lines: Optional[List[int]] = None) -> "LogBatch":
+        """
+        Transposes `ROW_FIELDS`-ordered row tuples into columns (one C-level
+        pass). Shorter tuples (e.g. `PARSED_FIELDS`) leave the rest None.
+        """
+        if rows:
+            columns = {name: list(values) for name, values in zip(cls.ROW_FIELDS, zip(*rows))}
+            for name in cls.ROW_FIELDS[len(columns):]:
+                columns[name] = [None] * len(rows)
+        else:
+            columns = None
+        return cls(columns, raw, errors, lines)
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def rows(self) -> Iterator[tuple]:
+        """`ROW_FIELDS`-ordered row tuples."""
+        return zip(*(self.columns[name] for name in self.ROW_FIELDS))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """One row as a dict (compatibility / DLQ only - not for the hot path)."""
+        return {name: self.columns[name][i] for name in self.FIELDS}
+
+    def wrap_context(self, i: int, before: Dict[str, Any], after: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Replaces row `i`'s context with `{**before, **context, **after}` and
+        keeps its JSON text in step by splicing the encoded extras around it.
+        """
+        context = self.columns["context"][i]
+        merged = {**before, **context, **(after or {})}
+        self.columns["context"][i] = merged
+        raws = self.columns["context_raw"]
+        raw = raws[i]
+        if raw is not None:
+            if len(merged) == len(before) + len(context) + len(after or ()):
+                raws[i] = json_codec.splice_object(before, raw, after)
+            else:
+                raws[i] = None  # Overridden keys: re-encode
+        return merged
+
+    def wrap_template(self, i: int, template_id: str, template_str: str, before: Optional[Dict[str, Any]] = None,
+                      after: Optional[Dict[str, Any]] = None, inline: bool = True) -> Dict[str, Any]:
+        """
+        Records row `i`'s mined template and wraps its context (see
+        `wrap_context`). With `inline`, `template_id` and `template_str` lead
+        the context, as row storage keeps them. Compact storage passes
+        `inline=False`: its `logs` view adds them back from `log_templates`
+        (unless the context has keys of the same name, which then stay inline).
+        """
+        context = self.columns["context"][i]
+        if inline or "template_id" in context or "template_str" in context:
+            before = {"template_id": template_id, "template_str": template_str, **(before or {})}
+        else:
+            self.columns["template"][i] = (template_id, template_str)
+        return self.wrap_context(i, before or {}, after)
+
+    def without(self, rows: Iterable[int]) -> "LogBatch":
+        """A copy without `rows` (e.g. lines that failed to mine); `errors` keep their place among the rest."""
+        dropped = set(rows)
+        keep = [i for i in range(len(self)) if i not in dropped]
+        columns = {name: [values[i] for i in keep] for name, values in self.columns.items()}
+        errors = [(bisect.bisect_left(keep, index), raw_log, error) for index, raw_log, error in self.errors]
+        batch = LogBatch(columns, [self.raw[i] for i in keep], errors)
+        if self.lines is not None:
+            batch.lines = [self.lines[i] for i in keep]
+        if self.offsets is not None:
+            batch.offsets = [self.offsets[i] for i in keep]
+        return batch
+
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """Persisted columns, with `context` JSON-encoded (or its raw text reused), ready for a bulk insert."""
+        columns = {name: self.columns[name] for name in self.COLUMNS}
+        dumps = json_codec.dumps
+        columns["context"] = [
+            raw if raw is not None else dumps(context)
+            for context, raw in zip(columns["context"], self.columns["context_raw"])
+        ]
+        return columns
@@ -0,0 +1,113 @@
+import bz2
+import gzip
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from shared.utils.chunked_reader import DEFAULT_CHUNK_SIZE, decode_lines, line_ends
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Leading bytes of each supported container format
+MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+}
+
+# File names the ingestion paths accept as logs
+LOG_EXTENSIONS = (".log",) + tuple(".log" + ext for ext in EXTENSIONS)
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Returns "gzip", "bz2", "zstd" or None (plain text).
+    Magic bytes win over the extension, so a mislabelled file still decodes.
+    """
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for codec, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return codec
+    for ext, codec in EXTENSIONS.items():
+        if path.endswith(ext):
+            return codec
+    return None
+
+
+def is_compressed(path: str) -> bool:
+    return detect_compression(path) is not None
+
+
+def open_log_stream(path: str) -> BinaryIO:
+    """
+    Opens a (possibly compressed) log file as a binary stream of decompressed bytes.
+    Concatenated multi-member archives (`cat a.gz b.gz > c.gz`, multi-frame zstd)
+    are read through to the end, not just the first member.
+    """
+    codec = detect_compression(path)
+    if codec == "gzip":
+        return gzip.open(path, "rb")  # GzipFile reads every member
+    if codec == "bz2":
+        return bz2.open(path, "rb")  # BZ2File reads every stream
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is not installed, cannot read {path} (pip install zstandard)")
+        fh = open(path, "rb")
+        return zstandard.ZstdDecompressor().stream_reader(fh, read_across_frames=True, closefd=True)
+    return open(path, "rb")
+
+
+def iter_decompressed_chunks(path: str, start: int = 0,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[List[str], List[int]]]:
+    """
+    Streams a compressed file as ([lines], [line ends]) batches with bounded
+    memory (see `iter_buffered_chunks`).
+
+    Offsets count *decompressed* bytes. Compressed streams cannot seek, so
+    resuming from `start` decompresses and discards everything before it.
+    """
+    offset = 0
+    partial = b""
+    with open_log_stream(path) as stream:
+        while offset < start:
+            skipped = stream.read(min(chunk_size, start - offset))
+            if not skipped:
+                return
+            offset += len(skipped)
+
+        while True:
+            data = stream.read(chunk_size)
+            if not data:
+                break
+            offset += len(data)
+            data = partial + data
+            cut = data.rfind(b"\n") + 1
+            partial = data[cut:]
+            if cut:
+                lines = data[:cut]
+                yield decode_lines(lines), line_ends(lines, offset - len(data))
+
+        if partial:
+            # Last line without a trailing newline
+            yield decode_lines(partial), line_ends(partial, offset - len(partial))
+
+
+def iter_log_lines(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Lines of a plain or compressed (streamed) log file."""
+    if not is_compressed(path):
+        # Read and parsed in one process: the buffered line iterator beats mmap there.
+        # newline="\n" splits like `decode_lines` (a "\r" stays part of its line)
+        with open(path, encoding="utf-8", errors="replace", newline="\n") as f:
+            for line in f:
+                yield line[:-1] if line.endswith("\n") else line
+        return
+    for lines, _ in iter_decompressed_chunks(path, chunk_size=chunk_size):
+        yield from lines
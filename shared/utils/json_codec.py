@@ -0,0 +1,51 @@
+import re
+import json
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+# orjson turns integers beyond 64 bits into floats instead of failing
+LONG_DIGITS = re.compile(r"\d{19,}")
+
+
+def loads(text: str) -> Any:
+    """
+    Decodes JSON with orjson when available. Anything orjson rejects but the
+    stdlib accepts (NaN, lone surrogates) falls back to `json.loads`, and so
+    does text with a 19+ digit run (a possible integer beyond 64 bits), so
+    results are identical. Invalid JSON raises `json.JSONDecodeError` either way.
+    """
+    if orjson is not None and not LONG_DIGITS.search(text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def dumps(obj: Any) -> str:
+    """Encodes compact JSON with orjson when available (stdlib `json.dumps` otherwise or on failure)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj)
+
+
+def splice_object(before: Optional[Dict[str, Any]], raw: str, after: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Text of `{**before, **json.loads(raw), **after}` without re-encoding `raw`:
+    the (small) extra objects are encoded and their members joined around the
+    raw object's members. `raw` must be a JSON object whose keys do not
+    overlap with `before` / `after`.
+    """
+    members = []
+    for text in (dumps(before) if before else "{}", raw, dumps(after) if after else "{}"):
+        inner = text.strip()[1:-1].strip()
+        if inner:
+            members.append(inner)
+    return "{" + ",".join(members) + "}"
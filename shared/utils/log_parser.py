@@ -1,12 +1,34 @@
 import re
 import json
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
+
+from shared.log_schema import LogBatch
+from shared.utils import json_codec
+from shared.utils.timestamps import TimestampDecoder
+
+# Row tuple layout of every extractor (`LogBatch.PARSED_FIELDS`)
+Row = tuple
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
 
 class LogParser:
     """
     Robust log parser supporting multiple formats (JSON, Syslog, Nginx, Standard).
     Enforces UTC timestamps.
+
+    Every result carries `log_format` ("json", "standard", "syslog", "nginx"
+    or "unknown") so callers can count lines per format.
+
+    `parse` returns one dict per line. `parse_many` returns a columnar
+    `LogBatch` for bulk ingestion. Both share the same extractors, which build
+    plain row tuples in `LogBatch.PARSED_FIELDS` order.
+
+    JSON lines are decoded with orjson (when installed) and the line itself
+    is kept as the row's `context_raw`, so an unchanged context never has to
+    be encoded again.
     """
     
     # 1. Standard: YYYY-MM-DD HH:MM:SS LEVEL Service: Body
@@ -39,61 +61,98 @@ class LogParser:
         re.DOTALL
     )
 
+    _PATTERNS = {
+        "standard": PATTERN_STANDARD,
+        "syslog": PATTERN_SYSLOG,
+        "nginx": PATTERN_NGINX,
+    }
+
+    # Detection order. The formats are mutually exclusive (they differ in their
+    # first characters), so any order gives the same result
+    FORMATS = ("json", "standard", "syslog", "nginx")
+
+    def __init__(self):
+        self.timestamps = TimestampDecoder()
+
     def parse(self, raw_log: str) -> Dict[str, Any]:
         """
         Parses a raw log string into structured components.
         """
-        raw_log = raw_log.strip()
-        
-        # Strategy 1: JSON
-        if raw_log.startswith("{"):
+        return dict(zip(LogBatch.FIELDS, self._detect_and_parse(raw_log.strip())))
+
+    def parse_many(self, lines: Iterable[str]) -> LogBatch:
+        """
+        Parses lines into one columnar `LogBatch` (one list per column).
+
+        Lines are stripped and blank lines are skipped. A line whose parsing
+        raises lands in `batch.errors` instead of the columns. `batch.lines`
+        records the position of each row's line in `lines`.
+        """
+        parse_row = self._detect_and_parse
+        rows: List[Row] = []
+        raw: List[str] = []
+        numbers: List[int] = []
+        errors = []
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(parse_row(line))
+            except Exception as e:
+                errors.append((len(rows), line, str(e)))
+                continue
+            raw.append(line)
+            numbers.append(number)
+        return LogBatch.from_rows(rows, raw, errors, numbers)
+
+    def _extract(self, fmt: str, raw_log: str) -> Optional[Row]:
+        """Parses with one specific format; None if the line is not in that format."""
+        if fmt == "json":
+            if not raw_log.startswith("{"):
+                return None
             try:
                 return self._parse_json(raw_log)
             except json.JSONDecodeError:
-                pass # Not valid JSON, fall through
-
-        # Strategy 2: Regex Patterns
-        # Try Standard
-        match = self.PATTERN_STANDARD.match(raw_log)
+                return None
+        match = self._PATTERNS[fmt].match(raw_log)
         if match:
-            return self._normalize(match.groupdict(), "standard")
+            return self._normalize(match, fmt)
+        return None
 
-        # Try Syslog
-        match = self.PATTERN_SYSLOG.match(raw_log)
-        if match:
-            return self._normalize(match.groupdict(), "syslog")
-            
-        # Try Nginx
-        match = self.PATTERN_NGINX.match(raw_log)
-        if match:
-            return self._normalize(match.groupdict(), "nginx")
+    def _detect_and_parse(self, raw_log: str) -> Row:
+        # Strategy 1: JSON
+        # Strategy 2: Regex Patterns (Standard, Syslog, Nginx)
+        for fmt in self.FORMATS:
+            parsed = self._extract(fmt, raw_log)
+            if parsed is not None:
+                return parsed
 
         # Strategy 3: Fallback
-        return {
-            "timestamp": datetime.now(timezone.utc),
-            "severity": "UNKNOWN",
-            "service_name": "unknown",
-            "body": raw_log,
-            "context": {"parse_error": "format_unknown"}
-        }
-
-    def _parse_json(self, raw_log: str) -> Dict[str, Any]:
-        data = json.loads(raw_log)
-        # Map common JSON fields to our schema
-        return {
-            "timestamp": self._parse_timestamp(data.get("timestamp") or data.get("time") or data.get("date")),
-            "severity": data.get("severity") or data.get("level") or "INFO",
-            "service_name": data.get("service") or data.get("app") or "unknown",
-            "body": data.get("message") or data.get("msg") or raw_log,
-            "context": data # Keep full JSON as context
-        }
-
-    def _normalize(self, data: Dict[str, str], fmt: str) -> Dict[str, Any]:
-        """Normalizes regex matches to standard schema."""
-        ts = datetime.now(timezone.utc)
-        
+        # (timestamp, severity, service_name, trace_id, body, environment, app_id, department, host, region,
+        #  context, log_format, context_raw)
+        return (datetime.now(timezone.utc), "UNKNOWN", "unknown", None, raw_log, None, None, None, None, None,
+                {"parse_error": "format_unknown"}, "unknown", None)
+
+    def _parse_json(self, raw_log: str) -> Row:
+        data = json_codec.loads(raw_log)
+        # Map common JSON fields to our schema (text columns stay text, e.g. "level": 3)
+        return (
+            self.timestamps.iso(data.get("timestamp") or data.get("time") or data.get("date")),
+            _text(data.get("severity") or data.get("level") or "INFO"),
+            _text(data.get("service") or data.get("app") or "unknown"),
+            None,
+            _text(data.get("message") or data.get("msg") or raw_log),
+            None, None, None, None, None,
+            data,  # Keep full JSON as context
+            "json",
+            raw_log,  # ...and its text, reused as-is unless the context changes
+        )
+
+    def _normalize(self, data: "re.Match", fmt: str) -> Optional[Row]:
+        """Normalizes regex matches to standard schema (groups are read off the match, no dict)."""
         if fmt == "standard":
-            ts = self._parse_timestamp(data["timestamp"], "%Y-%m-%d %H:%M:%S")
+            ts = self.timestamps.standard(data["timestamp"])
             
             # Extract Key-Value pairs from message (e.g. "Payment processed dept=finance env=prod")
             body = data["message"]
@@ -113,49 +172,35 @@ class LogParser:
             region = context.get("region")
             host = context.get("host")
             
-            return {
-                "timestamp": ts,
-                "severity": data["severity"],
-                "service_name": data["service"], 
-                "body": body, # Keep original body or strip?? Keeping it is safer for reading.
-                "department": department,
-                "environment": environment,
-                "region": region,
-                "host": host,
-                "context": context
-            }
+            # Keep original body (safer for reading)
+            return (ts, data["severity"], data["service"], None, body, environment, None, department, host, region,
+                    context, "standard", None)
             
         elif fmt == "syslog":
             # Syslog usually lacks year, assume current year
-            ts_str = f"{datetime.now().year} {data['timestamp']}"
-            ts = self._parse_timestamp(ts_str, "%Y %b %d %H:%M:%S")
-            return {
-                "timestamp": ts,
-                "severity": "INFO", # Syslog doesn't always have severity in text
-                "service_name": data["service"],
-                "body": data["message"],
-                "context": {"host": data["host"]}
-            }
+            ts = self.timestamps.syslog(data["timestamp"])
+            # Syslog doesn't always have severity in text
+            return (ts, "INFO", data["service"], None, data["message"], None, None, None, None, None,
+                    {"host": data["host"]}, "syslog", None)
             
         elif fmt == "nginx":
             # 24/Nov/2025:16:00:00 +0000
-            ts = self._parse_timestamp(data["timestamp"], "%d/%b/%Y:%H:%M:%S %z")
-            return {
-                "timestamp": ts,
-                "severity": "INFO",
-                "service_name": "nginx",
-                "body": f"{data['request']} {data['status']}",
-                "context": {
-                    "client_ip": data["ip"],
-                    "status": data["status"],
-                    "bytes": data["bytes"]
-                }
+            ts = self.timestamps.nginx(data["timestamp"])
+            context = {
+                "client_ip": data["ip"],
+                "status": data["status"],
+                "bytes": data["bytes"]
             }
-            
-        return {}
+            return (ts, "INFO", "nginx", None, f"{data['request']} {data['status']}", None, None, None, None, None,
+                    context, "nginx", None)
+
+        return None
 
     def _parse_timestamp(self, ts_str: Optional[str], fmt: Optional[str] = None) -> datetime:
-        """Helper to parse and normalize timestamp to UTC."""
+        """
+        Helper to parse and normalize timestamp to UTC (reference implementation;
+        the parser itself goes through the memoizing `TimestampDecoder`).
+        """
         if not ts_str:
             return datetime.now(timezone.utc)
             
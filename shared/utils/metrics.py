@@ -0,0 +1,260 @@
+import bisect
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+# Default bucket upper bounds (seconds) - covers 100us .. 10s
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Minimal thread-safe cumulative histogram (Prometheus style buckets).
+    Values above the last bound land in the implicit +Inf bucket.
+    """
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, count: int = 1):
+        """Records `count` observations of `value` (e.g. a batch's per-item average)."""
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += count
+            self._sum += value * count
+            self._count += count
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns cumulative bucket counts plus count/sum/avg."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = {}
+        running = 0
+        for bound, c in zip(self.buckets, counts):
+            running += c
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = running + counts[-1]
+        return {
+            "buckets": cumulative,
+            "count": count,
+            "sum": total,
+            "avg": (total / count) if count else 0.0,
+        }
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by a label (e.g. format, error type) or
+    a tuple of labels, in which case `label_value` is a tuple too.
+    """
+    def __init__(self, name: str, help: str = "", label: Union[str, Tuple[str, ...], None] = None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values: Dict[Optional[str], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, label_value: Any = None):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value: Any = None) -> float:
+        return self._values.get(label_value, 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def snapshot(self):
+        with self._lock:
+            if self.label is None:
+                return self._values.get(None, 0)
+            if isinstance(self.label, tuple):
+                return {"/".join(map(str, k)): v for k, v in self._values.items()}
+            return dict(self._values)
+
+    def label_pairs(self) -> Dict[str, float]:
+        """Prometheus label sets, e.g. {'source="a.log",format="json"': 3}."""
+        names = self.label if isinstance(self.label, tuple) else (self.label,)
+        with self._lock:
+            items = list(self._values.items())
+        out = {}
+        for key, value in items:
+            values = key if isinstance(key, tuple) else (key,)
+            out[",".join(f'{n}="{v}"' for n, v in zip(names, values))] = value
+        return out
+
+
+class Gauge:
+    """Point-in-time value: either `set()` explicitly or read from a callback on scrape."""
+    def __init__(self, name: str, fn: Optional[Callable[[], float]] = None, help: str = ""):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    def value(self) -> float:
+        if self.fn is not None:
+            try:
+                return self.fn()
+            except Exception:
+                return float("nan")
+        return self._value
+
+    def snapshot(self) -> float:
+        return self.value()
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms for one process.
+
+    Exposed two ways, both optional:
+    - `serve(port)`: tiny HTTP endpoint, `/metrics` (Prometheus text) and
+      `/metrics.json`.
+    - `start_reporter(interval_s)`: one summary line every interval, with
+      rates computed from the counters named in `rate_counters`.
+    """
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._reporter = None
+        self._stop = threading.Event()
+
+    def counter(self, name: str, help: str = "", label: Optional[str] = None) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, help, label))
+
+    def gauge(self, name: str, fn: Optional[Callable[[], float]] = None, help: str = "") -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, fn, help))
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS, help: str = "") -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(buckets))
+
+    def register(self, name: str, metric: Any) -> Any:
+        """Adopts a metric owned by a component (e.g. the batcher's histograms)."""
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in metrics.items()}
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            metrics = dict(self._metrics)
+        out = []
+        for name, metric in metrics.items():
+            full = self.prefix + name
+            if isinstance(metric, Histogram):
+                snap = metric.snapshot()
+                out.append(f"# TYPE {full} histogram")
+                for bound, count in snap["buckets"].items():
+                    out.append(f'{full}_bucket{{le="{bound}"}} {count}')
+                out.append(f"{full}_sum {snap['sum']}")
+                out.append(f"{full}_count {snap['count']}")
+            elif isinstance(metric, Counter):
+                out.append(f"# TYPE {full} counter")
+                if metric.label is None:
+                    out.append(f"{full} {metric.snapshot()}")
+                else:
+                    for labels, value in metric.label_pairs().items():
+                        out.append(f"{full}{{{labels}}} {value}")
+            else:
+                out.append(f"# TYPE {full} gauge")
+                out.append(f"{full} {metric.value()}")
+        return "\n".join(out) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0"):
+        """Starts the metrics HTTP endpoint on a daemon thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(registry.snapshot(), default=str).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path.startswith("/metrics"):
+                    body = registry.render_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # No access log on the hot path
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"📈 Metrics endpoint: http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server
+
+    def start_reporter(self, interval_s: float, rate_counters: Sequence[str] = (),
+                       emit: Callable[[str], None] = print):
+        """Emits a one-line summary every `interval_s` (rates over the last interval)."""
+        def run():
+            last = {name: self._metrics[name].total() for name in rate_counters if name in self._metrics}
+            last_time = time.monotonic()
+            while not self._stop.wait(interval_s):
+                now = time.monotonic()
+                elapsed = max(now - last_time, 1e-9)
+                parts = []
+                for name in rate_counters:
+                    metric = self._metrics.get(name)
+                    if metric is None:
+                        continue
+                    total = metric.total()
+                    parts.append(f"{name}={total:.0f} ({(total - last.get(name, 0)) / elapsed:.1f}/s)")
+                    last[name] = total
+                last_time = now
+                emit(f"📈 {' '.join(parts)} | {self.summary()}")
+
+        self._reporter = threading.Thread(target=run, name="metrics-reporter", daemon=True)
+        self._reporter.start()
+
+    def summary(self) -> str:
+        """Compact gauge + histogram-average line for the periodic dump."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        parts = []
+        for name, metric in metrics.items():
+            if isinstance(metric, Gauge):
+                parts.append(f"{name}={metric.value():g}")
+            elif isinstance(metric, Histogram) and metric.count:
+                parts.append(f"{name}_avg={metric.snapshot()['avg']:.6f}")
+        return " ".join(parts)
+
+    def close(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,285 @@
+import os
+import time
+from collections import deque
+from multiprocessing import Pool
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from shared.log_schema import LogBatch
+from shared.utils.chunked_reader import MappedLogFile, iter_buffered_chunks, read_range
+from shared.utils.compressed_reader import is_compressed, iter_decompressed_chunks
+from shared.utils.log_parser import LogParser
+from shared.utils.metrics import Counter, Histogram
+from shared.utils.pii_masker import PIIMasker
+
+# (raw_log, masked_record, error) - exactly one of masked_record / error is set.
+PreprocessResult = Tuple[str, Optional[Dict[str, Any]], Optional[str]]
+
+# What a worker reports back with each chunk: (parse_seconds, mask_seconds)
+ChunkStats = Tuple[float, float]
+
+# Per-process singletons, created once by the pool initializer.
+_parser: Optional[LogParser] = None
+_masker: Optional[PIIMasker] = None
+
+
+def preprocess_line(parser: LogParser, masker: PIIMasker, raw_log: str) -> Dict[str, Any]:
+    """Runs the stateless part of the pipeline (Parse -> Mask) for one line."""
+    parsed = parser.parse(raw_log)
+    return masker.mask_context(parsed)
+
+
+def preprocess_lines(parser: LogParser, masker: PIIMasker, lines: List[str]) -> LogBatch:
+    """Runs Parse -> Mask over many lines into one columnar `LogBatch`."""
+    return masker.mask_batch(parser.parse_many(lines))
+
+
+def _init_worker():
+    global _parser, _masker
+    _parser = LogParser()
+    _masker = PIIMasker()
+
+
+def _preprocess_lines(parser: LogParser, masker: PIIMasker, lines: List[str]) -> Tuple[LogBatch, ChunkStats]:
+    clock = time.perf_counter
+    t0 = clock()
+    batch = parser.parse_many(lines)
+    t1 = clock()
+    masker.mask_batch(batch)
+    return batch, (t1 - t0, clock() - t1)
+
+
+def _preprocess_chunk(lines: List[str]) -> Tuple[LogBatch, ChunkStats]:
+    return _preprocess_lines(_parser, _masker, lines)
+
+
+def _preprocess_range(path: str, start: int, end: int) -> Tuple[LogBatch, ChunkStats, List[int]]:
+    # The worker maps the file itself: only (path, start, end) crosses the pipe
+    lines, ends = read_range(path, start, end)
+    batch, stats = _preprocess_lines(_parser, _masker, lines)
+    return batch, stats, ends
+
+
+def _position_rows(batch: LogBatch, ends: List[int], line_count: int) -> Tuple[int, int]:
+    """
+    Sets `batch.offsets` from the end offset of every line the batch was
+    parsed from (`line_count` lines precede the first). Returns the batch's
+    own (end_offset, line_count), past its last line.
+    """
+    batch.offsets = [(ends[number - 1], line_count + number) for number in batch.lines]
+    return ends[-1], line_count + len(ends)
+
+
+def batch_results(batch: LogBatch) -> Iterator[PreprocessResult]:
+    """Per-line view of a batch: (raw_log, masked_record, error), failed lines in their original place."""
+    errors = iter(batch.errors)
+    error = next(errors, None)
+    for i, raw_log in enumerate(batch.raw):
+        while error is not None and error[0] == i:
+            yield error[1], None, error[2]
+            error = next(errors, None)
+        yield raw_log, batch.row(i), None
+    while error is not None:
+        yield error[1], None, error[2]
+        error = next(errors, None)
+
+
+class ParallelPreprocessor:
+    """
+    Fans Parse + PII Masking out to a pool of worker processes.
+
+    Lines are shipped to the workers in chunks and the results are yielded
+    back in input order, so the (stateful) Drain3 template miner can keep
+    running in the parent process. Mining every line in the original order
+    through a single miner is what keeps cluster IDs identical to a serial run.
+
+    Only `max_inflight` chunks are ever outstanding, which bounds memory when
+    the input is a multi-GB file.
+
+    Each chunk comes back as one columnar `LogBatch` (`imap_batches`,
+    `imap_file_batches`), which is also far cheaper to pickle than a dict per
+    line. `imap` / `imap_file` are per-line views of the same batches.
+
+    Parse and mask latencies are measured where the work runs (in the
+    workers, in pool mode) and recorded in `parse_latency_hist` /
+    `mask_latency_hist` in the parent.
+
+    The format mix of each `source` (a file path) is recorded in
+    `source_formats`.
+    """
+    def __init__(self, workers: int = 1, chunk_size: int = 2000, max_inflight: Optional[int] = None,
+                 range_bytes: int = 1024 * 1024):
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.range_bytes = range_bytes
+        self.max_inflight = max_inflight or self.workers * 2
+        self._pool = None
+        self.parse_latency_hist = Histogram()
+        self.mask_latency_hist = Histogram()
+        self.source_formats = Counter("lines_by_source_format_total", "Lines per source and detected format",
+                                      label=("source", "format"))
+
+        if self.workers > 1:
+            self._pool = Pool(processes=self.workers, initializer=_init_worker)
+        else:
+            # Inline mode: no processes, no pickling overhead
+            self._parser = LogParser()
+            self._masker = PIIMasker()
+
+    def imap(self, lines: Iterable[str], source: Optional[str] = None) -> Iterator[PreprocessResult]:
+        """
+        Preprocesses lines and yields (raw_log, masked_record, error) in order.
+        Blank lines are skipped and surrounding whitespace is stripped.
+        (Per-line view of `imap_batches`.)
+        """
+        for batch in self.imap_batches(lines, source):
+            yield from batch_results(batch)
+
+    def imap_batches(self, lines: Iterable[str], source: Optional[str] = None) -> Iterator[LogBatch]:
+        """
+        Preprocesses lines in chunks of `chunk_size` and yields one columnar
+        `LogBatch` per chunk, in input order.
+        """
+        chunks = self._chunks(lines)
+
+        if self._pool is None:
+            for chunk in chunks:
+                batch, stats = _preprocess_lines(self._parser, self._masker, chunk)
+                self._observe(source, batch, stats)
+                yield batch
+            return
+
+        pending: Deque = deque()
+        for chunk in chunks:
+            pending.append(self._pool.apply_async(_preprocess_chunk, (chunk,)))
+            # Backpressure: wait for the oldest chunk before reading further
+            if len(pending) >= self.max_inflight:
+                yield self._batch(pending.popleft(), source)
+        while pending:
+            yield self._batch(pending.popleft(), source)
+
+    def imap_file(self, path: str, start: int = 0, line_count: int = 0) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str], Optional[Tuple[int, int]]]]:
+        """
+        Per-line view of `imap_file_batches`: yields (raw_log, masked, error,
+        position) where `position` is set on the last line of every range.
+        """
+        for batch, position in self.imap_file_batches(path, start, line_count):
+            results = list(batch_results(batch))
+            last = len(results) - 1
+            for i, (raw_log, masked, error) in enumerate(results):
+                yield raw_log, masked, error, position if i == last else None
+
+    def imap_file_batches(self, path: str, start: int = 0, line_count: int = 0) -> Iterator[Tuple[LogBatch, Tuple[int, int]]]:
+        """
+        Preprocesses a whole file from byte `start` in newline-aligned ranges
+        of about `range_bytes`. Yields one (batch, position) per range, where
+        `position` is (end_offset, line_count) - the resume point once the
+        whole range is persisted. `batch.offsets` holds the resume point of
+        each row, so a write cut inside a range can journal exactly the rows
+        it persisted.
+
+        With a worker pool, the file is mapped and only (path, start, end)
+        descriptors are sent; each worker maps its own range. Inline, the
+        buffered line iterator is faster (see `iter_buffered_chunks`).
+        Compressed files (gzip/bz2/zstd) cannot be mapped: they are decompressed
+        as a stream in the parent and offsets count decompressed bytes.
+        """
+        if is_compressed(path):
+            yield from self._imap_stream(path, iter_decompressed_chunks(path, start, self.range_bytes), line_count)
+            return
+        if self._pool is None:
+            yield from self._imap_stream(path, iter_buffered_chunks(path, start, self.range_bytes), line_count)
+            return
+
+        with MappedLogFile(path) as mapped:
+            ranges = mapped.chunks(self.range_bytes, start)
+            pending: Deque = deque()
+            for range_start, range_end in ranges:
+                pending.append(self._pool.apply_async(_preprocess_range, (path, range_start, range_end)))
+                if len(pending) >= self.max_inflight:
+                    batch, stats, ends = pending.popleft().get()
+                    self._observe(path, batch, stats)
+                    position = _position_rows(batch, ends, line_count)
+                    line_count = position[1]
+                    yield batch, position
+            while pending:
+                batch, stats, ends = pending.popleft().get()
+                self._observe(path, batch, stats)
+                position = _position_rows(batch, ends, line_count)
+                line_count = position[1]
+                yield batch, position
+
+    def imap_read_batches(self, path: str, lines: List[str], ends: List[int],
+                          line_count: int = 0) -> Iterator[Tuple[LogBatch, Tuple[int, int]]]:
+        """
+        `imap_file_batches` for lines already read from `path` (e.g. by the
+        tailer), in chunks of `chunk_size`: `ends[i]` is the byte offset just
+        past `lines[i]` and `line_count` the number of lines before the first.
+        """
+        size = self.chunk_size
+        chunks = ((lines[i:i + size], ends[i:i + size]) for i in range(0, len(lines), size))
+        return self._imap_stream(path, chunks, line_count)
+
+    def _imap_stream(self, path: str, chunks: Iterator[Tuple[List[str], List[int]]], line_count: int):
+        """Preprocesses ([lines], [line ends]) batches read in the parent."""
+        if self._pool is None:
+            for lines, ends in chunks:
+                batch, stats = _preprocess_lines(self._parser, self._masker, lines)
+                self._observe(path, batch, stats)
+                position = _position_rows(batch, ends, line_count)
+                line_count = position[1]
+                yield batch, position
+            return
+
+        pending: Deque = deque()
+        for lines, ends in chunks:
+            pending.append((self._pool.apply_async(_preprocess_chunk, (lines,)), ends))
+            if len(pending) >= self.max_inflight:
+                result, ends = pending.popleft()
+                batch = self._batch(result, path)
+                position = _position_rows(batch, ends, line_count)
+                line_count = position[1]
+                yield batch, position
+        while pending:
+            result, ends = pending.popleft()
+            batch = self._batch(result, path)
+            position = _position_rows(batch, ends, line_count)
+            line_count = position[1]
+            yield batch, position
+
+    def _chunks(self, lines: Iterable[str]) -> Iterator[List[str]]:
+        chunk: List[str] = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _observe(self, source: Optional[str], batch: LogBatch, stats: ChunkStats):
+        parse_s, mask_s = stats
+        rows = len(batch)
+        if rows:
+            # Chunks are timed as a whole: record each row at the chunk's per-line average
+            lines = rows + len(batch.errors)
+            self.parse_latency_hist.observe(parse_s / lines, rows)
+            self.mask_latency_hist.observe(mask_s / lines, rows)
+        if source is None:
+            return
+        name = os.path.basename(source)
+        formats: Dict[str, int] = {}
+        for fmt in batch.columns["log_format"]:
+            formats[fmt] = formats.get(fmt, 0) + 1
+        for fmt, count in formats.items():
+            self.source_formats.inc(count, (name, fmt))
+
+    def _batch(self, result, source: Optional[str]) -> LogBatch:
+        batch, stats = result.get()
+        self._observe(source, batch, stats)
+        return batch
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
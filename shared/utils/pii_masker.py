@@ -1,33 +1,154 @@
+import os
 import re
-from typing import Any, Dict, Union
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from shared.log_schema import LogBatch
+
+# Strings up to this length are memoized (severities, services, hosts repeat
+# constantly); the memo is dropped wholesale when it reaches `memo_size` entries
+MEMO_MAX_LEN = 128
+MAX_MEMO = 65536
+_MISS = object()
+
+
+def _count_digits(text: str) -> int:
+    """Digits in `text` (`\\d` also matches non-ASCII digits: for those, assume all are)."""
+    if not text.isascii():
+        return len(text)
+    return len(text) - len(text.encode().translate(None, b"0123456789"))
+
+
+class PIIDetector:
+    """
+    One kind of PII: a regex, its replacement, and what any match needs.
+
+    `requires` maps a substring to the least number of times it must occur
+    and `min_digits` is the least number of digits. Both are checked before
+    any regex runs, so they must hold for every possible match (a prefilter
+    may let a clean string through, it must never skip a dirty one).
+    """
+    def __init__(self, name: str, pattern: str, replacement: str,
+                 requires: Optional[Mapping[str, int]] = None, min_digits: int = 0):
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        self.regex = re.compile(pattern)
+        self.requires = tuple((requires or {}).items())
+        self.min_digits = min_digits
+
+    def __repr__(self) -> str:
+        return f"PIIDetector({self.name!r})"
+
+
+DEFAULT_DETECTORS = (
+    PIIDetector("email", r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', '<EMAIL_REDACTED>',
+                requires={"@": 1, ".": 1}),
+    PIIDetector("ipv4", r'(?<!\d)(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)(?!\d)',
+                '<IP_REDACTED>', requires={".": 3}, min_digits=4),
+    # Same matches as r'\b(?:\d[ -]*?){13,16}\b' without its backtracking: that lazy
+    # form crosses separators only until the 13th digit, then extends over
+    # adjacent digits up to the 16th
+    PIIDetector("credit_card", r'\b(?:\d[ -]*+){12}\d{1,4}\b', '<CC_REDACTED>', min_digits=13),
+    PIIDetector("ssn", r'\b\d{3}-\d{2}-\d{4}\b', '<SSN_REDACTED>', requires={"-": 2}, min_digits=9),
+)
+
 
 class PIIMasker:
     """
     Utility class to mask Personally Identifiable Information (PII) 
     from log messages and context dictionaries.
+
+    Detectors are pluggable (`detectors=`, `register`) and can be narrowed
+    with `PII_DETECTORS=email,ipv4`. For every string:
+    1. Each detector's prefilter (required characters, digit count) drops the
+       ones that cannot match. Most log strings stop here.
+    2. The survivors are tried in one combined scan.
+    3. Only a string that really contains PII gets the replacement passes, in
+       detector order, so the output is the same as masking with each
+       detector in turn.
     """
-    
-    # Pre-compiled regex patterns for common PII
-    PATTERNS = {
-        "email": (r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', '<EMAIL_REDACTED>'),
-        "ipv4": (r'(?<!\d)(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)(?!\d)', '<IP_REDACTED>'),
-        "credit_card": (r'\b(?:\d[ -]*?){13,16}\b', '<CC_REDACTED>'),
-        "ssn": (r'\b\d{3}-\d{2}-\d{4}\b', '<SSN_REDACTED>'),
-    }
-
-    def __init__(self):
-        self.regexes = {k: (re.compile(p), r) for k, (p, r) in self.PATTERNS.items()}
+
+    # Pattern table of the default detectors (name -> (regex, replacement))
+    PATTERNS = {d.name: (d.pattern, d.replacement) for d in DEFAULT_DETECTORS}
+
+    def __init__(self, detectors: Optional[Iterable[PIIDetector]] = None, memo_size: int = MAX_MEMO):
+        if detectors is None:
+            detectors = DEFAULT_DETECTORS
+            enabled = os.getenv("PII_DETECTORS")
+            if enabled:
+                names = {name.strip() for name in enabled.split(",")}
+                detectors = [d for d in detectors if d.name in names]
+        self.detectors: List[PIIDetector] = []
+        self._combined: Dict[Tuple[str, ...], "re.Pattern"] = {}
+        # short text -> masked text, or None when it has no PII
+        self._memo: Dict[str, Optional[str]] = {}
+        self.memo_size = memo_size
+        for detector in detectors:
+            self.register(detector)
+
+    def register(self, detector: PIIDetector):
+        """Adds a detector (applied after the existing ones)."""
+        if any(d.name == detector.name for d in self.detectors):
+            raise ValueError(f"Duplicate PII detector: {detector.name}")
+        self.detectors.append(detector)
+        self._combined.clear()
+        self._memo.clear()
+
+    def _candidates(self, text: str) -> List[PIIDetector]:
+        """Detectors whose prefilter passes for `text`."""
+        digits = -1
+        candidates = []
+        for detector in self.detectors:
+            for needle, count in detector.requires:
+                if text.count(needle) < count:
+                    break
+            else:
+                if detector.min_digits:
+                    if digits < 0:
+                        digits = _count_digits(text)
+                    if digits < detector.min_digits:
+                        continue
+                candidates.append(detector)
+        return candidates
+
+    def _scanner(self, candidates: List[PIIDetector]) -> "re.Pattern":
+        """One alternation of the candidates' patterns (cached per combination)."""
+        key = tuple(d.name for d in candidates)
+        scanner = self._combined.get(key)
+        if scanner is None:
+            scanner = re.compile("|".join(f"(?:{d.pattern})" for d in candidates))
+            self._combined[key] = scanner
+        return scanner
 
     def mask_text(self, text: str) -> str:
-        """Masks PII in a string."""
+        """
+        Masks PII in a string. A string without PII is returned as the very
+        same object (callers detect changes by identity).
+        """
         if not text:
             return text
-            
-        masked_text = text
-        for name, (pattern, replacement) in self.regexes.items():
-            masked_text = pattern.sub(replacement, masked_text)
+        memo = self.memo_size and len(text) <= MEMO_MAX_LEN
+        if memo:
+            masked_text = self._memo.get(text, _MISS)
+            if masked_text is not _MISS:
+                return text if masked_text is None else masked_text
+        masked_text = self._scan(text)
+        if memo:
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[text] = None if masked_text is text else masked_text
         return masked_text
 
+    def _scan(self, text: str) -> str:
+        candidates = self._candidates(text)
+        if not candidates:
+            return text
+        if len(candidates) > 1 and self._scanner(candidates).search(text) is None:
+            return text
+        for detector in candidates:
+            text = detector.regex.sub(detector.replacement, text)
+        return text
+
     def mask_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Recursively masks PII in a dictionary."""
         masked_context = {}
@@ -44,3 +165,56 @@ class PIIMasker:
             else:
                 masked_context[k] = v
         return masked_context
+
+    # Columns of a LogBatch that hold free text (log_format is a parser label)
+    BATCH_TEXT_COLUMNS = ("severity", "service_name", "trace_id", "body", "environment",
+                          "app_id", "department", "host", "region")
+
+    def mask_in_place(self, context: Dict[str, Any]) -> bool:
+        """
+        Masks the string leaves of a decoded context in place (same traversal
+        as `mask_context`, no new dicts). Returns True if anything changed;
+        `mask_text` hands back the very same string when nothing matched.
+        """
+        changed = False
+        mask_text = self.mask_text
+        for k, v in context.items():
+            if isinstance(v, str):
+                masked = mask_text(v)
+                if masked is not v:
+                    context[k] = masked
+                    changed = True
+            elif isinstance(v, dict):
+                changed = self.mask_in_place(v) or changed
+            elif isinstance(v, list):
+                for j, item in enumerate(v):
+                    if isinstance(item, str):
+                        masked = mask_text(item)
+                        if masked is not item:
+                            v[j] = masked
+                            changed = True
+        return changed
+
+    def mask_batch(self, batch: LogBatch) -> LogBatch:
+        """
+        Masks every text column and context of a LogBatch in place (same result
+        as `mask_context` per row).
+
+        Contexts that still have their raw JSON text (`context_raw`) are masked
+        leaf by leaf in place, and the raw text is dropped only if a leaf
+        actually changed: a context without PII is never re-encoded.
+        """
+        mask_text = self.mask_text
+        columns = batch.columns
+        for name in self.BATCH_TEXT_COLUMNS:
+            columns[name] = [mask_text(v) if isinstance(v, str) else v for v in columns[name]]
+        mask_context = self.mask_context
+        mask_in_place = self.mask_in_place
+        contexts = columns["context"]
+        raws = columns["context_raw"]
+        for i, context in enumerate(contexts):
+            if raws[i] is None:
+                contexts[i] = mask_context(context)
+            elif mask_in_place(context):
+                raws[i] = None
+        return batch
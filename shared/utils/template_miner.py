@@ -1,25 +1,216 @@
 import os
-from typing import Dict, Any
+import time
+import zlib
+import base64
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import jsonpickle
 from drain3 import TemplateMiner
 from drain3.template_miner_config import TemplateMinerConfig
-from drain3.file_persistence import FilePersistence
+from drain3.persistence_handler import PersistenceHandler
+
+from shared.utils.metrics import Histogram, LATENCY_BUCKETS
+
+
+class SnapshotPolicy:
+    """
+    When the Drain3 state is snapshotted. A snapshot is due once
+    `every_changes` clusters were created / changed since the last one, or
+    once `every_seconds` have passed with at least one change (0 disables
+    either trigger). `on_shutdown` snapshots pending changes on close.
+    """
+    def __init__(self, every_changes: int = 1000, every_seconds: float = 60.0, on_shutdown: bool = True):
+        self.every_changes = every_changes
+        self.every_seconds = every_seconds
+        self.on_shutdown = on_shutdown
+
+    @classmethod
+    def from_env(cls) -> "SnapshotPolicy":
+        return cls(
+            every_changes=int(os.getenv("DRAIN3_SNAPSHOT_EVERY_CHANGES", "1000")),
+            every_seconds=float(os.getenv("DRAIN3_SNAPSHOT_INTERVAL_S", "60")),
+            on_shutdown=os.getenv("DRAIN3_SNAPSHOT_ON_SHUTDOWN", "1") != "0",
+        )
+
+    def reason(self, changes: int, since_last_s: float) -> Optional[str]:
+        """Why a snapshot is due now (None if it is not)."""
+        if not changes:
+            return None
+        if self.every_changes and changes >= self.every_changes:
+            return f"{changes} changes"
+        if self.every_seconds and since_last_s >= self.every_seconds:
+            return "periodic"
+        return None
+
+
+class SnapshotWriter(PersistenceHandler):
+    """
+    Drain3 persistence that writes snapshots on a background thread.
+
+    - Latest wins: a snapshot submitted while an older one is still waiting
+      replaces it (only the newest state is worth writing).
+    - Atomic: the file is written to `<path>.tmp`, fsync'ed and renamed over
+      `<path>`, so a crash mid-write leaves the previous snapshot intact.
+    - Compression (zlib + base64, Drain3's own `compress_state` format) also
+      runs on the writer thread.
+    """
+    def __init__(self, file_path: str, compress: bool = True):
+        self.file_path = file_path
+        self.compress = compress
+
+        self.saved = 0
+        self.superseded = 0
+        self.failed = 0
+        self.last_bytes = 0
+        self.write_latency_hist = Histogram(LATENCY_BUCKETS)
+
+        self._pending: Optional[bytes] = None
+        self._writing = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="drain3-snapshot", daemon=True)
+        self._thread.start()
+
+    def save_state(self, state: bytes):
+        with self._cond:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = state
+            self._cond.notify_all()
+
+    def load_state(self) -> Optional[bytes]:
+        if not os.path.exists(self.file_path):
+            return None
+        with open(self.file_path, "rb") as f:
+            return f.read()
+
+    def flush(self):
+        """Waits until every submitted snapshot is on disk."""
+        with self._cond:
+            while self._pending is not None or self._writing:
+                self._cond.wait()
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    def _write(self, state: bytes):
+        if self.compress:
+            state = base64.b64encode(zlib.compress(state))
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+        self.last_bytes = len(state)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                state, self._pending = self._pending, None
+                self._writing = True
+
+            start = time.perf_counter()
+            try:
+                self._write(state)
+                self.saved += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Drain3 snapshot failed: {e}")
+            finally:
+                self.write_latency_hist.observe(time.perf_counter() - start)
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+
+class SnapshottingTemplateMiner(TemplateMiner):
+    """
+    TemplateMiner whose snapshots follow a `SnapshotPolicy` instead of
+    "every cluster change". The state is serialized on the calling thread
+    (so the snapshot is consistent) and handed to the persistence handler.
+    Compression is left to that handler.
+    """
+    def __init__(self, persistence_handler: PersistenceHandler, config: TemplateMinerConfig,
+                 policy: SnapshotPolicy):
+        self.policy = policy
+        self.changes = 0
+        self.load_s = 0.0
+        self.serialize_latency_hist = Histogram(LATENCY_BUCKETS)
+        super().__init__(persistence_handler, config)
+
+    def load_state(self):
+        start = time.perf_counter()
+        super().load_state()
+        self.load_s = time.perf_counter() - start
+
+    def get_snapshot_reason(self, change_type: str, cluster_id: int) -> Optional[str]:
+        if change_type != "none":
+            self.changes += 1
+        return self.policy.reason(self.changes, time.time() - self.last_save_time)
+
+    def save_state(self, snapshot_reason: str):
+        start = time.perf_counter()
+        state = jsonpickle.dumps(self.drain, keys=True).encode("utf-8")
+        self.serialize_latency_hist.observe(time.perf_counter() - start)
+        self.persistence_handler.save_state(state)
+        self.changes = 0
+        self.last_save_time = time.time()
+
 
 class LogTemplateMiner:
     """
     Wrapper around Drain3 for log template mining.
     Extracts constant templates from variable log messages.
+
+    The state is snapshotted per `policy` (default: `SnapshotPolicy.from_env()`)
+    and written in the background by a `SnapshotWriter`. Call `close()` on
+    shutdown to snapshot pending changes and wait for the write.
+
+    Exact-match cache: most lines repeat a few hundred bodies, so the last
+    `cache_size` bodies (LRU, `TEMPLATE_CACHE_SIZE`) that matched a cluster
+    without changing it map straight to that cluster. A hit only bumps the
+    cluster size, as Drain would. Any created or changed cluster clears the
+    whole cache: a new cluster or a wider template can change which cluster
+    of the same tree leaf is the best match for other bodies. Disabled when
+    `drain_max_clusters` is set (Drain's eviction order depends on the tree
+    search it would skip).
     """
-    def __init__(self, persistence_file: str = "data/state/drain3_state.bin", sim_th: float = 0.5):
+    def __init__(self, persistence_file: str = "data/state/drain3_state.bin", sim_th: float = 0.5,
+                 policy: Optional[SnapshotPolicy] = None, compress: bool = True,
+                 cache_size: Optional[int] = None):
         self.config = TemplateMinerConfig()
         self.config.load(os.path.join(os.path.dirname(__file__), "drain3.ini")) if os.path.exists("drain3.ini") else None
         self.config.profiling_enabled = False
         self.config.drain_sim_th = sim_th  # Similarity threshold (0.4-0.6 usually)
+        # Read back by Drain3's load_state; written by the SnapshotWriter
+        self.config.snapshot_compress_state = compress
 
         # Ensure data directory exists
         os.makedirs(os.path.dirname(persistence_file), exist_ok=True)
-        
-        self.persistence = FilePersistence(persistence_file)
-        self.miner = TemplateMiner(self.persistence, self.config)
+
+        self.policy = policy or SnapshotPolicy.from_env()
+        self.persistence = SnapshotWriter(persistence_file, compress=compress)
+        self.miner = SnapshottingTemplateMiner(self.persistence, self.config, self.policy)
+
+        if cache_size is None:
+            cache_size = int(os.getenv("TEMPLATE_CACHE_SIZE", "10000"))
+        self.cache_size = 0 if self.config.drain_max_clusters else cache_size
+        # body -> (cluster, template string)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_invalidations = 0
 
     def mine_template(self, log_message: str) -> Dict[str, Any]:
         """
@@ -30,15 +221,78 @@ class LogTemplateMiner:
             "change_type": str ("cluster_created", "cluster_template_changed", "none")
         }
         """
+        if not self.cache_size:
+            return self.miner.add_log_message(log_message)
+
+        cache = self._cache
+        entry = cache.get(log_message)
+        if entry is not None:
+            cache.move_to_end(log_message)
+            self.cache_hits += 1
+            return self._cached_result(*entry)
+
+        self.cache_misses += 1
         result = self.miner.add_log_message(log_message)
+        if result["change_type"] != "none":
+            if cache:
+                cache.clear()
+                self.cache_invalidations += 1
+        else:
+            cache[log_message] = (self.miner.drain.id_to_cluster[result["cluster_id"]], result["template_mined"])
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
         return result
 
+    def _cached_result(self, cluster, template: str) -> Dict[str, Any]:
+        """What `add_log_message` returns for an unchanged match (and its periodic snapshot check)."""
+        miner = self.miner
+        cluster.size += 1
+        reason = miner.get_snapshot_reason("none", cluster.cluster_id)
+        if reason:
+            miner.save_state(reason)
+        return {
+            "change_type": "none",
+            "cluster_id": cluster.cluster_id,
+            "cluster_size": cluster.size,
+            "template_mined": template,
+            "cluster_count": len(miner.drain.id_to_cluster),
+        }
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
     def get_total_clusters(self) -> int:
         return len(self.miner.drain.clusters)
 
     def save_state(self):
-        """Saves the current state to disk."""
-        import pickle
-        # Convert clusters to list if it's a view, then pickle
-        state = pickle.dumps(list(self.miner.drain.clusters))
-        self.persistence.save_state(state)
+        """Snapshots the current state now (written in the background, see `flush`)."""
+        self.miner.save_state("manual")
+
+    def flush(self):
+        """Waits until every snapshot taken so far is on disk."""
+        self.persistence.flush()
+
+    def close(self):
+        if self.policy.on_shutdown and self.miner.changes:
+            self.miner.save_state("shutdown")
+        self.persistence.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clusters": self.get_total_clusters(),
+            "pending_changes": self.miner.changes,
+            "snapshots_saved": self.persistence.saved,
+            "snapshots_superseded": self.persistence.superseded,
+            "snapshots_failed": self.persistence.failed,
+            "snapshot_bytes": self.persistence.last_bytes,
+            "load_s": round(self.miner.load_s, 4),
+            "cache_entries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_invalidations": self.cache_invalidations,
+            "cache_hit_rate": round(self.cache_hit_rate, 4),
+            "serialize_latency_s": self.miner.serialize_latency_hist.snapshot(),
+            "write_latency_s": self.persistence.write_latency_hist.snapshot(),
+        }
@@ -0,0 +1,178 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+STANDARD_FORMAT = "%Y-%m-%d %H:%M:%S"
+SYSLOG_FORMAT = "%Y %b %d %H:%M:%S"
+NGINX_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+
+# Caches are dropped wholesale when they reach this many minute prefixes
+MAX_PREFIXES = 4096
+
+MONTHS = {name: i + 1 for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+)}
+
+
+def _digits(field: str, width: int) -> int:
+    """Strict fixed-width ASCII integer (int() alone would accept ' 4', '+4' or '4_0')."""
+    if len(field) != width or not field.isascii() or not field.isdigit():
+        raise ValueError(field)
+    return int(field)
+
+
+def _month(name: str) -> int:
+    month = MONTHS.get(name.lower())
+    if month is None:
+        raise ValueError(name)
+    return month
+
+
+def _standard_prefix(prefix: str, year_prefix: str = "") -> datetime:
+    # 2025-11-24 10:00
+    if prefix[4] != "-" or prefix[7] != "-" or prefix[10] != " " or prefix[13] != ":":
+        raise ValueError(prefix)
+    return datetime(_digits(prefix[0:4], 4), _digits(prefix[5:7], 2), _digits(prefix[8:10], 2),
+                     _digits(prefix[11:13], 2), _digits(prefix[14:16], 2), tzinfo=timezone.utc)
+
+
+def _syslog_prefix(prefix: str, year_prefix: str) -> datetime:
+    # Nov 24 16:00 / Nov  4 16:00
+    parts = prefix.split()
+    if len(parts) != 3 or len(parts[2]) != 5 or parts[2][2] != ":" or len(parts[1]) > 2:
+        raise ValueError(prefix)
+    return datetime(int(year_prefix), _month(parts[0]), _digits(parts[1], len(parts[1])),
+                    _digits(parts[2][0:2], 2), _digits(parts[2][3:5], 2), tzinfo=timezone.utc)
+
+
+def _nginx_prefix(prefix: str, year_prefix: str = "") -> datetime:
+    # 24/Nov/2025:16:00 +0000
+    if len(prefix) != 23 or prefix[2] != "/" or prefix[6] != "/" or prefix[11] != ":" or prefix[17] != " ":
+        raise ValueError(prefix)
+    sign = {"+": 1, "-": -1}[prefix[18]]
+    offset = timedelta(hours=_digits(prefix[19:21], 2), minutes=_digits(prefix[21:23], 2))
+    return datetime(_digits(prefix[7:11], 4), _month(prefix[3:6]), _digits(prefix[0:2], 2),
+                    _digits(prefix[12:14], 2), _digits(prefix[15:17], 2), tzinfo=timezone(sign * offset))
+
+
+def _next_year_start() -> float:
+    """Epoch seconds of the next local Jan 1st (when the syslog year changes)."""
+    year = datetime.now().year
+    return datetime(year + 1, 1, 1).timestamp()
+
+
+class TimestampDecoder:
+    """
+    Fast decoding of the fixed timestamp layouts the parser supports.
+
+    `strptime` re-parses the whole string on every line. Log files are
+    ordered, so consecutive lines nearly always share their minute:
+    - The last decoded string is memoized (same-second lines are a dict-free hit).
+    - Each layout is split into a minute prefix and a 2-digit seconds field.
+      The prefix's integer fields are sliced directly (no format-string
+      interpretation) and the result is cached per minute. The seconds are
+      set with `replace`.
+
+    Results are identical to `LogParser`'s original `strptime` / `fromisoformat`
+    path, including the UTC normalisation, the nginx offset and "now" on failure.
+    Anything outside the fast layout goes through that original path.
+    """
+    def __init__(self):
+        self._last: Dict[str, tuple] = {}
+        self._prefixes: Dict[str, Dict[str, datetime]] = {"standard": {}, "syslog": {}, "nginx": {}}
+        self._syslog_year = datetime.now().year
+        self._syslog_year_ends = _next_year_start()
+        self.hits = 0
+        self.misses = 0
+
+    # --- Layouts -------------------------------------------------------------
+
+    def standard(self, ts: str) -> datetime:
+        """`2025-11-24 10:00:05` (naive, assumed UTC)."""
+        last = self._last.get("standard")
+        if last is not None and last[0] == ts:
+            return last[1]
+        dt = self._minute_layout("standard", ts[:16], ts[17:], len(ts) == 19 and ts[16] == ":",
+                                 _standard_prefix, STANDARD_FORMAT, ts)
+        return self._remember("standard", ts, dt)
+
+    def syslog(self, ts: str) -> datetime:
+        """`Nov 24 16:00:05` (no year: the current local year is assumed)."""
+        if time.time() >= self._syslog_year_ends:
+            self._syslog_year = datetime.now().year
+            self._syslog_year_ends = _next_year_start()
+            self._prefixes["syslog"].clear()
+            self._last.pop("syslog", None)
+        last = self._last.get("syslog")
+        if last is not None and last[0] == ts:
+            return last[1]
+        year = self._syslog_year
+        dt = self._minute_layout("syslog", ts[:-3], ts[-2:], len(ts) >= 14 and ts[-3] == ":",
+                                 _syslog_prefix, SYSLOG_FORMAT, f"{year} {ts}", year_prefix=str(year))
+        return self._remember("syslog", ts, dt)
+
+    def nginx(self, ts: str) -> datetime:
+        """`24/Nov/2025:16:00:05 +0000` (keeps its UTC offset)."""
+        last = self._last.get("nginx")
+        if last is not None and last[0] == ts:
+            return last[1]
+        fast = len(ts) == 26 and ts[17] == ":" and ts[20] == " "
+        dt = self._minute_layout("nginx", ts[:17] + ts[20:], ts[18:20], fast,
+                                 _nginx_prefix, NGINX_FORMAT, ts)
+        return self._remember("nginx", ts, dt)
+
+    def iso(self, value: Any) -> datetime:
+        """ISO-8601 from JSON logs (`fromisoformat` is already C-speed; memoize only)."""
+        if not value:
+            return datetime.now(timezone.utc)
+        last = self._last.get("iso")
+        if last is not None and last[0] == value:
+            return last[1]
+        dt = self._slow(lambda: datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+        return self._remember("iso", value, dt)
+
+    # --- Internals -------------------------------------------------------------
+
+    def _remember(self, layout: str, key: Any, dt: Optional[datetime]) -> datetime:
+        if dt is None:
+            # Undecodable: "now" is per call, never memoized
+            return datetime.now(timezone.utc)
+        self._last[layout] = (key, dt)
+        return dt
+
+    def _minute_layout(self, layout: str, prefix: str, seconds: str, fast: bool,
+                       decode_prefix: Callable[[str, str], datetime], full_format: str, full: str,
+                       year_prefix: str = "") -> Optional[datetime]:
+        if fast:
+            cache = self._prefixes[layout]
+            base = cache.get(prefix)
+            try:
+                second = _digits(seconds, 2)
+                if base is None:
+                    self.misses += 1
+                    base = decode_prefix(prefix, year_prefix)
+                    if len(cache) >= MAX_PREFIXES:
+                        cache.clear()
+                    cache[prefix] = base
+                else:
+                    self.hits += 1
+                return base.replace(second=second)
+            except (ValueError, KeyError, IndexError):
+                pass  # Let the original path decide (usually: "now")
+        return self._slow(lambda: datetime.strptime(full, full_format))
+
+    @staticmethod
+    def _to_utc(dt: datetime) -> datetime:
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+
+    def _slow(self, decode: Callable[[], datetime]) -> Optional[datetime]:
+        """The original path; None on failure (the caller substitutes "now")."""
+        try:
+            return self._to_utc(decode())
+        except Exception:
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"prefix_hits": self.hits, "prefix_misses": self.misses}
@@ -30,6 +30,7 @@ mock_db_instance = MagicMock()
 mock_db_connector.return_value = mock_db_instance
 mock_db_instance.get_history.return_value = [] 
 sys.modules["shared.db.duckdb_client"].DuckDBConnector = mock_db_connector
+sys.modules["shared.db.duckdb_client"].get_connector = mock_db_connector
 
 # Mock LLMClient
 mock_llm_client = MagicMock()
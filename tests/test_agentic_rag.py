@@ -11,7 +11,7 @@ from services.pilot_orchestrator.src.state import AgentState
 
 class TestAgenticRAG(unittest.TestCase):
     
-    @patch('services.pilot_orchestrator.src.nodes.DuckDBConnector')
+    @patch('services.pilot_orchestrator.src.nodes.get_connector')
     @patch('services.pilot_orchestrator.src.nodes.llm_client')
     @patch('services.pilot_orchestrator.src.nodes.get_kb_store')
     def test_rag_flow_success(self, mock_kb, mock_llm, mock_db):
@@ -52,7 +52,7 @@ class TestAgenticRAG(unittest.TestCase):
         self.assertEqual(result.get("final_answer"), "Final Answer")
         print("✅ Happy Path Verified")
 
-    @patch('services.pilot_orchestrator.src.nodes.DuckDBConnector')
+    @patch('services.pilot_orchestrator.src.nodes.get_connector')
     @patch('services.pilot_orchestrator.src.nodes.llm_client')
     @patch('services.pilot_orchestrator.src.nodes.get_kb_store')
     def test_rag_context_retry(self, mock_kb, mock_llm, mock_db):
@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# Add project root and bulk loader src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../services/bulk-loader/src")))
+
+from log_loader import BulkLoaderJob
+from shared.db.duckdb_client import DuckDBConnector
+from shared.utils.log_parser import LogParser
+from shared.utils.pii_masker import PIIMasker
+from shared.utils.template_miner import LogTemplateMiner
+
+
+class TestBulkLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = DuckDBConnector(db_path=os.path.join(self.tmp, "logs.duckdb"),
+                                  history_path=os.path.join(self.tmp, "history.duckdb"))
+        self.job = BulkLoaderJob.__new__(BulkLoaderJob)
+        self.job.db = self.db
+        self.job.writer = self.db.open_writer()
+        self.job.miner = LogTemplateMiner(persistence_file=os.path.join(self.tmp, "drain3_state.bin"))
+        self.job.parser = LogParser()
+        self.job.pii_masker = PIIMasker()
+
+    def tearDown(self):
+        self.job.writer.close()
+        self.job.miner.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_line_that_fails_to_mine_is_skipped(self):
+        lines = [f"2025-11-24 10:00:0{i} INFO svc: Job {i} done" for i in range(3)] + ["not a log", "bad line"]
+        mine = self.job.miner.mine_template
+
+        def flaky(body):
+            if body == "bad line":
+                raise ValueError("boom")
+            return mine(body)
+
+        with mock.patch.object(self.job.miner, "mine_template", side_effect=flaky):
+            self.assertEqual(self.job.load_chunk(lines, "app.log"), 4)
+        self.job.writer.release()
+        self.assertEqual(self.db.query("SELECT count(*) FROM logs WHERE body = 'bad line'")[0][0], 0)
+        self.assertEqual(self.db.query("SELECT count(*) FROM logs")[0][0], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
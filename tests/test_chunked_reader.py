@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils.chunked_reader import (
+    MappedLogFile, decode_lines, iter_buffered_chunks, iter_file_lines, line_ends, read_range, read_range_lines
+)
+from shared.utils.compressed_reader import iter_log_lines
+from shared.utils.parallel_pipeline import ParallelPreprocessor
+
+LINES = [f"2025-11-24 10:00:{i % 60:02d} INFO svc-{i % 7}: message number {i} ünïcödé" for i in range(500)]
+
+
+class TestChunkedReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "big.log")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("\n".join(LINES) + "\n\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_chunks_are_newline_aligned_and_cover_file(self):
+        with MappedLogFile(self.path) as mapped:
+            ranges = list(mapped.chunks(chunk_size=1000))
+            self.assertGreater(len(ranges), 5)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], mapped.size)
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+                self.assertEqual(bytes(mapped.view(end - 1, end)), b"\n")
+
+    def test_same_lines_as_text_iteration(self):
+        with open(self.path, encoding="utf-8") as f:
+            expected = [line.rstrip("\n") for line in f]
+        self.assertEqual(list(iter_file_lines(self.path, chunk_size=777)), expected)
+
+    def test_buffered_chunks_match_mapped_lines(self):
+        with open(self.path, "ab") as f:
+            f.write(b"caf\xe9 latin-1\r\nlast line without newline")
+        data = open(self.path, "rb").read()
+        chunks = list(iter_buffered_chunks(self.path, chunk_size=1000))
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual([line for lines, _ in chunks for line in lines], decode_lines(data))
+        # Every line ends just past its own bytes
+        ends = [end for _, line_ends in chunks for end in line_ends]
+        self.assertEqual(ends, line_ends(data))
+        for end in ends[:-1]:
+            self.assertEqual(data[end - 1:end], b"\n")
+        self.assertEqual(ends[-1], len(data))
+        self.assertEqual(list(iter_log_lines(self.path)), list(iter_file_lines(self.path)))
+
+    def test_range_reader_and_empty_file(self):
+        with MappedLogFile(self.path) as mapped:
+            start, end = next(mapped.chunks(chunk_size=300))
+            self.assertEqual(read_range_lines(self.path, start, end), mapped.lines(start, end))
+            lines, ends = read_range(self.path, start, end)
+            self.assertEqual(lines, mapped.lines(start, end))
+            self.assertEqual((len(ends), ends[-1]), (len(lines), end))
+        empty = os.path.join(self.tmp, "empty.log")
+        open(empty, "w").close()
+        self.assertEqual(list(iter_file_lines(empty)), [])
+
+    def test_imap_file_positions_allow_resume(self):
+        pre = ParallelPreprocessor(workers=1, range_bytes=2048)
+        results = list(pre.imap_file(self.path))
+        self.assertEqual([r[0] for r in results], LINES)
+        positions = [r[3] for r in results if r[3] is not None]
+        self.assertEqual(positions[-1], (os.path.getsize(self.path), len(LINES) + 1))
+
+        # Resuming from an intermediate position yields exactly the remainder
+        offset, line_count = positions[2]
+        remainder = list(pre.imap_file(self.path, offset, line_count))
+        self.assertEqual([r[0] for r in remainder], LINES[line_count:])
+
+    def test_every_row_has_its_own_resume_point(self):
+        pre = ParallelPreprocessor(workers=1, range_bytes=2048)
+        data = open(self.path, "rb").read()
+        for batch, position in pre.imap_file_batches(self.path):
+            self.assertEqual(len(batch.offsets), len(batch))
+            for raw_log, (offset, line_count) in zip(batch.raw, batch.offsets):
+                # Just past the row's own line, which is line `line_count` of the file
+                self.assertEqual(data[:offset].decode("utf-8").split("\n")[-2], raw_log)
+                self.assertEqual(LINES[line_count - 1], raw_log)
+            self.assertLessEqual(batch.offsets[-1], position)
+
+        # Resuming just past any row yields exactly the lines after it
+        batch, _ = next(pre.imap_file_batches(self.path))
+        offset, line_count = batch.offsets[3]
+        remainder = list(pre.imap_file(self.path, offset, line_count))
+        self.assertEqual([r[0] for r in remainder], LINES[line_count:])
+
+    def test_imap_file_with_worker_pool(self):
+        pool = ParallelPreprocessor(workers=2, range_bytes=2048)
+        try:
+            results = list(pool.imap_file(self.path))
+        finally:
+            pool.close()
+        self.assertEqual([r[0] for r in results], LINES)
+        # Ends at the same resume point as the inline (buffered) reader
+        inline = ParallelPreprocessor(workers=1, range_bytes=2048)
+        self.assertEqual([r[3] for r in results][-1], [r[3] for r in inline.imap_file(self.path)][-1])
+        pool = ParallelPreprocessor(workers=2, range_bytes=2048)
+        try:
+            pooled = [offsets for batch, _ in pool.imap_file_batches(self.path) for offsets in batch.offsets]
+        finally:
+            pool.close()
+        self.assertEqual(pooled, [offsets for batch, _ in inline.imap_file_batches(self.path) for offsets in batch.offsets])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import bz2
+import gzip
+import shutil
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils.compressed_reader import (
+    detect_compression, iter_decompressed_chunks, iter_log_lines, zstandard
+)
+from shared.utils.parallel_pipeline import ParallelPreprocessor
+
+LINES = [f"2025-11-24 10:00:{i % 60:02d} INFO svc-{i % 5}: request {i} done" for i in range(400)]
+PAYLOAD = ("\n".join(LINES) + "\n").encode("utf-8")
+
+
+class TestCompressedReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_gzip_and_bz2_round_trip(self):
+        for name, data in (("app.log.gz", gzip.compress(PAYLOAD)), ("app.log.bz2", bz2.compress(PAYLOAD))):
+            path = self._write(name, data)
+            self.assertEqual(list(iter_log_lines(path, chunk_size=1000)), LINES)
+
+    @unittest.skipIf(zstandard is None, "zstandard not installed")
+    def test_zstd_multi_frame(self):
+        half = len(PAYLOAD) // 2
+        cctx = zstandard.ZstdCompressor()
+        path = self._write("app.log.zst", cctx.compress(PAYLOAD[:half]) + cctx.compress(PAYLOAD[half:]))
+        self.assertEqual(list(iter_log_lines(path, chunk_size=777)), LINES)
+
+    def test_multi_member_gzip(self):
+        # `cat part1.gz part2.gz > app.log.gz`
+        half = len(PAYLOAD) // 2
+        path = self._write("app.log.gz", gzip.compress(PAYLOAD[:half]) + gzip.compress(PAYLOAD[half:]))
+        self.assertEqual(list(iter_log_lines(path, chunk_size=500)), LINES)
+
+    def test_magic_bytes_beat_extension(self):
+        path = self._write("mislabelled.log", gzip.compress(PAYLOAD))
+        self.assertEqual(detect_compression(path), "gzip")
+        self.assertEqual(detect_compression(self._write("plain.log", PAYLOAD)), None)
+
+    def test_resume_from_decompressed_offset(self):
+        path = self._write("app.log.gz", gzip.compress(PAYLOAD))
+        chunks = list(iter_decompressed_chunks(path, chunk_size=1000))
+        lines_before = sum(len(lines) for lines, _ in chunks[:3])
+        resumed = [line for lines, _ in iter_decompressed_chunks(path, start=chunks[2][1][-1], chunk_size=1000) for line in lines]
+        self.assertEqual(resumed, LINES[lines_before:])
+
+    def test_preprocessor_streams_compressed_file(self):
+        path = self._write("app.log.gz", gzip.compress(PAYLOAD))
+        preprocessor = ParallelPreprocessor(workers=1, range_bytes=2048)
+        results = list(preprocessor.imap_file(path))
+        self.assertEqual([r[0] for r in results], LINES)
+        self.assertEqual(results[-1][3], (len(PAYLOAD), len(LINES)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,8 +39,9 @@ def test_drain3_mining():
     else:
         print(f"❌ FAILURE: Expected 2 clusters, got {total_clusters}")
         
-    # Verify Persistence
+    # Verify Persistence (close() snapshots pending changes and waits for the write)
     print("\n💾 Verifying Persistence...")
+    miner.close()
     miner2 = LogTemplateMiner(persistence_file="data/test_drain3_state.bin")
     if miner2.get_total_clusters() == 2:
         print("✅ SUCCESS: State loaded correctly.")
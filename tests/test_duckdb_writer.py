@@ -0,0 +1,256 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from datetime import datetime, timezone, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, LOG_COLUMNS, parse_hot_keys, get_connector
+from shared.log_schema import LogBatch
+
+CONTEXT = LOG_COLUMNS.index("context")
+
+
+def decode(result):
+    """`SELECT * FROM logs` rows with their context decoded (encodings may differ in whitespace)."""
+    return [row[:CONTEXT] + (json.loads(row[CONTEXT]),) + row[CONTEXT + 1:] for row in result]
+
+
+def sample_logs():
+    return [
+        {
+            "timestamp": datetime(2025, 11, 24, 10, 0, i, tzinfo=timezone.utc),
+            "severity": "ERROR" if i % 2 else "INFO",
+            "service_name": "payment-service",
+            "body": f"Payment failed for user_id={i}",
+            "host": "server-001",
+            "context": {"template_id": "7", "user_id": i},
+        }
+        for i in range(10)
+    ] + [{
+        "timestamp": datetime(2025, 11, 24, 16, 0, 0, tzinfo=timezone(timedelta(hours=2))),
+        "severity": "INFO",
+        "service_name": "nginx",
+        "body": "GET / 200",
+        "context": {},
+    }]
+
+
+class TestDuckDBWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_bulk_insert_matches_legacy_insert(self):
+        legacy = DuckDBConnector(db_path=os.path.join(self.tmp, "legacy.duckdb"))
+        bulk = DuckDBConnector(db_path=os.path.join(self.tmp, "bulk.duckdb"))
+        legacy.insert_batch(sample_logs())
+
+        writer = bulk.open_writer()
+        self.assertEqual(writer.insert_batch(sample_logs()), 11)
+        writer.close()
+
+        sql = "SELECT * FROM logs ORDER BY timestamp, body"
+        self.assertEqual(bulk.query(sql), legacy.query(sql))
+        context = json.loads(bulk.query("SELECT context FROM logs WHERE body LIKE '%user_id=3'")[0][0])
+        self.assertEqual(context["user_id"], 3)
+
+    def test_log_batch_insert_matches_row_insert(self):
+        rows = DuckDBConnector(db_path=os.path.join(self.tmp, "rows.duckdb"))
+        columnar = DuckDBConnector(db_path=os.path.join(self.tmp, "columnar.duckdb"))
+        rows.insert_batch(sample_logs())
+
+        batch = LogBatch.from_rows([
+            tuple(log.get(name) for name in LogBatch.ROW_FIELDS) for log in sample_logs()
+        ])
+        writer = columnar.open_writer()
+        self.assertEqual(writer.insert_log_batch(batch, [("/landing/app.log", 42, 1000, 300, 11, 3)]), 11)
+        writer.close()
+
+        # Context is encoded compactly by the JSON codec: compare it decoded
+        sql = "SELECT * FROM logs ORDER BY timestamp, body"
+        self.assertEqual(decode(columnar.query(sql)), decode(rows.query(sql)))
+
+    def test_raw_json_context_is_written_verbatim(self):
+        db = DuckDBConnector(db_path=os.path.join(self.tmp, "logs.duckdb"))
+        raw = '{"message": "hi", "user":{"id": 7}}'
+        row = (datetime(2025, 11, 24, tzinfo=timezone.utc), "INFO", "svc", None, "hi", None, None, None, None, None,
+               json.loads(raw), "json", raw)
+        batch = LogBatch.from_rows([row, row])
+        batch.wrap_context(1, {"template_id": "3"}, {"source_file": "app.log"})
+
+        writer = db.open_writer()
+        writer.insert_log_batch(batch)
+        writer.close()
+
+        contexts = [r[0] for r in db.query("SELECT context FROM logs")]
+        self.assertEqual(contexts[0], raw)
+        self.assertEqual(json.loads(contexts[1]), {"template_id": "3", "message": "hi", "user": {"id": 7}, "source_file": "app.log"})
+
+    def test_compact_storage_reads_like_row_storage(self):
+        raw = '{"message": "x", "n": null, "f": 1.50}'
+        row = lambda body, context, context_raw=None: (
+            datetime(2025, 11, 24, tzinfo=timezone.utc), "INFO", "svc", None, body, None, None, None, None, None,
+            context, "json", context_raw)
+        templates = [
+            ("Payment failed for user_id=7", {}, "4", "Payment failed for <*>"),
+            ("Payment  failed for user_id=8", {}, "4", "Payment failed for <*>"),  # Other whitespace
+            ("x", json.loads(raw), "5", "<*>"),
+            ("id=<*> 9 ok", {"user": "é"}, "6", "id=<*> <*> ok"),  # Wildcard inside a literal
+            ("Job done", {"template_id": "own"}, "7", "Job done"),  # Context keeps its own template_id
+        ]
+
+        results = []
+        for storage in ("row", "compact"):
+            db = DuckDBConnector(db_path=os.path.join(self.tmp, f"{storage}.duckdb"), storage=storage)
+            for _ in range(2):  # The second writer reuses the stored templates
+                batch = LogBatch.from_rows([row(body, dict(context), raw if context and "n" in context else None)
+                                            for body, context, _, _ in templates])
+                writer = db.open_writer()
+                for i, (_, _, template_id, template) in enumerate(templates):
+                    batch.wrap_template(i, template_id, template, {"change_type": "none"},
+                                        {"source_file": "app.log"} if i % 2 else None, inline=not writer.compact)
+                writer.insert_log_batch(batch)
+                writer.close()
+            self.assertEqual(writer.compact, storage == "compact")
+            results.append(decode(db.query("SELECT * FROM logs ORDER BY body")))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(len(results[1]), 10)
+        self.assertEqual(db.storage, "compact")
+        self.assertEqual(db.query("SELECT count(*) FROM log_templates")[0][0], 3)
+        self.assertEqual(db.query("SELECT count(*) FROM log_rows WHERE body IS NULL")[0][0], 4)
+        self.assertEqual(writer.bodies_rebuilt, 2)
+        self.assertEqual(writer.bodies_kept, 2)
+
+    def test_hot_keys_are_typed_columns(self):
+        for storage in ("row", "compact"):
+            db = DuckDBConnector(db_path=os.path.join(self.tmp, f"{storage}.duckdb"), storage=storage)
+            row = (datetime(2025, 11, 24, tzinfo=timezone.utc), "INFO", "svc", None, "Job 7 done", None, None, None,
+                   None, None, {}, "standard", None)
+            batch = LogBatch.from_rows([row, row])
+            writer = db.open_writer()
+            for i in range(2):
+                batch.wrap_template(i, "12", "Job <*> done", {"change_type": "none"}, {"source_file": "app.log"},
+                                    inline=not writer.compact)
+            writer.insert_log_batch(batch)
+            writer.close()
+            db.insert_batch(sample_logs())
+
+            self.assertEqual(db.query("SELECT count(*) FROM logs WHERE template_id = '12' AND source_file = 'app.log'")[0][0], 2)
+            self.assertEqual(db.query("SELECT count(*) FROM logs WHERE template_id = '7' AND change_type IS NULL")[0][0], 10)
+
+    def test_existing_database_is_migrated(self):
+        path = os.path.join(self.tmp, "old.duckdb")
+        conn = duckdb.connect(path)
+        conn.execute(f"CREATE TABLE logs (timestamp TIMESTAMP, {', '.join(c + ' VARCHAR' for c in LOG_COLUMNS[1:])})")
+        conn.execute("""INSERT INTO logs (timestamp, body, context)
+                        VALUES ('2025-01-01', 'a', '{"template_id": "3", "status": "503"}'), ('2025-01-02', 'b', '{}')""")
+        conn.close()
+
+        os.environ["LOG_HOT_KEYS"] = "template_id, status:BIGINT"
+        try:
+            db = DuckDBConnector(db_path=path)
+        finally:
+            del os.environ["LOG_HOT_KEYS"]
+        self.assertEqual(db.query("SELECT template_id, status FROM logs ORDER BY timestamp"), [("3", 503), (None, None)])
+        self.assertEqual(db.query("SELECT data_type FROM information_schema.columns WHERE column_name = 'status'"),
+                         [("BIGINT",)])
+
+    def test_hot_key_spec(self):
+        self.assertEqual(parse_hot_keys("template_id, latency_ms:double,"), [("template_id", "VARCHAR"), ("latency_ms", "DOUBLE")])
+        for spec in ("host", "bad-key", "status:BLOB"):
+            with self.assertRaises(ValueError):
+                parse_hot_keys(spec)
+
+    def test_connection_survives_batches_and_release(self):
+        db = DuckDBConnector(db_path=os.path.join(self.tmp, "logs.duckdb"))
+        writer = db.open_writer(checkpoint_interval_s=0)
+        writer.insert_batch(sample_logs())
+        conn = writer._conn
+        writer.insert_batch(sample_logs())
+        self.assertIs(writer._conn, conn)
+        writer.release()
+        self.assertIsNone(writer._conn)
+        writer.insert_batch(sample_logs())
+        writer.close()
+        self.assertEqual(db.query("SELECT count(*) FROM logs")[0][0], 33)
+
+    def test_offsets_commit_with_rows_and_roll_back_with_them(self):
+        db = DuckDBConnector(db_path=os.path.join(self.tmp, "logs.duckdb"))
+        writer = db.open_writer()
+        writer.insert_batch(sample_logs(), [("/landing/app.log", 42, 1000, 300, 11, 3)])
+        self.assertEqual(writer.get_offset("/landing/app.log", 42), ("/landing/app.log", 42, 1000, 300, 11, 3))
+
+        # A failing insert must not advance the journal
+        writer._connection().execute("ALTER TABLE logs RENAME TO logs_broken")
+        with self.assertRaises(Exception):
+            writer.insert_batch(sample_logs(), [("/landing/app.log", 42, 1000, 600, 22, 3)])
+        self.assertEqual(writer.get_offset("/landing/app.log", 42)[3], 300)
+        writer._connection().execute("ALTER TABLE logs_broken RENAME TO logs")
+
+        writer.clear_offset("/landing/app.log", 42)
+        self.assertIsNone(writer.get_offset("/landing/app.log", 42))
+        writer.close()
+
+    def test_renamed_file_keeps_one_offset_row(self):
+        db = DuckDBConnector(db_path=os.path.join(self.tmp, "logs.duckdb"))
+        writer = db.open_writer()
+        writer.commit_offsets([("/landing/app.log", 42, 1000, 300, 11, 3)])
+        # Rotated to another followed name: found by (device, inode), not by path
+        self.assertIsNone(writer.get_offset("/landing/app.1.log", 42))
+        self.assertEqual(writer.get_offset("/landing/app.1.log", 42, 3)[:5], ("/landing/app.log", 42, 1000, 300, 11))
+        self.assertIsNone(writer.get_offset("/landing/app.1.log", 42, 4))  # Same inode, other device
+
+        # Journaling it under the new name replaces the old row
+        writer.commit_offsets([("/landing/app.1.log", 42, 1200, 400, 15, 3)])
+        self.assertEqual(db.query("SELECT path, \"offset\" FROM ingest_offsets"), [("/landing/app.1.log", 400)])
+        writer.clear_offset("/landing/app.1.log", 42, 3)
+        self.assertEqual(db.query("SELECT count(*) FROM ingest_offsets")[0][0], 0)
+        writer.close()
+
+
+class TestConnectorFactory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "logs.duckdb")
+        self.csv = os.path.join(self.tmp, "catalog.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write_catalog(self, *services):
+        with open(self.csv, "w") as f:
+            f.write("service_name,department\n" + "".join(f"{name},Platform\n" for name in services))
+
+    def test_connector_is_shared_per_database_and_mode(self):
+        db = get_connector(self.db_path)
+        self.assertIs(get_connector(self.db_path), db)
+        self.assertIsNot(get_connector(self.db_path, read_only=True), db)
+        self.assertEqual(get_connector(self.db_path, read_only=True).query("SELECT count(*) FROM logs")[0][0], 0)
+
+    def test_catalog_reloads_only_when_content_changes(self):
+        db = DuckDBConnector(db_path=self.db_path)
+        self.write_catalog("auth-service")
+        self.assertTrue(db.refresh_catalog(self.csv))
+        self.assertFalse(db.refresh_catalog(self.csv))
+
+        # Touched but identical: hashed, not reloaded
+        os.utime(self.csv, ns=(0, 0))
+        self.assertFalse(db.refresh_catalog(self.csv))
+
+        self.write_catalog("auth-service", "payment-service")
+        self.assertTrue(db.refresh_catalog(self.csv))
+        self.assertEqual(db.query("SELECT count(*) FROM system_catalog")[0][0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
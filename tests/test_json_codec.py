@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+import json
+import math
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils import json_codec
+
+
+class TestJSONCodec(unittest.TestCase):
+    def test_loads_matches_stdlib(self):
+        for text in [
+            '{"a": 1, "b": [1.5, "x", null, true], "c": {"d": "\\u00e9"}}',
+            '{"big": 123456789012345678901234567890}',  # beyond 64 bits
+            '{"lone": "\\ud800"}',
+        ]:
+            self.assertEqual(json_codec.loads(text), json.loads(text))
+        self.assertTrue(math.isnan(json_codec.loads('{"x": NaN}')["x"]))
+        with self.assertRaises(json.JSONDecodeError):
+            json_codec.loads('{"unterminated": ')
+
+    def test_dumps_round_trips(self):
+        data = {"a": 1, "b": ["é", None], "c": {"d": 2.5}, 3: "int key"}
+        self.assertEqual(json.loads(json_codec.dumps(data)), json.loads(json.dumps(data)))
+        self.assertEqual(json.loads(json_codec.dumps({"big": 2 ** 70})), {"big": 2 ** 70})
+
+    def test_splice_object(self):
+        raw = ' { "message": "hi" , "n": 1 } '
+        spliced = json_codec.splice_object({"template_id": "3"}, raw, {"source_file": "a.log"})
+        self.assertEqual(json.loads(spliced), {"template_id": "3", "message": "hi", "n": 1, "source_file": "a.log"})
+        self.assertEqual(list(json.loads(spliced)), ["template_id", "message", "n", "source_file"])
+        self.assertEqual(json.loads(json_codec.splice_object({"a": 1}, "{}")), {"a": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
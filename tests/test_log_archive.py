@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import glob
+import shutil
+import tempfile
+from datetime import datetime, timezone, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.db.duckdb_client import DuckDBConnector
+from shared.db.log_archive import LogArchive
+
+NOW = datetime(2025, 11, 24, 12, 30, tzinfo=timezone.utc)
+
+
+def sample_logs():
+    """Four days of logs from two services, the last one still open at `NOW`."""
+    return [
+        {
+            "timestamp": NOW - timedelta(days=day, minutes=i),
+            "severity": "ERROR" if i % 3 == 0 else "INFO",
+            "service_name": "payment-service" if i % 2 else "auth/service",
+            "body": f"Request {i} took {day * 10 + i} ms",
+            "context": {"template_id": str(i % 4), "source_file": "app.log"},
+        }
+        for day in range(4) for i in range(6)
+    ]
+
+
+class TestLogArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "logs.duckdb")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_cutoff(self):
+        self.assertEqual(LogArchive(self.tmp).cutoff(NOW), datetime(2025, 11, 24))
+        self.assertEqual(LogArchive(self.tmp, partition="hour", hot_buckets=3).cutoff(NOW), datetime(2025, 11, 24, 10))
+
+    def test_closed_buckets_move_to_parquet(self):
+        row = DuckDBConnector(db_path=os.path.join(self.tmp, "row.duckdb"))
+        row.insert_batch(sample_logs())
+        db = DuckDBConnector(db_path=self.path, storage="tiered")
+        db.insert_batch(sample_logs())
+
+        writer = db.open_writer()
+        writer.archive = LogArchive(os.path.join(self.tmp, "archive"), by_service=True)
+        result = writer.archive_closed(NOW)
+        writer.close()
+
+        self.assertEqual(result["rows"], 18)
+        self.assertEqual(result["files"], 6)  # 3 closed days x 2 services
+        self.assertTrue(os.path.isdir(os.path.join(self.tmp, "archive", "day=2025-11-21", "service_name=auth%2Fservice")))
+        self.assertEqual(db.query("SELECT count(*) FROM logs_hot")[0][0], 6)
+
+        sql = "SELECT * FROM logs ORDER BY timestamp, body"
+        self.assertEqual(db.query(sql), row.query(sql))
+        self.assertEqual(db.query("SELECT count(*) FROM logs WHERE service_name = 'auth/service' AND template_id = '0'")[0][0],
+                         row.query("SELECT count(*) FROM logs WHERE service_name = 'auth/service' AND template_id = '0'")[0][0])
+        plan = db.query("EXPLAIN ANALYZE SELECT count(*) FROM logs WHERE service_name = 'payment-service'")[0][1]
+        self.assertIn("Scanning Files: 3/6", plan)
+
+        # Nothing closed since: a second run is a no-op
+        writer = db.open_writer()
+        self.assertEqual(writer.archive_closed(NOW)["rows"], 0)
+        writer.close()
+
+    def test_retention_drops_days(self):
+        db = DuckDBConnector(db_path=self.path, storage="tiered")
+        db.insert_batch(sample_logs())
+        writer = db.open_writer()
+        writer.archive = LogArchive(os.path.join(self.tmp, "archive"), retention_days=2)
+        result = writer.archive_closed(NOW)
+        writer.close()
+
+        self.assertEqual(result["dropped"], ["2025-11-21"])
+        self.assertEqual(db.query("SELECT min(timestamp)::DATE::VARCHAR FROM logs")[0][0], "2025-11-22")
+        self.assertEqual(db.query("SELECT count(*) FROM logs")[0][0], 18)
+
+    def test_unpublished_batch_is_recovered(self):
+        db = DuckDBConnector(db_path=self.path, storage="tiered")
+        db.insert_batch(sample_logs())
+        writer = db.open_writer()
+        # Crash after the commit, before the files were moved into place
+        writer.archive._publish = lambda conn, batch_id: 0
+        writer.archive_closed(NOW)
+        writer.close()
+        # ... and an uncommitted batch left behind in staging
+        os.makedirs(os.path.join(self.tmp, "archive", "_staging", "orphan"))
+
+        writer = db.open_writer()
+        writer.storage  # Connects and recovers
+        writer.close()
+        self.assertEqual(db.query("SELECT count(*) FROM logs")[0][0], 24)
+        self.assertEqual(db.query("SELECT state FROM archive_batches"), [("published",)])
+        self.assertEqual(os.listdir(os.path.join(self.tmp, "archive", "_staging")), [])
+
+    def test_row_database_upgrades_to_tiered(self):
+        DuckDBConnector(db_path=self.path).insert_batch(sample_logs())
+        db = DuckDBConnector(db_path=self.path, storage="tiered")
+        self.assertEqual(db.storage, "tiered")
+        writer = db.open_writer()
+        self.assertEqual(writer.archive_closed(NOW)["rows"], 18)
+        writer.close()
+        self.assertEqual(db.query("SELECT count(*) FROM logs")[0][0], 24)
+        self.assertEqual(len(glob.glob(os.path.join(self.tmp, "archive", "day=*"))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, DuckDBWriter, STORAGE_TABLES
+from shared.db.log_compaction import LogCompactor, overlap_stats, row_group_ranges
+
+# Three services, one file each: 150k rows a second apart from 2025-01-01,
+# inserted one after the other (about 4 row groups, all overlapping)
+NOW = datetime(2025, 1, 2, 12, 0)
+
+
+def load_per_service(path: str, table: str):
+    conn = duckdb.connect(path)
+    for service in ("auth", "payment", "search"):
+        conn.execute(f"""
+            INSERT INTO {table} (timestamp, severity, service_name, body)
+            SELECT TIMESTAMP '2025-01-01' + to_seconds(i), 'INFO', ?, 'Request ' || i
+            FROM range(150000) t(i)
+        """, [service])
+    conn.execute("CHECKPOINT")
+    conn.close()
+
+
+def fingerprint(db, table: str):
+    return db.query(f"SELECT count(*), sum(hash(timestamp, service_name, body)) FROM {table}")[0]
+
+
+class TestLogCompaction(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "logs.duckdb")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_overlap_stats(self):
+        t = lambda hour: datetime(2025, 1, 1, hour)
+        self.assertEqual(overlap_stats([(t(0), t(9)), (t(1), t(2)), (t(3), t(4)), (t(10), t(11))]),
+                         {"row_groups": 4, "overlapping": 3, "overlap_avg": 1.0, "overlap_max": 2})
+        self.assertEqual(overlap_stats([])["row_groups"], 0)
+
+    def test_closed_rows_are_reclustered(self):
+        for storage in ("row", "compact"):
+            with self.subTest(storage=storage):
+                path = os.path.join(self.tmp, f"{storage}.duckdb")
+                db = DuckDBConnector(db_path=path, storage=storage)
+                table = STORAGE_TABLES[storage]
+                load_per_service(path, table)
+                before = fingerprint(db, table)
+
+                writer = DuckDBWriter(path, snapshot_interval_s=0)
+                writer.compactor = LogCompactor(closed_after_s=0)
+                result = writer.compact_closed(NOW)
+                self.assertEqual(result["before"]["overlapping"], result["before"]["row_groups"])
+                self.assertEqual(result["after"]["overlapping"], 0)
+                # Everything before the cutoff was rewritten, the open tail was left alone
+                self.assertEqual(result["rows"], 3 * 36 * 3600)
+                self.assertEqual(fingerprint(db, table), before)
+
+                # Nothing left to do until new rows overlap again
+                self.assertEqual(writer.compact_closed(NOW)["rows"], 0)
+                writer.close()
+
+    def test_maybe_compact_runs_on_its_interval(self):
+        DuckDBConnector(db_path=self.path)
+        load_per_service(self.path, "logs")
+        writer = DuckDBWriter(self.path, snapshot_interval_s=0, compact_interval_s=0)
+        writer.maybe_compact()  # Disabled
+        self.assertGreater(overlap_stats(row_group_ranges(writer._connection(), "logs"))["overlapping"], 0)
+
+        writer.compact_interval_s = 3600
+        writer._last_compact -= 3600
+        writer.maybe_compact()  # Defaults: rows older than an hour are closed, i.e. all of them
+        self.assertEqual(overlap_stats(row_group_ranges(writer._connection(), "logs"))["overlapping"], 0)
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
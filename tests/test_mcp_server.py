@@ -30,12 +30,12 @@ sys.modules["fastapi"] = MagicMock()
 # Import functions to test
 from services.mcp_server.src.main import query_logs, ask_log_pilot, get_recent_logs, get_db
 
-@patch("services.mcp_server.src.main.DuckDBConnector")
+@patch("services.mcp_server.src.main.get_connector")
 def test_query_logs(mock_connector):
     # Setup Mock DB
     mock_db_instance = MagicMock()
     mock_connector.return_value = mock_db_instance
-    mock_db_instance.conn.execute.return_value.fetchall.return_value = [("error1",), ("error2",)]
+    mock_db_instance.query.return_value = [("error1",), ("error2",)]
     
     # Reset global db_client in main to force re-init
     import services.mcp_server.src.main as main_module
@@ -47,7 +47,7 @@ def test_query_logs(mock_connector):
     # Verify
     assert "error1" in result
     assert "error2" in result
-    mock_db_instance.conn.execute.assert_called_with("SELECT * FROM logs")
+    mock_db_instance.query.assert_called_with("SELECT * FROM logs")
 
 @patch("services.mcp_server.src.main.requests.post")
 def test_ask_log_pilot(mock_post):
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import json
+import time
+import urllib.request
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils.metrics import Histogram, MetricsRegistry
+from shared.utils.parallel_pipeline import ParallelPreprocessor
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry(prefix="test_")
+
+    def tearDown(self):
+        self.registry.close()
+
+    def test_counters_gauges_histograms(self):
+        lines = self.registry.counter("lines_total")
+        by_format = self.registry.counter("lines_by_format_total", label="format")
+        lines.inc(3)
+        by_format.inc(label_value="json")
+        by_format.inc(2, label_value="nginx")
+        self.assertIs(self.registry.counter("lines_total"), lines)
+
+        depth = [7]
+        self.registry.gauge("queue_depth", lambda: depth[0])
+        self.registry.register("latency_seconds", Histogram()).observe(0.002)
+
+        snap = self.registry.snapshot()
+        self.assertEqual(snap["lines_total"], 3)
+        self.assertEqual(snap["lines_by_format_total"], {"json": 1, "nginx": 2})
+        self.assertEqual(snap["queue_depth"], 7)
+        self.assertEqual(snap["latency_seconds"]["count"], 1)
+
+        text = self.registry.render_prometheus()
+        self.assertIn("test_lines_total 3", text)
+        self.assertIn('test_lines_by_format_total{format="nginx"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.005"} 1', text)
+
+    def test_http_endpoint(self):
+        self.registry.counter("lines_total").inc(5)
+        server = self.registry.serve(0, host="127.0.0.1")
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(base + "/metrics") as resp:
+            self.assertIn("test_lines_total 5", resp.read().decode())
+        with urllib.request.urlopen(base + "/metrics.json") as resp:
+            self.assertEqual(json.loads(resp.read())["lines_total"], 5)
+
+    def test_periodic_reporter(self):
+        lines = []
+        self.registry.counter("lines_total").inc(10)
+        self.registry.start_reporter(0.05, rate_counters=("lines_total",), emit=lines.append)
+        time.sleep(0.2)
+        self.registry.close()
+        self.assertTrue(lines)
+        self.assertIn("lines_total=10", lines[0])
+
+
+class TestPreprocessorTimings(unittest.TestCase):
+    def test_stage_latencies_and_format(self):
+        preprocessor = ParallelPreprocessor(workers=1)
+        results = list(preprocessor.imap([
+            "2025-11-24 10:00:00 INFO svc: hello",
+            '{"message": "hi", "level": "WARN"}',
+        ]))
+        self.assertEqual([r[1]["log_format"] for r in results], ["standard", "json"])
+        self.assertEqual(preprocessor.parse_latency_hist.count, 2)
+        self.assertEqual(preprocessor.mask_latency_hist.count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
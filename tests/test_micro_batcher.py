@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Add project root and ingestion worker src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../services/ingestion-worker/src")))
+
+from batching import AdaptiveBatchPolicy, MicroBatcher
+
+
+class TestAdaptiveBatchPolicy(unittest.TestCase):
+    def test_flush_reasons(self):
+        policy = AdaptiveBatchPolicy(min_rows=10, max_rows=100, max_bytes=1000, max_latency_s=1.0)
+        self.assertIsNone(policy.flush_reason(0, 0, 5.0))
+        self.assertEqual(policy.flush_reason(10, 0, 0.0), "rows")
+        self.assertEqual(policy.flush_reason(1, 1000, 0.0), "bytes")
+        self.assertEqual(policy.flush_reason(1, 10, 1.5), "latency")
+
+    def test_grows_under_load_and_shrinks_when_idle(self):
+        policy = AdaptiveBatchPolicy(min_rows=10, max_rows=40, max_latency_s=1.0)
+        policy.adapt("rows", 0.01)
+        policy.adapt("rows", 0.01)
+        policy.adapt("rows", 0.01)
+        self.assertEqual(policy.target_rows, 40)
+        policy.adapt("latency", 1.0)
+        self.assertEqual(policy.target_rows, 20)
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_flush_persists_everything_in_order(self):
+        seen = []
+        batcher = MicroBatcher(seen.extend, AdaptiveBatchPolicy(min_rows=7, max_latency_s=10))
+        for i in range(50):
+            batcher.add(i, 10)
+        batcher.flush()
+        self.assertEqual(seen, list(range(50)))
+        self.assertEqual(batcher.pending_bytes, 0)
+        batcher.close()
+
+    def test_latency_flush_without_new_rows(self):
+        seen = []
+        batcher = MicroBatcher(seen.extend, AdaptiveBatchPolicy(min_rows=1000, max_latency_s=0.05))
+        batcher.add("x", 1)
+        time.sleep(0.3)
+        self.assertEqual(seen, ["x"])
+        batcher.close()
+
+    def test_backpressure_blocks_reader(self):
+        release = threading.Event()
+
+        def slow_sink(batch):
+            release.wait(timeout=5)
+
+        batcher = MicroBatcher(slow_sink, AdaptiveBatchPolicy(min_rows=1, max_latency_s=10), max_pending_bytes=100)
+        batcher.add("a", 80)
+        done = threading.Event()
+        threading.Thread(target=lambda: (batcher.add("b", 80), done.set()), daemon=True).start()
+        self.assertFalse(done.wait(timeout=0.2))
+        release.set()
+        self.assertTrue(done.wait(timeout=2))
+        batcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils.log_parser import LogParser
+from shared.utils.parallel_pipeline import ParallelPreprocessor, preprocess_line
+from shared.utils.pii_masker import PIIMasker
+
+LINES = [
+    "2025-11-24 10:00:{:02d} INFO payment-service: Payment processed for user_id={} email=u{}@example.com".format(i % 60, i, i)
+    for i in range(250)
+]
+
+
+class TestParallelPreprocessor(unittest.TestCase):
+    def test_inline_matches_pool_and_keeps_order(self):
+        inline = ParallelPreprocessor(workers=1)
+        pooled = ParallelPreprocessor(workers=2, chunk_size=16, max_inflight=2)
+        try:
+            expected = list(inline.imap(LINES))
+            actual = list(pooled.imap(LINES))
+        finally:
+            inline.close()
+            pooled.close()
+
+        self.assertEqual(len(actual), len(LINES))
+        self.assertEqual([r[0] for r in actual], LINES)
+        self.assertEqual([r[1]["body"] for r in actual], [r[1]["body"] for r in expected])
+        self.assertIn("<EMAIL_REDACTED>", actual[0][1]["body"])
+
+    def test_batches_match_per_line_preprocessing(self):
+        parser, masker = LogParser(), PIIMasker()
+        pooled = ParallelPreprocessor(workers=2, chunk_size=100)
+        try:
+            batches = list(pooled.imap_batches(LINES))
+        finally:
+            pooled.close()
+
+        self.assertEqual([len(b) for b in batches], [100, 100, 50])
+        rows = [b.row(i) for b in batches for i in range(len(b))]
+        self.assertEqual(rows, [preprocess_line(parser, masker, line) for line in LINES])
+        self.assertEqual(pooled.parse_latency_hist.count, len(LINES))
+
+    def test_json_rows_keep_raw_context_unless_masked(self):
+        parser, masker = LogParser(), PIIMasker()
+        lines = [
+            '{"timestamp": "2025-11-24T10:00:00Z", "message": "clean", "level": "INFO", "user": {"id": 1}}',
+            '{"timestamp": "2025-11-24T10:00:00Z", "message": "mail a@b.com", "user": {"email": "a@b.com"}}',
+            '{"timestamp": "2025-11-24T10:00:00Z", "message": "escaped a\\u0040b.com"}',
+            '{"timestamp": "2025-11-24T10:00:00Z", "message": "digits only", "count": 1234567890123456}',
+        ]
+        batch = masker.mask_batch(parser.parse_many(lines))
+        raws = batch.columns["context_raw"]
+        self.assertEqual(raws[0], lines[0])
+        self.assertIsNone(raws[1])
+        self.assertIsNone(raws[2])
+        self.assertEqual(raws[3], lines[3])  # PII-looking number, but only strings are masked
+        self.assertEqual(batch.columns["context"][1]["user"]["email"], "<EMAIL_REDACTED>")
+        self.assertEqual(batch.columns["body"][2], "escaped <EMAIL_REDACTED>")
+        self.assertEqual([batch.row(i) for i in range(len(batch))],
+                         [preprocess_line(parser, masker, line) for line in lines])
+
+    def test_blank_lines_are_skipped(self):
+        pre = ParallelPreprocessor(workers=1)
+        results = list(pre.imap(["", "   \n", LINES[0] + "\n"]))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][0], LINES[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -58,5 +58,56 @@ class TestLogParser(unittest.TestCase):
         self.assertEqual(parsed["severity"], "UNKNOWN")
         self.assertEqual(parsed["body"], "This is just a random string that is not a log")
 
+    def test_formats_are_mutually_exclusive(self):
+        # The order of FORMATS relies on no line matching two formats
+        samples = {
+            "json": [
+                '{"timestamp": "2025-11-24T10:00:00Z", "level": "ERROR", "message": "Login failed"}',
+                '{"message": "2025-11-24 10:00:00 INFO svc: looks standard"}',
+            ],
+            "standard": [
+                "2025-11-24 10:00:00 INFO payment-service: Payment processed env=prod",
+                '2025-11-24 10:00:00 WARN nginx: 10.0.0.1 - - [24/Nov/2025:16:00:00 +0000] "GET / HTTP/1.1" 200 1',
+            ],
+            "syslog": [
+                "Nov 24 16:00:00 ubuntu-server sshd[1234]: Accepted password for user root",
+                "Nov  4 16:00:00 host cron: {\"job\": 1} 2025-11-24 10:00:00 INFO x: y",
+            ],
+            "nginx": [
+                '192.168.1.1 - - [24/Nov/2025:16:00:00 +0000] "GET /api/v1/users HTTP/1.1" 200 1024',
+                '10.0.0.2 - - [24/Nov/2025:16:00:01 +0000] "POST /login HTTP/1.1" 401 0',
+            ],
+        }
+        for fmt, lines in samples.items():
+            for line in lines:
+                self.assertIsNotNone(self.parser._extract(fmt, line), line)
+                for other in LogParser.FORMATS:
+                    if other != fmt:
+                        with self.subTest(format=fmt, extractor=other, line=line):
+                            self.assertIsNone(self.parser._extract(other, line))
+
+    def test_parse_many_matches_parse(self):
+        lines = [
+            "2025-11-24 10:00:00 INFO payment-service: Payment processed env=prod region=eu-west-1",
+            "",
+            '{"timestamp": "2025-11-24T10:00:00Z", "level": 3, "service": "auth", "message": "Login failed"}',
+            "Nov 24 16:00:00 ubuntu-server sshd[1234]: Accepted password for user root",
+            '   192.168.1.1 - - [24/Nov/2025:16:00:00 +0000] "GET / HTTP/1.1" 200 1024   ',
+        ]
+        batch = self.parser.parse_many(lines)
+        self.assertEqual(len(batch), 4)
+        self.assertEqual(batch.raw, [line.strip() for line in lines if line.strip()])
+        self.assertEqual(batch.errors, [])
+        for i, raw in enumerate(batch.raw):
+            self.assertEqual(batch.row(i), LogParser().parse(raw))
+        self.assertEqual(batch.columns["severity"][1], "3")  # text columns stay text
+        self.assertEqual(batch.columns["environment"][0], "prod")
+        self.assertEqual(batch.columns["log_format"], ["standard", "json", "syslog", "nginx"])
+
+        # Persisted columns only, context JSON-encoded
+        columns = batch.to_columns()
+        self.assertNotIn("log_format", columns)
+        self.assertEqual(json.loads(columns["context"][2]), {"host": "ubuntu-server"})
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Add project root and ingestion worker src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../services/ingestion-worker/src")))
+
+from indexer import PatternIndexer
+
+
+class TestPatternIndexer(unittest.TestCase):
+    def test_coalesces_updates_per_cluster(self):
+        batches = []
+        indexer = PatternIndexer(sink=batches.append, coalesce_window_s=10.0)
+        for version in range(5):
+            indexer.submit("1", f"template v{version}")
+        indexer.submit("2", "other template")
+        self.assertEqual(indexer.queue_depth, 2)
+        indexer.close()
+
+        self.assertEqual(batches, [["template v4", "other template"]])
+        stats = indexer.stats()
+        self.assertEqual(stats["coalesced"], 4)
+        self.assertEqual(stats["indexed"], 2)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_window_flush_and_batch_size(self):
+        batches = []
+        indexer = PatternIndexer(sink=batches.append, batch_size=3, coalesce_window_s=0.1)
+        for i in range(7):
+            indexer.submit(str(i), i)
+        deadline = time.time() + 2
+        while indexer.stats()["indexed"] < 7 and time.time() < deadline:
+            time.sleep(0.02)
+        indexer.close()
+        self.assertEqual([i for batch in batches for i in batch], list(range(7)))
+        self.assertTrue(all(len(batch) <= 3 for batch in batches))
+
+    def test_slow_sink_does_not_block_submit(self):
+        release = threading.Event()
+        indexer = PatternIndexer(sink=lambda events: release.wait(5), coalesce_window_s=0.0)
+        indexer.submit("1", "a")
+        time.sleep(0.05)  # "1" is now being embedded
+
+        start = time.perf_counter()
+        for i in range(100):
+            indexer.submit(str(i + 2), i)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertGreater(indexer.lag_s(), 0.0)
+
+        release.set()
+        indexer.close()
+        self.assertEqual(indexer.stats()["indexed"], 101)
+
+    def test_errors_are_reported(self):
+        failed = []
+
+        def sink(events):
+            raise RuntimeError("embedding model unavailable")
+
+        indexer = PatternIndexer(sink=sink, on_error=lambda events, e: failed.extend(events))
+        indexer.submit("1", "a")
+        indexer.close()
+        self.assertEqual(failed, ["a"])
+        self.assertEqual(indexer.stats()["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
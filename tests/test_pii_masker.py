@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import re
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils.pii_masker import PIIMasker, PIIDetector, DEFAULT_DETECTORS
+
+# The original four-pass masker
+LEGACY_PATTERNS = [
+    (re.compile(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+'), '<EMAIL_REDACTED>'),
+    (re.compile(r'(?<!\d)(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)(?!\d)'), '<IP_REDACTED>'),
+    (re.compile(r'\b(?:\d[ -]*?){13,16}\b'), '<CC_REDACTED>'),
+    (re.compile(r'\b\d{3}-\d{2}-\d{4}\b'), '<SSN_REDACTED>'),
+]
+
+
+def legacy_mask(text):
+    for pattern, replacement in LEGACY_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class TestPIIMasker(unittest.TestCase):
+    def setUp(self):
+        self.masker = PIIMasker()
+
+    def test_masks_each_kind(self):
+        self.assertEqual(self.masker.mask_text("mail bob.smith@example.com now"), "mail <EMAIL_REDACTED> now")
+        self.assertEqual(self.masker.mask_text("from 192.168.1.10:443"), "from <IP_REDACTED>:443")
+        self.assertEqual(self.masker.mask_text("card 4111 1111-1111 1111 ok"), "card <CC_REDACTED> ok")
+        self.assertEqual(self.masker.mask_text("ssn 123-45-6789."), "ssn <SSN_REDACTED>.")
+
+    def test_clean_text_is_returned_as_is(self):
+        for text in ["Payment processed dept=finance", "took 1234567 ms", "v1.2.3 - ok", "a@b"]:
+            self.assertIs(self.masker.mask_text(text), text)
+        # A memoized clean string still comes back as the caller's own object
+        text = "".join(["payment", "-service"])
+        self.masker.mask_text("payment-service")
+        self.assertIs(self.masker.mask_text(text), text)
+        self.assertEqual(self.masker.mask_text("ip 10.0.0.1"), self.masker.mask_text("ip 10.0.0.1"))
+
+    def test_matches_sequential_masking(self):
+        rng = random.Random(7)
+        alphabet = "0123456789" * 3 + " -.@_:abcxyZ/" + "٣"  # includes an Arabic-Indic digit
+        samples = [
+            "1234567890 192.168.1.1", "123-45-6789 1234", "12345678901234 5a", "1234567890123456-7",
+            "x1234567890123@a.com 10.0.0.1", "1" * 40, "1 " * 30 + "x", "١٢٣٤٥٦٧٨٩٠١٢٣٤",
+        ]
+        for _ in range(5000):
+            samples.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 40))))
+        for text in samples:
+            self.assertEqual(self.masker.mask_text(text), legacy_mask(text), text)
+
+    def test_detectors_are_pluggable(self):
+        masker = PIIMasker(detectors=[d for d in DEFAULT_DETECTORS if d.name == "email"])
+        self.assertEqual(masker.mask_text("a@b.com from 10.0.0.1"), "<EMAIL_REDACTED> from 10.0.0.1")
+
+        masker.register(PIIDetector("token", r'\bsk_[A-Za-z0-9]{8,}\b', '<TOKEN_REDACTED>', requires={"sk_": 1}))
+        self.assertEqual(masker.mask_text("key sk_abcdefgh12 for a@b.com"), "key <TOKEN_REDACTED> for <EMAIL_REDACTED>")
+        with self.assertRaises(ValueError):
+            masker.register(DEFAULT_DETECTORS[0])
+
+    def test_env_selects_detectors(self):
+        os.environ["PII_DETECTORS"] = "ssn, ipv4"
+        try:
+            masker = PIIMasker()
+        finally:
+            del os.environ["PII_DETECTORS"]
+        self.assertEqual([d.name for d in masker.detectors], ["ipv4", "ssn"])
+
+
+if __name__ == '__main__':
+    unittest.main()
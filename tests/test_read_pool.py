@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.db.duckdb_client import DuckDBConnector
+from shared.db.read_pool import list_snapshots
+from tests.test_duckdb_writer import sample_logs
+
+
+class TestReadPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "logs.duckdb")
+        self.db = DuckDBConnector(db_path=self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def writer(self):
+        writer = self.db.open_writer()
+        writer.snapshot_interval_s = 30  # Off by default
+        return writer
+
+    def reader(self, **kwargs):
+        reader = DuckDBConnector(db_path=self.db_path, read_only=True, pooled=True)
+        for name, value in kwargs.items():
+            setattr(reader.pool, name, value)
+        return reader
+
+    def test_falls_back_to_live_reads_without_a_snapshot(self):
+        self.db.insert_batch(sample_logs())
+        reader = self.reader()
+        self.assertEqual(reader.query("SELECT count(*) FROM logs")[0][0], 11)
+        metrics = reader.pool.metrics()
+        self.assertEqual(metrics["source"], "live")
+        self.assertEqual(metrics["fallback_queries"], 1)
+
+    def test_reads_follow_published_snapshots(self):
+        writer = self.writer()
+        writer.insert_batch(sample_logs())
+        writer.release()
+        reader = self.reader()
+        self.assertEqual(reader.query("SELECT count(*) FROM logs")[0][0], 11)
+
+        # The writer keeps the live file; readers only see what it publishes
+        writer.insert_batch(sample_logs())
+        self.assertEqual(reader.query("SELECT count(*) FROM logs")[0][0], 11)
+        self.assertTrue(writer.publish_snapshot())
+        self.assertFalse(writer.publish_snapshot())
+        writer.wait_snapshot()  # Copied in the background
+        self.assertEqual(reader.query("SELECT count(*) FROM logs")[0][0], 22)
+
+        writer.insert_batch(sample_logs())
+        writer.close()
+        self.assertEqual(reader.query("SELECT count(*) FROM logs")[0][0], 33)
+        self.assertEqual(len(list_snapshots(writer.snapshot_dir)), 2)
+        metrics = reader.pool.metrics()
+        self.assertEqual((metrics["source"], metrics["refreshes"], metrics["fallback_queries"]), ("snapshot", 3, 0))
+        self.assertGreaterEqual(metrics["staleness_s"], 0)
+
+    def test_concurrent_queries_share_the_pool(self):
+        writer = self.writer()
+        writer.insert_batch(sample_logs())
+        writer.close()
+        reader = self.reader(size=2)
+        results, errors = [], []
+
+        def run():
+            try:
+                for _ in range(5):
+                    results.append(reader.query("SELECT count(*) FROM logs")[0][0])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [11] * 30)
+        metrics = reader.pool.metrics()
+        self.assertEqual((metrics["queries"], metrics["busy"]), (30, 0))
+        self.assertLessEqual(len(reader.pool._current.idle), 2)
+
+    def test_snapshots_are_off_by_default(self):
+        writer = DuckDBConnector(db_path=self.db_path).open_writer()
+        self.assertEqual(writer.snapshot_interval_s, 0)
+        writer.insert_batch(sample_logs())
+        writer.close()
+        self.assertEqual(list_snapshots(writer.snapshot_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, ROLLUPS, describe_rollups
+from shared.db.log_archive import LogArchive
+from shared.log_schema import LogBatch
+from tests.test_log_archive import sample_logs, NOW
+
+
+def expected(db, unit: str):
+    """What a rollup must hold: the same counts computed from `logs`."""
+    return db.query(f"SELECT date_trunc('{unit}', timestamp), service_name, severity, "
+                    f"coalesce(context->>'$.template_id', ''), count(*) FROM logs GROUP BY ALL ORDER BY ALL")
+
+
+def rollup(db, table: str):
+    return db.query(f"SELECT bucket, service_name, severity, template_id, sum(count) FROM {table} "
+                    f"GROUP BY ALL ORDER BY ALL")
+
+
+class TestRollups(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "logs.duckdb")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def assertRollupsMatch(self, db):
+        for table, unit in ROLLUPS.items():
+            self.assertEqual(rollup(db, table), expected(db, unit), table)
+
+    def test_writer_batches_update_rollups(self):
+        db = DuckDBConnector(db_path=self.path)
+        writer = db.open_writer()
+        logs = sample_logs()
+        writer.insert_batch(logs[:10])
+        writer.insert_batch(logs[10:])
+        writer.insert_batch(logs)  # Same buckets again
+        # Not stored by the insert transactions, but the views count the pending rows
+        self.assertEqual(db.query("SELECT count(*) FROM log_rollup_1d_stored")[0][0], 0)
+        self.assertRollupsMatch(db)
+        writer.close()
+        self.assertEqual(db.query("SELECT count(*) FROM rollup_pending WHERE isfinite(since)")[0][0], 0)
+        self.assertRollupsMatch(db)
+        # 5 (service, severity, template) keys a day, one row each
+        self.assertEqual(db.query("SELECT count(*), sum(count) FROM log_rollup_1d")[0], (4 * 5, 48))
+
+        writer = db.open_writer()
+        writer.insert_batch(logs[:1])  # Only the buckets from this row on are recomputed
+        writer.checkpoint()
+        self.assertRollupsMatch(db)
+        writer.close()
+
+        db.insert_batch(logs)  # Legacy path too (refreshed when its connection is done)
+        self.assertEqual(db.query("SELECT count(*) FROM rollup_pending WHERE isfinite(since)")[0][0], 0)
+        self.assertRollupsMatch(db)
+        self.assertIn("Table: log_rollup_1h", describe_rollups())
+
+    def test_rows_stored_before_a_crash_are_refreshed_on_restart(self):
+        db = DuckDBConnector(db_path=self.path)
+        writer = db.open_writer()
+        writer.insert_batch(sample_logs())
+        writer._conn.close()  # No checkpoint
+        writer._conn = None
+
+        writer = db.open_writer()
+        self.assertEqual(writer.storage, "row")  # Connects
+        writer.close()
+        self.assertRollupsMatch(db)
+        self.assertEqual(db.query("SELECT count(*) FROM rollup_pending WHERE isfinite(since)")[0][0], 0)
+
+    def test_compact_storage_takes_template_ids_from_templates(self):
+        db = DuckDBConnector(db_path=self.path, storage="compact")
+        row = lambda i: (NOW, "ERROR", "svc", None, f"Job {i} done", None, None, None, None, None, {}, "standard", None)
+        batch = LogBatch.from_rows([row(i) for i in range(3)])
+        writer = db.open_writer()
+        for i in range(2):
+            batch.wrap_template(i, "12", "Job <*> done", inline=False)
+        writer.insert_log_batch(batch)
+        writer.close()
+
+        self.assertEqual(db.query("SELECT template_id, count FROM log_rollup_1m ORDER BY ALL"), [("", 1), ("12", 2)])
+        self.assertRollupsMatch(db)
+
+    def test_existing_logs_are_backfilled(self):
+        db = DuckDBConnector(db_path=self.path)
+        db.insert_batch(sample_logs())
+        conn = duckdb.connect(self.path)
+        for table in ROLLUPS:
+            conn.execute(f"DROP VIEW {table}")
+            conn.execute(f"DROP TABLE {table}_stored")
+        conn.close()
+
+        db = DuckDBConnector(db_path=self.path)  # An older database gets its rollups on open
+        self.assertRollupsMatch(db)
+        self.assertEqual(db.query("SELECT count(*) FROM rollup_pending WHERE isfinite(since)")[0][0], 0)
+
+    def test_materialised_rollups_become_stored_tables(self):
+        db = DuckDBConnector(db_path=self.path)
+        db.insert_batch(sample_logs())
+        db.open_writer().close()
+        conn = duckdb.connect(self.path)
+        for table in ROLLUPS:  # As older versions kept them
+            conn.execute(f"DROP VIEW {table}")
+            conn.execute(f"ALTER TABLE {table}_stored RENAME TO {table}")
+        conn.close()
+
+        db = DuckDBConnector(db_path=self.path)
+        self.assertEqual(db.query("SELECT table_type FROM information_schema.tables "
+                                  "WHERE table_name = 'log_rollup_1h'")[0][0], "VIEW")
+        self.assertRollupsMatch(db)
+
+    def test_retention_trims_rollups(self):
+        db = DuckDBConnector(db_path=self.path, storage="tiered")
+        db.insert_batch(sample_logs())
+        writer = db.open_writer()
+        writer.archive = LogArchive(os.path.join(self.tmp, "archive"), retention_days=2)
+        writer.archive_closed(NOW)
+        writer.close()
+
+        self.assertEqual(db.query("SELECT min(bucket)::DATE::VARCHAR FROM log_rollup_1d")[0][0], "2025-11-22")
+        self.assertRollupsMatch(db)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+# Add project root and ingestion worker src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../services/ingestion-worker/src")))
+
+from runbooks import RunbookCardCache, RunbookIngestor, sections_for_topic, split_sections
+
+RUNBOOK = """Intro text for the payment runbook.
+
+# Error 503
+Service unavailable. Fix: restart the gateway.
+
+# Error 504
+Gateway timeout. Fix: raise the upstream timeout.
+
+# Auth Token Expired
+Refresh the token via the auth service.
+
+# Symptoms
+Clients see HTTP 503 responses during deploys.
+"""
+
+TOPICS = ["Error 503", "Error 504", "Auth Token Expired"]
+
+
+class FakeLLM:
+    """Records prompts; synthesis takes a while so concurrency is observable."""
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, model_type="fast"):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if "Return a JSON list" in prompt:
+                return json.dumps(TOPICS)
+            time.sleep(self.delay)
+            topic = prompt.split('the topic: "')[1].split('"')[0]
+            return f"# {topic}\ncard"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeKB:
+    def __init__(self):
+        self.added = []
+        self.deleted = []
+
+    def add_documents(self, documents):
+        self.added.extend(documents)
+
+    def delete_documents(self, where):
+        self.deleted.append(where)
+
+
+class TestRunbookIngestor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp, "cards.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _ingestor(self, llm, kb):
+        return RunbookIngestor(llm, kb, max_concurrency=3, cache=RunbookCardCache(self.cache_path))
+
+    def test_sections_for_topic(self):
+        sections = split_sections(RUNBOOK)
+        self.assertEqual(len(sections), 5)
+        # Scattered information is gathered, unrelated sections are not sent
+        self.assertEqual(sections_for_topic("Error 503", sections), [sections[1], sections[4]])
+        self.assertEqual(sections_for_topic("Auth Token Expired", sections), [sections[3]])
+        # Unknown topic falls back to the whole document
+        self.assertEqual(sections_for_topic("Disk Full", sections), sections)
+
+    def test_concurrent_synthesis_with_focused_prompts(self):
+        llm, kb = FakeLLM(), FakeKB()
+        ingestor = self._ingestor(llm, kb)
+        start = time.perf_counter()
+        documents = ingestor.ingest("payments.md", RUNBOOK)
+        elapsed = time.perf_counter() - start
+        ingestor.close()
+
+        self.assertEqual(sorted(d.metadata["topic"] for d in documents), sorted(TOPICS))
+        self.assertEqual(llm.max_active, 3)
+        self.assertLess(elapsed, 0.25)  # 3 x 0.1s calls overlapped
+        prompt_503 = next(p for p in llm.prompts if 'topic: "Error 503"' in p)
+        self.assertNotIn("Gateway timeout", prompt_503)
+
+    def test_only_changed_topics_are_resynthesised(self):
+        llm, kb = FakeLLM(delay=0), FakeKB()
+        ingestor = self._ingestor(llm, kb)
+        ingestor.ingest("payments.md", RUNBOOK)
+        ingestor.close()
+
+        # Unchanged runbook, new process: nothing to do, not even discovery
+        llm2, kb2 = FakeLLM(delay=0), FakeKB()
+        ingestor = self._ingestor(llm2, kb2)
+        self.assertEqual(ingestor.ingest("payments.md", RUNBOOK), [])
+        self.assertEqual(llm2.prompts, [])
+
+        # Edit one section: discovery + one synthesis call
+        edited = RUNBOOK.replace("raise the upstream timeout", "scale the upstream pool")
+        documents = ingestor.ingest("payments.md", edited)
+        ingestor.close()
+        self.assertEqual([d.metadata["topic"] for d in documents], ["Error 504"])
+        self.assertEqual(len(llm2.prompts), 2)
+        self.assertEqual(len(kb2.deleted), 1)
+
+    def test_submit_runs_in_background(self):
+        llm, kb = FakeLLM(), FakeKB()
+        ingestor = self._ingestor(llm, kb)
+        path = os.path.join(self.tmp, "payments.md")
+        with open(path, "w") as f:
+            f.write(RUNBOOK)
+
+        start = time.perf_counter()
+        ingestor.submit(path)
+        self.assertLess(time.perf_counter() - start, 0.05)
+        ingestor.join()
+        ingestor.close()
+        self.assertEqual(len(kb.added), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import duckdb
+
+from shared.db.duckdb_client import DuckDBConnector, BrokerWriter
+from shared.db.broker import BrokerClient, BrokerError
+from shared.log_schema import LogBatch
+from services.storage_broker.src.main import StorageBroker
+from tests.test_duckdb_writer import sample_logs
+
+
+class TestStorageBroker(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "logs.duckdb")
+        self.history_path = os.path.join(self.tmp, "history.duckdb")
+        self.metrics_path = os.path.join(self.tmp, "metrics.duckdb")
+        self.socket_path = os.path.join(self.tmp, "broker.sock")
+        self.broker = None
+
+    def tearDown(self):
+        if self.broker is not None:
+            self.broker.close()
+            self.thread.join()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def start(self, storage: str = None):
+        if storage:
+            DuckDBConnector(db_path=self.db_path, history_path=self.history_path, storage=storage,
+                            broker_socket="")
+        self.broker = StorageBroker(self.socket_path, self.db_path, self.history_path, self.metrics_path,
+                                    idle_release_s=0.2)
+        self.thread = threading.Thread(target=self.broker.serve_forever, daemon=True)
+        self.thread.start()
+
+    def client(self) -> DuckDBConnector:
+        return DuckDBConnector(db_path=self.db_path, history_path=self.history_path,
+                               broker_socket=self.socket_path)
+
+    def batch(self) -> LogBatch:
+        return LogBatch.from_rows([tuple(log.get(name) for name in LogBatch.ROW_FIELDS) for log in sample_logs()])
+
+    def test_log_batches_and_offsets_go_through_the_broker(self):
+        self.start()
+        self.broker.writer.snapshot_interval_s = 30  # Readers here are a ReadPool
+        db = self.client()
+        writer = db.open_writer()
+        self.assertIsInstance(writer, BrokerWriter)
+        self.assertEqual(writer.storage, "row")
+
+        batch = self.batch()
+        self.assertEqual(writer.insert_log_batch(batch, [("/logs/a.log", 7, 100, 80, 4, 1)]), 11)
+        writer.commit_offsets([("/logs/b.log", 8, 50, 50, 2, 1)])
+        self.assertEqual(writer.get_offset("/logs/a.log", 7), ("/logs/a.log", 7, 100, 80, 4, 1))
+        self.assertEqual(writer.get_offset("/logs/b.1.log", 8, 1)[0], "/logs/b.log")
+        writer.clear_offset("/logs/b.log", 8)
+        self.assertIsNone(writer.get_offset("/logs/b.log", 8))
+        db.insert_batch(sample_logs())  # Legacy path also goes to the broker
+        self.assertEqual(writer.compact_closed()["after"]["overlapping"], 0)  # One row group
+        writer.release()
+
+        # Readers see the snapshot the broker published on release
+        self.assertEqual(db.query("SELECT count(*) FROM logs")[0][0], 22)
+        self.assertEqual(db.pool.metrics()["source"], "snapshot")
+        self.assertEqual(db.query("SELECT count(*) FROM logs WHERE template_id = '7'")[0][0], 20)
+
+    def test_compact_storage_keeps_templates(self):
+        self.start(storage="compact")
+        writer = self.client().open_writer()
+        self.assertTrue(writer.compact)
+        batch = self.batch()
+        for i in range(10):
+            batch.columns["context"][i] = {"user_id": i}
+            batch.wrap_template(i, "7", "Payment failed for <*>", inline=False)
+        writer.insert_log_batch(batch)
+        writer.release()
+        conn = duckdb.connect(self.broker.db.db_path)
+        self.assertEqual(conn.execute("SELECT count(*) FROM log_rows WHERE body IS NULL").fetchone()[0], 10)
+        self.assertEqual(conn.execute("SELECT count(*) FROM log_templates").fetchone()[0], 1)
+        conn.close()
+
+    def test_concurrent_clients_are_group_committed(self):
+        self.start()
+        self.broker.logs.commit_window_s = 0.05
+        errors = []
+
+        def produce():
+            try:
+                writer = self.client().open_writer()
+                for _ in range(5):
+                    writer.insert_batch(sample_logs())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=produce) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = self.client().broker.call("broker.stats")["logs"]
+        self.assertEqual((stats["requests"], stats["rows_written"]), (20, 220))
+        self.assertLess(stats["commits"], 20)
+        self.assertGreater(stats["group_max"], 1)
+
+    def test_history_alerts_and_shadow_runs(self):
+        self.start()
+        db = self.client()
+        db.save_message("s1", "user", "how many errors?")
+        db.save_message("s1", "ai", "42")
+        self.assertEqual([row[:2] for row in db.get_history("s1")], [("user", "how many errors?"), ("ai", "42")])
+
+        db.insert_alert("a1", datetime(2025, 11, 24, 10, 0), "critical", "system", "Error spike", "Investigate")
+        self.assertEqual([alert["id"] for alert in db.get_alerts()], ["a1"])
+        db.mark_alert_read("a1")
+        self.assertEqual(db.get_alerts(), [])
+        self.assertEqual(len(db.get_alerts(unread_only=False)), 1)
+
+        db.log_shadow_run("how many errors?", "shadow-gpt", "42", 0.5)
+        self.broker.close()
+        conn = duckdb.connect(self.metrics_path, read_only=True)
+        self.assertEqual(conn.execute("SELECT shadow_model FROM shadow_logs").fetchall(), [("shadow-gpt",)])
+        conn.close()
+
+    def test_results_match_the_direct_connector(self):
+        self.start()
+        db = self.client()
+        db.save_message("s1", "user", "how many errors?")
+        db.insert_alert("a1", datetime(2025, 11, 24, 10, 0), "critical", "system", "Error spike", "Investigate")
+        writer = db.open_writer()
+        writer.insert_batch(sample_logs(), [("/logs/a.log", 7, 100, 80, 4, 1)])
+        through_broker = (db.get_history("s1"), db.get_alerts(unread_only=False), writer.get_offset("/logs/a.log", 7))
+        self.assertIsInstance(through_broker[0][0][2], datetime)
+        self.broker.close()
+        self.thread.join()
+        self.broker = None
+
+        direct = DuckDBConnector(db_path=self.db_path, history_path=self.history_path, broker_socket="")
+        writer = direct.open_writer()
+        self.assertEqual(through_broker, (direct.get_history("s1"), direct.get_alerts(unread_only=False),
+                                          writer.get_offset("/logs/a.log", 7)))
+        writer.close()
+
+    def test_errors_only_fail_their_own_request(self):
+        self.start()
+        client = BrokerClient(self.socket_path)
+        with self.assertRaises(BrokerError):
+            client.call("logs.drop_everything")
+        with self.assertRaises(BrokerError):
+            client.call("history.insert_alert", params=["too few"])
+        # The connection (and the broker) keep working
+        self.client().save_message("s1", "user", "still there")
+        self.assertEqual(len(self.client().get_history("s1")), 1)
+        self.assertEqual(client.call("broker.stats")["history"]["failed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
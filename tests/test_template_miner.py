@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils.template_miner import LogTemplateMiner, SnapshotPolicy, SnapshotWriter
+
+LOGS = [
+    "Payment processed for user_id=101 amount=50.00",
+    "Login failed for user=admin ip=192.168.1.5",
+    "Disk usage at 91 percent on volume data",
+    "Cache miss for key session:42",
+]
+
+
+class TestSnapshotPolicy(unittest.TestCase):
+    def test_triggers(self):
+        policy = SnapshotPolicy(every_changes=3, every_seconds=10)
+        self.assertIsNone(policy.reason(0, 100))
+        self.assertIsNone(policy.reason(2, 5))
+        self.assertEqual(policy.reason(3, 0), "3 changes")
+        self.assertEqual(policy.reason(1, 10), "periodic")
+        self.assertIsNone(SnapshotPolicy(every_changes=0, every_seconds=0).reason(10 ** 6, 10 ** 6))
+
+
+class TestLogTemplateMiner(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="logpilot_drain3_")
+        self.path = os.path.join(self.dir, "drain3_state.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_snapshots_follow_policy(self):
+        miner = LogTemplateMiner(self.path, policy=SnapshotPolicy(every_changes=2, every_seconds=0))
+        for log in LOGS[:3]:
+            miner.mine_template(log)
+        miner.flush()
+        self.assertEqual(miner.stats()["snapshots_saved"], 1)
+        self.assertEqual(miner.stats()["pending_changes"], 1)
+
+        # Nothing due: the third cluster is only written on close
+        self.assertEqual(LogTemplateMiner(self.path).get_total_clusters(), 2)
+        miner.close()
+        self.assertEqual(LogTemplateMiner(self.path).get_total_clusters(), 3)
+
+    def test_round_trip_with_and_without_compression(self):
+        for compress in (True, False):
+            path = os.path.join(self.dir, f"state_{compress}.bin")
+            miner = LogTemplateMiner(path, policy=SnapshotPolicy(every_changes=1), compress=compress)
+            for log in LOGS:
+                miner.mine_template(log)
+            miner.close()
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+            restored = LogTemplateMiner(path, compress=compress)
+            self.assertEqual(restored.get_total_clusters(), len(LOGS))
+            self.assertEqual(restored.mine_template(LOGS[0])["change_type"], "none")
+            self.assertGreater(restored.stats()["load_s"], 0)
+            restored.close()
+
+    def test_cache_matches_drain3(self):
+        # Repeats interleaved with bodies that widen an existing template
+        logs = LOGS + LOGS + ["Payment processed for user_id=102 amount=50.00", LOGS[0],
+                              "Payment processed for user_id=101 amount=75.00"] + LOGS * 3
+        results = []
+        for cache_size in (0, 100):
+            miner = LogTemplateMiner(os.path.join(self.dir, f"cache_{cache_size}.bin"),
+                                     policy=SnapshotPolicy(every_changes=0, every_seconds=0), cache_size=cache_size)
+            results.append([miner.mine_template(log) for log in logs])
+            stats = miner.stats()
+            miner.close()
+        self.assertEqual(results[0], results[1])
+        self.assertGreater(stats["cache_hits"], 0)
+        self.assertGreater(stats["cache_invalidations"], 0)
+
+    def test_cache_is_invalidated_when_a_template_changes(self):
+        miner = LogTemplateMiner(self.path, policy=SnapshotPolicy(every_changes=0, every_seconds=0), cache_size=10)
+        miner.mine_template("Job 7 finished on node alpha")
+        miner.mine_template("Job 7 finished on node alpha")
+        self.assertEqual(miner.mine_template("Job 7 finished on node alpha")["cluster_size"], 3)
+        self.assertEqual(miner.cache_hits, 1)
+
+        changed = miner.mine_template("Job 7 finished on node beta")
+        self.assertEqual(changed["change_type"], "cluster_template_changed")
+        self.assertEqual(miner.stats()["cache_entries"], 0)
+        result = miner.mine_template("Job 7 finished on node alpha")
+        self.assertEqual(result["template_mined"], changed["template_mined"])
+        self.assertEqual(result["cluster_size"], 5)
+        miner.close()
+
+    def test_writer_keeps_only_the_latest_pending_snapshot(self):
+        writer = SnapshotWriter(self.path, compress=False)
+        with writer._cond:
+            # Hold the lock: the writer thread cannot take anything yet
+            writer.save_state(b"old")
+            writer.save_state(b"new")
+        writer.close()
+        self.assertEqual(writer.superseded, 1)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"new")
+
+
+if __name__ == '__main__':
+    unittest.main()
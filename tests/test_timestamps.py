@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from shared.utils.log_parser import LogParser
+from shared.utils.timestamps import TimestampDecoder
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+class TestTimestampDecoder(unittest.TestCase):
+    """The decoder must be indistinguishable from LogParser._parse_timestamp (strptime)."""
+
+    def setUp(self):
+        self.decoder = TimestampDecoder()
+        self.reference = LogParser()._parse_timestamp
+
+    def assertSame(self, fast, slow):
+        self.assertEqual(fast, slow)
+        self.assertEqual(fast.tzinfo, slow.tzinfo)
+        self.assertEqual(fast.isoformat(), slow.isoformat())
+
+    def _instants(self, n=3000):
+        rng = random.Random(7)
+        t = datetime(2024, 12, 31, 23, 58, 0)
+        for _ in range(n):
+            t += timedelta(seconds=rng.choice([0, 0, 1, 1, 2, 17, 3600]))
+            yield t
+
+    def test_standard(self):
+        for t in self._instants():
+            ts = t.strftime("%Y-%m-%d %H:%M:%S")
+            self.assertSame(self.decoder.standard(ts), self.reference(ts, "%Y-%m-%d %H:%M:%S"))
+        self.assertGreater(self.decoder.hits, self.decoder.misses)
+
+    def test_syslog(self):
+        year = datetime.now().year
+        for t in self._instants():
+            ts = f"{MONTHS[t.month - 1]} {t.day:>2} {t:%H:%M:%S}"  # "Nov  4 ..." style padding
+            self.assertSame(self.decoder.syslog(ts), self.reference(f"{year} {ts}", "%Y %b %d %H:%M:%S"))
+
+    def test_nginx_keeps_offset(self):
+        for i, t in enumerate(self._instants()):
+            offset = ["+0000", "+0530", "-0800"][i % 3]
+            ts = f"{t.day:02d}/{MONTHS[t.month - 1]}/{t.year}:{t:%H:%M:%S} {offset}"
+            self.assertSame(self.decoder.nginx(ts), self.reference(ts, "%d/%b/%Y:%H:%M:%S %z"))
+
+    def test_iso(self):
+        for value in ["2025-11-24T10:00:00Z", "2025-11-24T10:00:00.123456+02:00", "2025-11-24 10:00:00"]:
+            self.assertSame(self.decoder.iso(value), self.reference(value))
+
+    def test_invalid_values_fall_back_to_now(self):
+        cases = [
+            (self.decoder.standard, "2025-13-01 10:00:00"),
+            (self.decoder.standard, "2025-11-24 10:00:60"),
+            (self.decoder.syslog, "Feb 30 10:00:00"),
+            (self.decoder.nginx, "24/Foo/2025:16:00:00 +0000"),
+            (self.decoder.nginx, "garbage"),
+            (self.decoder.iso, "yesterday"),
+            (self.decoder.iso, None),
+        ]
+        for decode, value in cases:
+            before = datetime.now(timezone.utc)
+            first = decode(value)
+            second = decode(value)
+            self.assertGreaterEqual(first, before)
+            self.assertGreaterEqual(second, first)  # "now" is never memoized
+
+    def test_unusual_layouts_use_strptime(self):
+        # Single-digit day with one space is valid for strptime
+        year = datetime.now().year
+        ts = "Nov 4 16:00:05"
+        self.assertSame(self.decoder.syslog(ts), self.reference(f"{year} {ts}", "%Y %b %d %H:%M:%S"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,7 +19,7 @@ class TestAgenticScenarios(unittest.TestCase):
     def setUp(self):
         print("\n" + "="*50)
 
-    @patch('services.pilot_orchestrator.src.nodes.DuckDBConnector')
+    @patch('services.pilot_orchestrator.src.nodes.get_connector')
     @patch('services.pilot_orchestrator.src.nodes.llm_client')
     @patch('services.pilot_orchestrator.src.nodes.get_kb_store')
     def test_scenario_bad_context_recovery(self, mock_kb, mock_llm, mock_db):
@@ -82,7 +82,7 @@ class TestAgenticScenarios(unittest.TestCase):
         self.assertTrue(result["context_valid"], "Final context should be valid")
         print("✅ Agent successfully rejected bad context and retried!")
 
-    @patch('services.pilot_orchestrator.src.nodes.DuckDBConnector')
+    @patch('services.pilot_orchestrator.src.nodes.get_connector')
     @patch('services.pilot_orchestrator.src.nodes.llm_client')
     @patch('services.pilot_orchestrator.src.nodes.get_kb_store')
     def test_scenario_lazy_answer_correction(self, mock_kb, mock_llm, mock_db):
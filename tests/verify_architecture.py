@@ -82,7 +82,7 @@ def test_architecture():
         print(f"✅ Retrieved Pattern ID: {found_id}")
         
         # Step B: Query DuckDB for Logs
-        sql = f"SELECT body FROM logs WHERE json_extract_string(context, '$.template_id') = ?"
+        sql = f"SELECT body FROM logs WHERE template_id = ?"
         logs = db.query(sql, [found_id])
         
         if not logs:
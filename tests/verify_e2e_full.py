@@ -67,15 +67,12 @@ class MockConnector:
             raise e
     def close(self): pass
 
-# We need to verify if nodes.py uses DuckDBConnector from shared.db.duckdb_client
-# Since we already imported nodes.py, we might need to patch DuckDBConnector INSIDE sys.modules or patch the object in nodes logic.
-# But since nodes.py imports `from shared.db.duckdb_client import DuckDBConnector`, we should Mock that MODULE too if possible, 
-# OR patch it in nodes.py using patch.object.
+# nodes.py gets its connector from `get_connector` (shared.db.duckdb_client).
 # Since nodes.py is already imported now, we can use patch on the imported module attribute.
 
 from unittest.mock import patch
 
-@patch("services.pilot_orchestrator.src.nodes.DuckDBConnector", side_effect=MockConnector)
+@patch("services.pilot_orchestrator.src.nodes.get_connector", side_effect=MockConnector)
 def test_full_e2e(MockDB):
     print("🧪 Starting Fully Module-Mocked Verification...")
     